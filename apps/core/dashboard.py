@@ -0,0 +1,68 @@
+"""
+Kennzahlen für das Dashboard.
+
+Je Tabelle eine Aggregat-Abfrage. Das Ergebnis wird im Cache gehalten und
+über eine Versionsnummer verworfen, sobald sich Mitglieder, Fahrzeuge,
+Dienste oder Einteilungen ändern (über Signale, bei Massen-Schreibvorgängen
+explizit über invalidate()). Das Datum ist Teil des Schlüssels, damit
+Tages- und Monatswechsel ohne Invalidierung greifen.
+"""
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from apps.members.models import Member
+from apps.scheduling.models import Assignment, Duty
+from apps.vehicles.models import Vehicle
+
+
+# Obergrenze, falls Änderungen anderer App-Instanzen nicht gemeldet werden
+CACHE_TIMEOUT = 60
+VERSION_KEY = 'core:dashboard:version'
+
+
+def cache_version():
+    return cache.get_or_set(VERSION_KEY, 1, None)
+
+
+def invalidate():
+    """Zwischengespeicherte Kennzahlen verwerfen"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def build_summary(today):
+    """Kennzahlen berechnen (eine Abfrage je Tabelle)"""
+    month_start = today.replace(day=1)
+
+    members = Member.objects.aggregate(
+        active=Count('id', filter=Q(is_active=True, status='active'))
+    )
+    vehicles = Vehicle.objects.aggregate(
+        active=Count('id', filter=Q(is_active=True))
+    )
+    duties = Duty.objects.exclude(status='cancelled').aggregate(
+        this_month=Count('id', filter=Q(date__gte=month_start, date__lte=today))
+    )
+    assignments = Assignment.objects.aggregate(
+        open=Count('id', filter=Q(duty__date__gte=today, member__isnull=True))
+    )
+
+    return {
+        'active_members': members['active'],
+        'active_vehicles': vehicles['active'],
+        'duties_this_month': duties['this_month'],
+        'open_positions': assignments['open'],
+    }
+
+
+def dashboard_summary(today):
+    """Kennzahlen aus dem Cache oder neu berechnet"""
+    key = f'core:dashboard:{cache_version()}:{today.isoformat()}'
+    summary = cache.get(key)
+    if summary is None:
+        summary = build_summary(today)
+        cache.set(key, summary, CACHE_TIMEOUT)
+    return summary
@@ -0,0 +1,19 @@
+"""
+Datumsrechnung mit Kalendermonaten.
+
+dateutil wird erst beim ersten Aufruf geladen: Modelle, Signale und
+Ansichten werden bei jedem Start importiert, Monatsrechnung wird aber nur
+beim Speichern und Auswerten gebraucht (siehe profile_startup).
+"""
+
+
+def add_months(value, months):
+    """
+    Datum um Kalendermonate verschieben (negativ: zurück).
+
+    Gibt es den Tag im Zielmonat nicht, gilt der Monatsletzte
+    (31.01. + 1 Monat = 28.02., 29.02. - 12 Monate = 28.02.).
+    """
+    from dateutil.relativedelta import relativedelta
+
+    return value + relativedelta(months=months)
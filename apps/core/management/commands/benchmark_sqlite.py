@@ -0,0 +1,163 @@
+"""
+Management-Command zum Messen des gleichzeitigen Lese-/Schreibdurchsatzes
+der SQLite-Datenbank.
+
+Vergleicht die frühere Konfiguration (Rollback-Journal, synchronous=FULL,
+BEGIN DEFERRED) mit der aktuellen aus settings.SQLITE_PRAGMAS und
+transaction_mode. Lese- und Schreibprozesse arbeiten parallel auf einer
+temporären Datenbank im Datenverzeichnis (gleiches Dateisystem wie die
+echte Datenbank), die echte Datenbank wird nicht angefasst.
+
+Verwendung:
+    python manage.py benchmark_sqlite
+    python manage.py benchmark_sqlite --seconds 10 --readers 4 --writers 2
+"""
+
+import multiprocessing
+import sqlite3
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+# Konfiguration vor der Umstellung auf WAL
+LEGACY_PRAGMAS = {
+    'journal_mode': 'DELETE',
+    'synchronous': 'FULL',
+}
+
+SEED_ROWS = 2000
+
+
+def connect(path, pragmas, timeout):
+    conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+    for name, value in pragmas.items():
+        # journal_mode ist dauerhaft in der Datei gespeichert (siehe seed)
+        if name != 'journal_mode':
+            conn.execute(f'PRAGMA {name}={value}')
+    return conn
+
+
+def count(value):
+    with value.get_lock():
+        value.value += 1
+
+
+def seed(path, pragmas):
+    conn = connect(path, pragmas, 20)
+    conn.execute(f'PRAGMA journal_mode={pragmas["journal_mode"]}')
+    conn.execute('CREATE TABLE item (id INTEGER PRIMARY KEY, member_id INTEGER, value INTEGER)')
+    conn.execute('CREATE INDEX item_member ON item (member_id)')
+    conn.executemany(
+        'INSERT INTO item (member_id, value) VALUES (?, ?)',
+        [(i % 200, i) for i in range(SEED_ROWS)]
+    )
+    conn.close()
+
+
+def reader(path, pragmas, timeout, deadline, counter, errors):
+    try:
+        conn = connect(path, pragmas, timeout)
+    except sqlite3.OperationalError:
+        count(errors)
+        return
+    n = 0
+    while time.time() < deadline:
+        try:
+            conn.execute(
+                'SELECT member_id, COUNT(*), SUM(value) FROM item WHERE member_id < ? GROUP BY member_id',
+                (n % 200,)
+            ).fetchall()
+            count(counter)
+        except sqlite3.OperationalError:
+            count(errors)
+        n += 1
+    conn.close()
+
+
+def writer(path, pragmas, begin, timeout, deadline, counter, errors):
+    """Typische Schreib-Transaktion: erst lesen, dann ändern (wie Einteilungen)"""
+    try:
+        conn = connect(path, pragmas, timeout)
+    except sqlite3.OperationalError:
+        count(errors)
+        return
+    n = 0
+    while time.time() < deadline:
+        try:
+            conn.execute(begin)
+            try:
+                conn.execute('SELECT SUM(value) FROM item WHERE member_id = ?', (n % 200,)).fetchone()
+                conn.execute('UPDATE item SET value = value + 1 WHERE member_id = ?', (n % 200,))
+                conn.execute('INSERT INTO item (member_id, value) VALUES (?, ?)', (n % 200, n))
+                conn.execute('COMMIT')
+            except sqlite3.OperationalError:
+                conn.execute('ROLLBACK')
+                raise
+            count(counter)
+        except sqlite3.OperationalError:
+            count(errors)
+        n += 1
+    conn.close()
+
+
+class Command(BaseCommand):
+    help = 'Misst den parallelen Lese-/Schreibdurchsatz von SQLite (vorher/nachher)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5.0, help='Laufzeit je Konfiguration')
+        parser.add_argument('--readers', type=int, default=4, help='Anzahl lesender Prozesse')
+        parser.add_argument('--writers', type=int, default=2, help='Anzahl schreibender Prozesse')
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=settings.DATABASES['default']['OPTIONS'].get('timeout', 5),
+            help='Sperr-Timeout in Sekunden (wie in den Einstellungen)'
+        )
+
+    def handle(self, *args, **options):
+        transaction_mode = settings.DATABASES['default']['OPTIONS'].get('transaction_mode') or 'DEFERRED'
+        configurations = [
+            ('Rollback-Journal, BEGIN DEFERRED', LEGACY_PRAGMAS, 'BEGIN DEFERRED'),
+            (f'WAL, BEGIN {transaction_mode}', settings.SQLITE_PRAGMAS, f'BEGIN {transaction_mode}'),
+        ]
+
+        self.stdout.write(
+            f'{options["readers"]} Leser, {options["writers"]} Schreiber, '
+            f'{options["seconds"]:g} s je Konfiguration'
+        )
+        for label, pragmas, begin in configurations:
+            reads, writes, errors = self.measure(pragmas, begin, options)
+            seconds = options['seconds']
+            self.stdout.write(
+                f'{label:<36} {reads / seconds:>10.0f} Lesevorgänge/s '
+                f'{writes / seconds:>8.0f} Schreibvorgänge/s {errors:>6} Fehler'
+            )
+
+    def measure(self, pragmas, begin, options):
+        with tempfile.TemporaryDirectory(dir=settings.DATA_DIR) as directory:
+            path = f'{directory}/benchmark.sqlite3'
+            seed(path, pragmas)
+
+            reads = multiprocessing.Value('i', 0)
+            writes = multiprocessing.Value('i', 0)
+            errors = multiprocessing.Value('i', 0)
+            deadline = time.time() + options['seconds']
+            processes = [
+                multiprocessing.Process(
+                    target=reader, args=(path, pragmas, options['timeout'], deadline, reads, errors)
+                )
+                for _ in range(options['readers'])
+            ] + [
+                multiprocessing.Process(
+                    target=writer, args=(path, pragmas, begin, options['timeout'], deadline, writes, errors)
+                )
+                for _ in range(options['writers'])
+            ]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+            return reads.value, writes.value, errors.value
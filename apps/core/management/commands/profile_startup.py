@@ -0,0 +1,183 @@
+"""
+Management-Command zum Messen der Startzeit.
+
+Startet einen frischen Python-Prozess (wie Electron) und misst die Phasen
+bis zur ersten beantworteten Anfrage:
+
+- Interpreter: Prozessstart bis zur ersten Zeile des Skripts
+- Django importieren, django.setup() (Apps, Modelle, Signale, Admin)
+- WSGI-Anwendung und URL-Konfiguration (importiert alle Views)
+- Erste Anfrage (Login-Seite, Template kompilieren)
+
+Zusätzlich wird ein Lauf mit "python -X importtime" ausgewertet: Importzeit
+je Paket sowie die langsamsten eigenen Module (apps, config).
+
+Mit --save wird das Ergebnis in logs/startup_benchmark.jsonl angehängt und
+mit dem vorherigen Eintrag verglichen.
+
+Verwendung:
+    python manage.py profile_startup
+    python manage.py profile_startup --repeat 10 --top 20
+    python manage.py profile_startup --save
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+
+PROBE = '''
+import json, os, time
+started = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+import django
+imported = time.perf_counter()
+django.setup()
+setup_done = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+application = get_wsgi_application()
+get_resolver().url_patterns
+urls_done = time.perf_counter()
+from wsgiref.util import setup_testing_defaults
+environ = {'PATH_INFO': '/login/', 'REQUEST_METHOD': 'GET'}
+setup_testing_defaults(environ)
+b''.join(application(environ, lambda status, headers: None))
+request_done = time.perf_counter()
+print(json.dumps({
+    'django_import': imported - started,
+    'setup': setup_done - imported,
+    'urls': urls_done - setup_done,
+    'first_request': request_done - urls_done,
+    'script': request_done - started,
+}))
+'''
+
+PHASES = [
+    ('interpreter', 'Interpreter'),
+    ('django_import', 'Django importieren'),
+    ('setup', 'django.setup()'),
+    ('urls', 'WSGI + URL-Konfiguration'),
+    ('first_request', 'Erste Anfrage'),
+    ('total', 'Gesamt'),
+]
+
+OWN_PACKAGES = ('apps', 'config')
+
+
+def run_probe(*python_options):
+    """Probe in einem neuen Prozess ausführen; liefert (Phasen in s, stderr)"""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, *python_options, '-c', PROBE],
+        cwd=settings.BASE_DIR,
+        env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'config.settings'},
+        capture_output=True,
+        text=True,
+    )
+    total = time.perf_counter() - started
+    if result.returncode != 0:
+        raise CommandError(f'Startmessung fehlgeschlagen:\n{result.stderr}')
+
+    phases = json.loads(result.stdout.strip().splitlines()[-1])
+    phases['interpreter'] = total - phases.pop('script')
+    phases['total'] = total
+    return phases, result.stderr
+
+
+def parse_importtime(output):
+    """
+    Ausgabe von "python -X importtime" einlesen.
+
+    Returns:
+        list: [(modulname, eigene Zeit in µs, kumulierte Zeit in µs)]
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+class Command(BaseCommand):
+    help = 'Misst die Startzeit (Phasen und Importzeiten) bis zur ersten Anfrage'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Anzahl der Messläufe (Median)')
+        parser.add_argument('--top', type=int, default=15, help='Anzahl der angezeigten Module')
+        parser.add_argument(
+            '--save',
+            action='store_true',
+            help='Ergebnis in logs/startup_benchmark.jsonl anhängen und mit dem letzten vergleichen'
+        )
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat muss mindestens 1 sein')
+
+        # Erster Lauf schreibt ggf. Bytecode-Caches und zählt nicht mit
+        run_probe()
+        runs = [run_probe()[0] for _ in range(options['repeat'])]
+        phases = {key: statistics.median(run[key] for run in runs) for key, _ in PHASES}
+
+        self.stdout.write(f'Startzeit (Median aus {len(runs)} Läufen)')
+        for key, label in PHASES:
+            self.stdout.write(f'  {label:<28} {phases[key] * 1000:>7.0f} ms')
+
+        self.report_imports(options['top'])
+
+        if options['save']:
+            self.save(phases)
+
+    def report_imports(self, top):
+        modules = parse_importtime(run_probe('-X', 'importtime')[1])
+
+        packages = {}
+        for name, self_us, _ in modules:
+            package = name.split('.')[0]
+            packages[package] = packages.get(package, 0) + self_us
+        total_us = sum(packages.values())
+
+        self.stdout.write(f'\nImportzeit nach Paket (gesamt {total_us / 1000:.0f} ms)')
+        for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+            self.stdout.write(f'  {package:<28} {self_us / 1000:>7.1f} ms')
+
+        own = [module for module in modules if module[0].split('.')[0] in OWN_PACKAGES]
+        self.stdout.write('\nEigene Module (eigene / kumulierte Importzeit)')
+        for name, self_us, cumulative_us in sorted(own, key=lambda module: -module[2])[:top]:
+            self.stdout.write(f'  {name:<40} {self_us / 1000:>6.1f} ms {cumulative_us / 1000:>7.1f} ms')
+
+    def save(self, phases):
+        path = settings.LOGS_DIR / 'startup_benchmark.jsonl'
+        previous = None
+        if path.exists():
+            lines = path.read_text(encoding='utf-8').splitlines()
+            if lines:
+                previous = json.loads(lines[-1])
+
+        entry = {
+            'timestamp': timezone.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'phases_ms': {key: round(phases[key] * 1000, 1) for key, _ in PHASES},
+        }
+        with path.open('a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+        self.stdout.write(f'\nErgebnis gespeichert in {path}')
+
+        if previous:
+            before = previous['phases_ms']['total']
+            after = entry['phases_ms']['total']
+            self.stdout.write(
+                f'Gesamt gegenüber {previous["timestamp"]}: {before:.0f} ms -> {after:.0f} ms '
+                f'({after - before:+.0f} ms)'
+            )
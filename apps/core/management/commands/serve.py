@@ -0,0 +1,141 @@
+"""
+Management-Command zum Starten des Anwendungsservers.
+
+Ersatz für "runserver" im Electron-Betrieb: die WSGI-Anwendung läuft unter
+waitress mit mehreren Worker-Threads, HTTP-Keep-Alive und sauberem
+Herunterfahren. Statische Dateien liefert WhiteNoise aus.
+
+Beendet wird der Server mit SIGINT/SIGTERM oder - mit --stdin-shutdown,
+auch unter Windows - durch Schließen der Standardeingabe. Laufende
+Anfragen werden dann noch abgeschlossen (höchstens 5 Sekunden), neue
+Verbindungen nicht mehr angenommen.
+
+Mit --migrate wird vorher im selben Prozess geprüft, ob das Datenbankschema
+aktuell ist, und nur bei Bedarf migriert (siehe apps.core.schema).
+
+Verwendung:
+    python manage.py serve
+    python manage.py serve --host 127.0.0.1 --port 8000 --threads 8
+    python manage.py serve --migrate
+"""
+
+import _thread
+import signal
+import sys
+import threading
+import time
+import traceback
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+
+from apps.core import schema
+from apps.members.jobs import resume_jobs
+
+
+class Command(BaseCommand):
+    help = 'Startet den Anwendungsserver (waitress) für den Produktivbetrieb'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Adresse, an die der Server bindet')
+        parser.add_argument('--port', type=int, default=8000, help='Port')
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=settings.SERVER_THREADS,
+            help='Anzahl der Worker-Threads'
+        )
+        parser.add_argument(
+            '--keep-alive',
+            type=int,
+            default=settings.SERVER_KEEP_ALIVE,
+            help='Sekunden, die eine unbenutzte Keep-Alive-Verbindung offen bleibt'
+        )
+        parser.add_argument(
+            '--migrate',
+            action='store_true',
+            help='Vor dem Start migrieren, falls das Datenbankschema nicht aktuell ist'
+        )
+        parser.add_argument(
+            '--stdin-shutdown',
+            action='store_true',
+            help='Herunterfahren, sobald die Standardeingabe geschlossen wird (für Electron)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            from waitress import create_server
+        except ImportError:
+            raise CommandError('waitress ist nicht installiert (pip install -r requirements.txt)')
+
+        if options['threads'] < 1:
+            raise CommandError('--threads muss mindestens 1 sein')
+
+        if options['migrate']:
+            self.migrate()
+        self.resume_import_jobs()
+
+        server = create_server(
+            get_wsgi_application(),
+            host=options['host'],
+            port=options['port'],
+            threads=options['threads'],
+            channel_timeout=options['keep_alive'],
+            ident='FF',
+        )
+
+        # SIGTERM wie Strg+C behandeln, damit waitress die Worker-Threads
+        # geordnet beendet (SIGINT löst ohnehin KeyboardInterrupt aus)
+        signal.signal(signal.SIGTERM, self.stop)
+        if options['stdin_shutdown']:
+            threading.Thread(target=self.watch_stdin, daemon=True).start()
+
+        self.stdout.write(
+            f'Server läuft auf http://{server.effective_host}:{server.effective_port}/ '
+            f'({options["threads"]} Threads)'
+        )
+        self.stdout.flush()
+        try:
+            server.run()
+        finally:
+            server.close()
+        self.stdout.write('Server beendet')
+
+    def migrate(self):
+        """Schema prüfen und bei Bedarf migrieren; Fehler verhindern den Start nicht"""
+        started = time.monotonic()
+        try:
+            migrated = schema.ensure_current(verbosity=0)
+        except Exception as e:
+            self.stderr.write(f'Migration fehlgeschlagen: {e}\n{traceback.format_exc()}')
+            return
+        duration = time.monotonic() - started
+        if migrated:
+            self.stdout.write(f'Datenbank migriert ({duration:.1f} s)')
+        else:
+            self.stdout.write(f'Datenbankschema ist aktuell ({duration * 1000:.0f} ms)')
+
+    def resume_import_jobs(self):
+        """Import-Jobs aus einem früheren Serverlauf aufräumen bzw. fortsetzen"""
+        try:
+            failed = resume_jobs()
+        except Exception as e:
+            self.stderr.write(f'Import-Jobs konnten nicht fortgesetzt werden: {e}')
+            return
+        if failed:
+            self.stdout.write(f'{failed} abgebrochene(r) Import-Job(s) als fehlgeschlagen markiert')
+
+    def stop(self, signum, frame):
+        raise SystemExit(0)
+
+    def watch_stdin(self):
+        """Wartet auf das Ende der Standardeingabe und beendet dann den Hauptthread"""
+        if sys.stdin is None:
+            return
+        try:
+            while sys.stdin.read(1024):
+                pass
+        except (OSError, ValueError):
+            pass
+        _thread.interrupt_main()
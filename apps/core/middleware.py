@@ -0,0 +1,54 @@
+"""
+Middleware für den Health-Check unter /healthz.
+
+Steht als erste Middleware in settings.MIDDLEWARE und beantwortet die
+Anfrage selbst, ohne Session, Authentifizierung oder URL-Auflösung. Der
+Electron-Starter fragt den Endpunkt in kurzen Abständen ab und öffnet das
+Fenster, sobald Datenbank und Schema bereit sind.
+"""
+
+from django.db import DatabaseError, connection
+from django.http import JsonResponse
+
+from . import schema
+
+
+HEALTH_PATH = '/healthz'
+
+
+def health_status():
+    """
+    Zustand von Datenbank und Schema.
+
+    Returns:
+        dict: {'database': bool, 'migrations': bool}
+    """
+    status = {'database': False, 'migrations': False}
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        status['database'] = True
+        status['migrations'] = schema.is_migrated()
+    except DatabaseError:
+        pass
+    return status
+
+
+class HealthCheckMiddleware:
+    """Beantwortet /healthz mit 200 (bereit) oder 503 (nicht bereit)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path_info.rstrip('/') != HEALTH_PATH:
+            return self.get_response(request)
+
+        status = health_status()
+        ready = all(status.values())
+        response = JsonResponse(
+            {'status': 'ok' if ready else 'unavailable', **status},
+            status=200 if ready else 503
+        )
+        response['Cache-Control'] = 'no-store'
+        return response
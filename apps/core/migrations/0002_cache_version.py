@@ -0,0 +1,25 @@
+# Generated by Django 6.0 on 2026-10-19 07:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100, unique=True, verbose_name='Schlüssel')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Version')),
+            ],
+            options={
+                'verbose_name': 'Cache-Version',
+                'verbose_name_plural': 'Cache-Versionen',
+            },
+        ),
+    ]
@@ -104,3 +104,22 @@ class AuditLog(models.Model):
 
     def __str__(self):
         return f"{self.get_action_display()}: {self.object_repr} von {self.user}"
+
+
+class CacheVersion(models.Model):
+    """
+    Versionsnummer eines prozesslokalen Caches.
+
+    Wird bei jeder Änderung der zwischengespeicherten Daten erhöht, damit
+    mehrere App-Instanzen auf derselben Datenbank ihren Cache verwerfen
+    (siehe refdata.py).
+    """
+    key = models.CharField('Schlüssel', max_length=100, unique=True)
+    version = models.PositiveBigIntegerField('Version', default=0)
+
+    class Meta:
+        verbose_name = 'Cache-Version'
+        verbose_name_plural = 'Cache-Versionen'
+
+    def __str__(self):
+        return f"{self.key}: {self.version}"
@@ -0,0 +1,113 @@
+"""
+Prozesslokaler Cache für Stammdaten.
+
+Einstellungen, Qualifikationen, Positionen, Fahrzeugtypen, Diensttypen
+und Untersuchungstypen sind kleine Tabellen, die sich selten ändern, aber
+von fast jeder Ansicht gelesen werden. Sie werden einmal je Prozess geladen und
+als Schnappschuss gehalten.
+
+Konsistenz:
+- Im selben Prozess verwerfen Signale den Schnappschuss beim Speichern
+  oder Löschen sofort
+- Über Prozessgrenzen hinweg (mehrere App-Instanzen auf derselben
+  Datenbank) erhöht jede Änderung die Versionsnummer in CacheVersion.
+  Jeder Prozess vergleicht sie spätestens alle
+  REFERENCE_DATA_CHECK_INTERVAL Sekunden mit seinem Schnappschuss.
+
+Die gelieferten Objekte werden von allen Anfragen geteilt und dürfen
+nicht verändert werden. Für Bearbeitungsformulare weiterhin aus der
+Datenbank laden.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from .models import CacheVersion, Settings
+
+
+VERSION_KEY = 'reference_data'
+
+_lock = threading.Lock()
+_snapshot = None
+_checked_at = 0.0
+
+
+class ReferenceData:
+    """Schnappschuss aller Stammdaten-Tabellen"""
+
+    def __init__(self, version):
+        from apps.qualifications.models import MedicalExamType, Qualification
+        from apps.scheduling.models import DutyType
+        from apps.vehicles.models import Position, VehicleType
+
+        self.version = version
+        # Einstellungen (Singleton), None solange die Anwendung nicht eingerichtet ist
+        self.settings = Settings.objects.first()
+        self.qualifications = tuple(
+            Qualification.objects.select_related('category').order_by('order', 'code')
+        )
+        self.positions = tuple(Position.objects.order_by('order', 'name'))
+        self.vehicle_types = tuple(VehicleType.objects.all())
+        self.duty_types = tuple(DutyType.objects.all())
+        self.exam_types = tuple(MedicalExamType.objects.select_related('related_qualification').order_by('code'))
+
+        self.qualifications_by_id = {q.id: q for q in self.qualifications}
+        self.qualifications_by_code = {q.code: q for q in self.qualifications}
+        self.exam_types_by_code = {e.code.casefold(): e for e in self.exam_types}
+
+    @property
+    def active_qualifications(self):
+        return [q for q in self.qualifications if q.is_active]
+
+    @property
+    def active_duty_types(self):
+        return [t for t in self.duty_types if t.is_active]
+
+    def qualification(self, code):
+        """Qualifikation nach Kürzel (oder None)"""
+        return self.qualifications_by_code.get(code)
+
+    def exam_type(self, code):
+        """Untersuchungstyp nach Kürzel, ohne Groß-/Kleinschreibung (oder None)"""
+        return self.exam_types_by_code.get(code.casefold())
+
+
+def stored_version():
+    """Aktuelle Versionsnummer aus der Datenbank"""
+    return CacheVersion.objects.filter(key=VERSION_KEY).values_list('version', flat=True).first() or 0
+
+
+def reference_data():
+    """Aktuellen Schnappschuss liefern (bei Bedarf neu laden)"""
+    global _snapshot, _checked_at
+
+    snapshot = _snapshot
+    now = time.monotonic()
+    if snapshot is not None and now - _checked_at < settings.REFERENCE_DATA_CHECK_INTERVAL:
+        return snapshot
+
+    version = stored_version()
+    with _lock:
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = ReferenceData(version)
+        _checked_at = now
+        return _snapshot
+
+
+def clear():
+    """Schnappschuss dieses Prozesses verwerfen"""
+    global _snapshot
+    _snapshot = None
+
+
+def invalidate():
+    """Nach Änderungen: Versionsnummer erhöhen und Schnappschuss verwerfen"""
+    if not CacheVersion.objects.filter(key=VERSION_KEY).update(version=F('version') + 1):
+        CacheVersion.objects.get_or_create(key=VERSION_KEY, defaults={'version': 1})
+    clear()
+    # Andere Threads könnten bis zum Commit noch den alten Stand geladen haben
+    transaction.on_commit(clear)
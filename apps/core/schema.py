@@ -0,0 +1,85 @@
+"""
+Schnelle Prüfung beim Start, ob das Datenbankschema aktuell ist.
+
+"migrate" lädt bei jedem Aufruf den kompletten Migrationsgraphen, auch wenn
+nichts zu tun ist. Stattdessen wird nach erfolgreicher Migration ein
+Fingerabdruck der mitgelieferten Migrationsdateien in der Datenbank
+(PRAGMA user_version) abgelegt. Beim nächsten Start genügt es, die Dateien
+zu hashen und mit diesem Wert zu vergleichen; migrate läuft nur bei einer
+Abweichung (neue App-Version, neue oder ersetzte Datenbank).
+
+Weil der Wert in der Datenbankdatei selbst steht, gilt er für alle
+Instanzen, die sich die Datenbank teilen, und geht mit der Datei mit
+(Sicherung, Austausch).
+"""
+
+import hashlib
+from pathlib import Path
+
+from django.apps import apps
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def migration_fingerprint():
+    """
+    Fingerabdruck aller Migrationsdateien der installierten Apps.
+
+    Returns:
+        int: Positiver 28-Bit-Wert (passt in PRAGMA user_version)
+    """
+    digest = hashlib.sha256()
+    for app_config in sorted(apps.get_app_configs(), key=lambda app_config: app_config.label):
+        directory = Path(app_config.path) / 'migrations'
+        if not directory.is_dir():
+            continue
+        for path in sorted(directory.glob('*.py')):
+            digest.update(f'{app_config.label}/{path.name}'.encode())
+            digest.update(path.read_bytes())
+    return int(digest.hexdigest()[:7], 16) or 1
+
+
+def stored_fingerprint(using=DEFAULT_DB_ALIAS):
+    with connections[using].cursor() as cursor:
+        cursor.execute('PRAGMA user_version')
+        return cursor.fetchone()[0]
+
+
+def store_fingerprint(fingerprint, using=DEFAULT_DB_ALIAS):
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'PRAGMA user_version = {int(fingerprint)}')
+
+
+def is_current():
+    """True, wenn die Datenbank zuletzt mit genau diesen Migrationen migriert wurde"""
+    return stored_fingerprint() == migration_fingerprint()
+
+
+def is_migrated(using=DEFAULT_DB_ALIAS):
+    """
+    True, wenn keine Migrationen mehr ausstehen.
+
+    Schneller Weg über den Fingerabdruck; nur wenn dieser abweicht (z.B.
+    nach einem manuellen migrate), wird der Migrationsgraph geladen.
+    """
+    if stored_fingerprint(using) == migration_fingerprint():
+        return True
+
+    from django.db.migrations.executor import MigrationExecutor
+    executor = MigrationExecutor(connections[using])
+    return not executor.migration_plan(executor.loader.graph.leaf_nodes())
+
+
+def ensure_current(verbosity=1):
+    """
+    Migrationen ausführen, falls das Schema nicht aktuell ist.
+
+    Returns:
+        bool: True, wenn migriert wurde
+    """
+    fingerprint = migration_fingerprint()
+    if stored_fingerprint() == fingerprint:
+        return False
+    call_command('migrate', run_syncdb=True, interactive=False, verbosity=verbosity)
+    store_fingerprint(fingerprint)
+    return True
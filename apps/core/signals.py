@@ -0,0 +1,51 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_migrate
+
+from apps.members.models import Member
+from apps.qualifications.models import MedicalExamType, Qualification, QualificationCategory
+from apps.scheduling.models import Assignment, Duty, DutyType
+from apps.vehicles.models import Position, Vehicle, VehicleType
+from . import dashboard, refdata, schema
+from .models import Settings
+
+
+REFERENCE_MODELS = [Settings, Qualification, QualificationCategory, Position, VehicleType, DutyType, MedicalExamType]
+
+# Modelle, deren Änderungen die Dashboard-Kennzahlen beeinflussen
+DASHBOARD_MODELS = [Member, Vehicle, Duty, Assignment]
+
+
+def invalidate_reference_data(sender, raw=False, **kwargs):
+    """Stammdaten-Cache nach Änderungen verwerfen"""
+    if raw:
+        return
+    refdata.invalidate()
+
+
+for model in REFERENCE_MODELS:
+    post_save.connect(invalidate_reference_data, sender=model, dispatch_uid=f'refdata_save_{model.__name__}')
+    post_delete.connect(invalidate_reference_data, sender=model, dispatch_uid=f'refdata_delete_{model.__name__}')
+
+
+def invalidate_dashboard(sender, raw=False, **kwargs):
+    """Dashboard-Kennzahlen nach Änderungen verwerfen"""
+    if raw:
+        return
+    transaction.on_commit(dashboard.invalidate)
+
+
+for model in DASHBOARD_MODELS:
+    post_save.connect(invalidate_dashboard, sender=model, dispatch_uid=f'dashboard_save_{model.__name__}')
+    post_delete.connect(invalidate_dashboard, sender=model, dispatch_uid=f'dashboard_delete_{model.__name__}')
+
+
+def clear_schema_fingerprint(sender, using='default', **kwargs):
+    """
+    Jeder migrate-Lauf (auch manuell, z.B. zurück auf eine ältere Migration)
+    macht den gespeicherten Fingerabdruck ungültig; nur ensure_current()
+    setzt ihn nach erfolgreicher Migration neu.
+    """
+    schema.store_fingerprint(0, using)
+
+
+pre_migrate.connect(clear_schema_fingerprint, dispatch_uid='schema_fingerprint_clear')
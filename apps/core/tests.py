@@ -1,3 +1,282 @@
-from django.test import TestCase
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.sql import emit_pre_migrate_signal
+from django.db import OperationalError, connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.db.models import F
+from django.test import TestCase, override_settings
+
+from apps.members.models import Member
+from apps.qualifications.models import MedicalExamType, Qualification
+from apps.scheduling.models import Duty
+from apps.vehicles.models import Position
+from . import dashboard, refdata, schema
+from .dates import add_months
+from .models import CacheVersion
+
+
+class MigrationFingerprintTests(TestCase):
+    """Fingerabdruck der Migrationen in PRAGMA user_version (apps.core.schema)"""
+
+    def test_fingerprint_fits_user_version(self):
+        fingerprint = schema.migration_fingerprint()
+        self.assertGreater(fingerprint, 0)
+        self.assertLess(fingerprint, 2 ** 28)
+        self.assertEqual(fingerprint, schema.migration_fingerprint())
+
+    def test_fingerprint_changes_with_migration_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            migrations = Path(directory) / 'migrations'
+            migrations.mkdir()
+            (migrations / '0001_initial.py').write_text('operations = []\n')
+            app_configs = [SimpleNamespace(label='demo', path=directory)]
+
+            with mock.patch.object(schema.apps, 'get_app_configs', return_value=app_configs):
+                initial = schema.migration_fingerprint()
+                (migrations / '0001_initial.py').write_text('operations = [None]\n')
+                changed = schema.migration_fingerprint()
+                (migrations / '0002_more.py').write_text('operations = []\n')
+                added = schema.migration_fingerprint()
+
+        self.assertEqual(len({initial, changed, added}), 3)
+
+    def test_store_and_compare(self):
+        schema.store_fingerprint(schema.migration_fingerprint())
+        self.assertTrue(schema.is_current())
+
+        schema.store_fingerprint(0)
+        self.assertEqual(schema.stored_fingerprint(), 0)
+        self.assertFalse(schema.is_current())
+
+    def test_is_migrated_falls_back_to_migration_plan(self):
+        # Testdatenbank ist vollständig migriert, aber ohne Fingerabdruck
+        schema.store_fingerprint(0)
+        self.assertTrue(schema.is_migrated())
+
+        with mock.patch('django.db.migrations.executor.MigrationExecutor.migration_plan', return_value=['pending']):
+            self.assertFalse(schema.is_migrated())
+            schema.store_fingerprint(schema.migration_fingerprint())
+            self.assertTrue(schema.is_migrated())
+
+    def test_ensure_current_migrates_only_on_mismatch(self):
+        schema.store_fingerprint(0)
+        with mock.patch.object(schema, 'call_command') as call_command:
+            self.assertTrue(schema.ensure_current(verbosity=0))
+            call_command.assert_called_once()
+            self.assertEqual(call_command.call_args.args, ('migrate',))
+            self.assertTrue(schema.is_current())
+
+            call_command.reset_mock()
+            self.assertFalse(schema.ensure_current(verbosity=0))
+            call_command.assert_not_called()
+
+    def test_migrate_clears_fingerprint(self):
+        schema.store_fingerprint(schema.migration_fingerprint())
+
+        emit_pre_migrate_signal(verbosity=0, interactive=False, db='default')
+
+        self.assertEqual(schema.stored_fingerprint(), 0)
+
+
+class HealthCheckTests(TestCase):
+    """/healthz für den Electron-Starter (apps.core.middleware)"""
+
+    def test_ready(self):
+        schema.store_fingerprint(schema.migration_fingerprint())
+
+        response = self.client.get('/healthz')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'ok', 'database': True, 'migrations': True})
+        self.assertEqual(response['Cache-Control'], 'no-store')
+        self.assertNotIn('sessionid', response.cookies)
+        self.assertNotIn('csrftoken', response.cookies)
+
+    def test_trailing_slash_and_no_login_required(self):
+        response = self.client.get('/healthz/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_pending_migrations(self):
+        with mock.patch.object(schema, 'is_migrated', return_value=False), self.assertLogs('django.request', 'ERROR'):
+            response = self.client.get('/healthz')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {'status': 'unavailable', 'database': True, 'migrations': False})
+        self.assertEqual(response['Cache-Control'], 'no-store')
+
+    def test_database_unavailable(self):
+        connection = mock.Mock()
+        connection.cursor.side_effect = OperationalError('unable to open database file')
+        with mock.patch('apps.core.middleware.connection', connection), self.assertLogs('django.request', 'ERROR'):
+            response = self.client.get('/healthz')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {'status': 'unavailable', 'database': False, 'migrations': False})
+
+    def test_other_paths_pass_through(self):
+        response = self.client.get('/healthz-report')
+        self.assertNotEqual(response['Content-Type'], 'application/json')
+
+
+@override_settings(REFERENCE_DATA_CHECK_INTERVAL=2)
+class ReferenceDataTests(TestCase):
+    """Prozesslokaler Stammdaten-Cache und seine Versionsnummer (apps.core.refdata)"""
+
+    def setUp(self):
+        refdata.clear()
+        self.addCleanup(refdata.clear)
+
+    def test_changes_bump_version(self):
+        for model, values in [
+            (MedicalExamType, {'code': 'G26.3', 'name': 'Atemschutz'}),
+            (Qualification, {'code': 'AGT', 'name': 'Atemschutzgeräteträger'}),
+            (Position, {'name': 'Maschinist', 'short_name': 'MA'}),
+        ]:
+            version = refdata.stored_version()
+            instance = model.objects.create(**values)
+            self.assertEqual(refdata.stored_version(), version + 1, model.__name__)
+
+            instance.name = 'Geändert'
+            instance.save()
+            self.assertEqual(refdata.stored_version(), version + 2, model.__name__)
+
+            instance.delete()
+            self.assertEqual(refdata.stored_version(), version + 3, model.__name__)
+
+    def test_same_process_sees_changes_immediately(self):
+        self.assertIsNone(refdata.reference_data().qualification('AGT'))
+
+        Qualification.objects.create(code='AGT', name='Atemschutzgeräteträger')
+
+        self.assertEqual(refdata.reference_data().qualification('AGT').name, 'Atemschutzgeräteträger')
+
+    def test_other_process_changes_after_check_interval(self):
+        qualification = Qualification.objects.create(code='AGT', name='Atemschutzgeräteträger')
+
+        with mock.patch.object(refdata.time, 'monotonic', return_value=1000.0) as monotonic:
+            snapshot = refdata.reference_data()
+
+            # Anderer Prozess: Änderung ohne Signale in diesem Prozess, nur die Versionsnummer steigt
+            Qualification.objects.filter(pk=qualification.pk).update(name='Atemschutz')
+            CacheVersion.objects.filter(key=refdata.VERSION_KEY).update(version=F('version') + 1)
+
+            monotonic.return_value = 1001.9
+            with self.assertNumQueries(0):
+                self.assertIs(refdata.reference_data(), snapshot)
+
+            monotonic.return_value = 1002.0
+            reloaded = refdata.reference_data()
+
+        self.assertIsNot(reloaded, snapshot)
+        self.assertEqual(reloaded.version, refdata.stored_version())
+        self.assertEqual(reloaded.qualification('AGT').name, 'Atemschutz')
+
+    def test_unchanged_version_keeps_snapshot(self):
+        with mock.patch.object(refdata.time, 'monotonic', return_value=1000.0) as monotonic:
+            snapshot = refdata.reference_data()
+            monotonic.return_value = 1010.0
+            with self.assertNumQueries(1):
+                self.assertIs(refdata.reference_data(), snapshot)
+
+
+class DashboardSummaryTests(TestCase):
+    """Zwischengespeicherte Dashboard-Kennzahlen (apps.core.dashboard)"""
+
+    today = date(2026, 10, 19)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_summary_is_cached(self):
+        Member.objects.create(first_name='Anna', last_name='Alt', status='active')
+        self.assertEqual(dashboard.dashboard_summary(self.today)['active_members'], 1)
+
+        # Ohne Signal (z.B. queryset.update) bleibt der Cache bestehen
+        Member.objects.update(status='inactive')
+        with self.assertNumQueries(0):
+            self.assertEqual(dashboard.dashboard_summary(self.today)['active_members'], 1)
+
+        # Anderer Tag, anderer Schlüssel
+        self.assertEqual(dashboard.dashboard_summary(self.today + timedelta(days=1))['active_members'], 0)
+
+    def test_changes_invalidate_after_commit(self):
+        self.assertEqual(dashboard.dashboard_summary(self.today)['active_members'], 0)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            member = Member.objects.create(first_name='Anna', last_name='Alt', status='active')
+            Duty.objects.create(title='Übungsdienst', date=self.today)
+        self.assertIn(dashboard.invalidate, callbacks)
+        # Vor dem Commit noch der alte Stand
+        self.assertEqual(dashboard.dashboard_summary(self.today)['active_members'], 0)
+
+        for callback in callbacks:
+            callback()
+        summary = dashboard.dashboard_summary(self.today)
+        self.assertEqual((summary['active_members'], summary['duties_this_month']), (1, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            member.delete()
+        self.assertEqual(dashboard.dashboard_summary(self.today)['active_members'], 0)
+
+    def test_invalidate_without_version_key(self):
+        dashboard.invalidate()
+        self.assertEqual(cache.get(dashboard.VERSION_KEY), 1)
+
+        version = dashboard.cache_version()
+        dashboard.invalidate()
+        self.assertEqual(dashboard.cache_version(), version + 1)
+
+
+class SqlitePragmaTests(TestCase):
+    """settings.SQLITE_PRAGMAS gelten für jede neue Verbindung"""
+
+    def pragmas(self, cursor, names=('journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store')):
+        values = {}
+        for name in names:
+            cursor.execute(f'PRAGMA {name}')
+            values[name] = cursor.fetchone()[0]
+        return values
+
+    def test_new_file_connection(self):
+        with tempfile.TemporaryDirectory() as directory:
+            wrapper = DatabaseWrapper(
+                {**connection.settings_dict, 'NAME': str(Path(directory) / 'pragmas.sqlite3')}, alias='pragmas'
+            )
+            try:
+                with wrapper.cursor() as cursor:
+                    pragmas = self.pragmas(cursor)
+            finally:
+                wrapper.close()
+
+        self.assertEqual(pragmas, {
+            'journal_mode': 'wal',
+            'synchronous': 1,
+            'cache_size': settings.SQLITE_PRAGMAS['cache_size'],
+            'mmap_size': settings.SQLITE_PRAGMAS['mmap_size'],
+            'temp_store': 2,
+        })
+
+    def test_test_database_connection(self):
+        # Testdatenbank liegt im Speicher (kein WAL, kein Memory-Mapping), die übrigen Pragmas gelten
+        with connection.cursor() as cursor:
+            pragmas = self.pragmas(cursor, ['synchronous', 'cache_size', 'temp_store'])
+
+        self.assertEqual((pragmas['synchronous'], pragmas['temp_store']), (1, 2))
+        self.assertEqual(pragmas['cache_size'], settings.SQLITE_PRAGMAS['cache_size'])
+
+
+class AddMonthsTests(TestCase):
+    """Monatsrechnung mit Monatsende und Schaltjahren (apps.core.dates)"""
+
+    def test_month_end_and_leap_day(self):
+        self.assertEqual(add_months(date(2026, 1, 31), 1), date(2026, 2, 28))
+        self.assertEqual(add_months(date(2028, 1, 31), 1), date(2028, 2, 29))
+        self.assertEqual(add_months(date(2028, 2, 29), -12), date(2027, 2, 28))
+        self.assertEqual(add_months(date(2028, 2, 29), 48), date(2032, 2, 29))
+        self.assertEqual(add_months(date(2026, 10, 19), 36), date(2029, 10, 19))
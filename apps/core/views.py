@@ -8,11 +8,13 @@ from django.http import HttpResponse
 from datetime import timedelta
 from functools import wraps
 
+from .dashboard import dashboard_summary
 from .models import Settings, User, AuditLog
-from apps.members.models import Member, Unit
-from apps.vehicles.models import Vehicle, VehicleType, Position
+from .refdata import reference_data
+from apps.members.models import Unit
+from apps.vehicles.models import VehicleType, Position
 from apps.qualifications.models import Qualification, QualificationCategory
-from apps.scheduling.models import Duty, Assignment, DutyType
+from apps.scheduling.models import Duty, DutyType
 
 
 def admin_required(view_func):
@@ -123,7 +125,8 @@ def logout_view(request):
 @login_required
 def dashboard(request):
     # Prüfen ob Settings existieren, sonst Setup-Wizard
-    if not Settings.objects.exists():
+    settings = reference_data().settings
+    if settings is None:
         if request.user.is_superuser:
             return redirect('setup_wizard')
         else:
@@ -133,51 +136,24 @@ def dashboard(request):
     today = timezone.now().date()
     week_ahead = today + timedelta(days=7)
 
-    # Statistiken
-    active_members = Member.objects.filter(
-        is_active=True,
-        status='active'
-    ).count()
-
-    active_vehicles = Vehicle.objects.filter(
-        is_active=True
-    ).count()
-
     # Kommende Dienste
     upcoming_duties = Duty.objects.filter(
         date__gte=today,
         date__lte=week_ahead
     ).exclude(status='cancelled').order_by('date', 'start_time')[:5]
 
-    # Dienste diesen Monat
-    month_start = today.replace(day=1)
-    duties_this_month = Duty.objects.filter(
-        date__gte=month_start,
-        date__lte=today
-    ).exclude(status='cancelled').count()
-
-    # Offene Positionen
-    open_positions = Assignment.objects.filter(
-        duty__date__gte=today,
-        member__isnull=True
-    ).count()
-
-    # Qualifikationen die bald ablaufen
-    from apps.qualifications.models import MedicalExam
-    expiring_soon = MedicalExam.objects.filter(
-        valid_until__gte=today,
-        valid_until__lte=today + timedelta(days=60)
-    ).select_related('member', 'exam_type').order_by('valid_until')[:5]
+    # Untersuchungen und Übungsnachweise die bald ablaufen
+    from apps.qualifications.expiry import EXPIRY_WARNING_DAYS, expiring
+    expiring_soon = expiring(today, EXPIRY_WARNING_DAYS).order_by('expires_on')[:10]
 
     context = {
-        'active_members': active_members,
-        'active_vehicles': active_vehicles,
+        # Statistiken (aktive Mitglieder/Fahrzeuge, Dienste diesen Monat, offene Positionen)
+        **dashboard_summary(today),
         'upcoming_duties': upcoming_duties,
-        'duties_this_month': duties_this_month,
-        'open_positions': open_positions,
         'expiring_soon': expiring_soon,
+        'expiry_warning_days': EXPIRY_WARNING_DAYS,
         'today': today,
-        'settings': Settings.get_instance() if Settings.objects.exists() else None,
+        'settings': settings,
     }
 
     return render(request, 'core/dashboard.html', context)
@@ -273,6 +249,12 @@ def create_default_qualifications():
         quals['GF'].covers.add(quals['TF'])
     if 'ZF' in quals and 'GF' in quals:
         quals['ZF'].covers.add(quals['GF'])
+    if 'VF' in quals and 'ZF' in quals:
+        quals['VF'].covers.add(quals['ZF'])
+    if 'TM2' in quals and 'TM1' in quals:
+        quals['TM2'].covers.add(quals['TM1'])
+    if 'ABC2' in quals and 'ABC1' in quals:
+        quals['ABC2'].covers.add(quals['ABC1'])
 
     # G26.3 Untersuchungstyp
     from apps.qualifications.models import MedicalExamType
@@ -0,0 +1,207 @@
+"""
+CSV-Import für Mitglieder.
+
+Ablauf:
+1. Alle bestehenden Mitglieder und Einheiten mit je einer Abfrage laden
+   und daraus Nachschlage-Tabellen im Speicher aufbauen
+2. Jede Zeile als Neuanlage oder Aktualisierung einordnen
+3. Fehlende Einheiten, neue und geänderte Mitglieder gesammelt per
+   bulk_create/bulk_update in einer einzigen Transaktion schreiben
+   und Suchindex sowie Eignungen für diese Mitglieder nachziehen
+"""
+
+import csv
+import io
+from datetime import datetime
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core import dashboard
+from apps.vehicles import eligibility, readiness
+from .models import Member, Unit
+from .search import index_members
+
+
+# Status-Mapping (deutsch -> english)
+STATUS_MAPPING = {
+    'aktiv': 'active',
+    'inaktiv': 'inactive',
+    'jugendfeuerwehr': 'youth',
+    'jugend': 'youth',
+    'altersabteilung': 'honorary',
+    'ehrenabteilung': 'honorary',
+    'reserve': 'reserve',
+}
+
+# Felder, die bei bestehenden Mitgliedern überschrieben werden
+UPDATE_FIELDS = [
+    'first_name', 'last_name', 'birth_date', 'email', 'phone', 'mobile',
+    'member_number', 'entry_date', 'status', 'unit', 'notes', 'updated_at',
+]
+
+
+def parse_date(date_str):
+    """Datum in deutschem oder ISO-Format parsen"""
+    if not date_str or not date_str.strip():
+        return None
+    date_str = date_str.strip()
+    for fmt in ['%d.%m.%Y', '%Y-%m-%d', '%d/%m/%Y']:
+        try:
+            return datetime.strptime(date_str, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def decode_csv(content):
+    """Hochgeladene CSV-Datei (UTF-8 mit optionalem BOM) dekodieren"""
+    return content.decode('utf-8-sig')
+
+
+def read_csv(content):
+    """CSV-Inhalt (Semikolon-getrennt, Bytes oder Text) als Zeilen-Dicts lesen"""
+    if isinstance(content, bytes):
+        content = decode_csv(content)
+    return list(csv.DictReader(io.StringIO(content), delimiter=';'))
+
+
+class MemberImporter:
+    """Importiert Mitglieder-Zeilen mit wenigen Massen-Abfragen"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.created_count = 0
+        self.updated_count = 0
+        self.errors = []
+
+        self.to_create = []
+        self.to_update = {}  # id -> Member
+        self.member_units = {}  # id(Member) -> (Member, Einheitsname)
+
+    @property
+    def error_count(self):
+        return len(self.errors)
+
+    def build_lookups(self):
+        """Nachschlage-Tabellen für bestehende Mitglieder und Einheiten aufbauen"""
+        self.by_number = {}
+        self.by_name = {}
+        for member in Member.objects.order_by('last_name', 'first_name', 'id'):
+            self.register(member)
+
+        self.units = {unit.name: unit for unit in Unit.objects.all()}
+
+    def register(self, member):
+        """Mitglied unter Mitgliedsnummer und Name/Geburtsdatum auffindbar machen"""
+        if member.member_number:
+            self.by_number.setdefault(member.member_number, member)
+        key = (member.first_name.casefold(), member.last_name.casefold(), member.birth_date)
+        self.by_name.setdefault(key, member)
+
+    def find_existing(self, member_number, first_name, last_name, birth_date):
+        """Bestehendes Mitglied nach Mitgliedsnummer oder Name + Geburtsdatum suchen"""
+        member = None
+        if member_number:
+            member = self.by_number.get(member_number)
+        if not member:
+            member = self.by_name.get((first_name.casefold(), last_name.casefold(), birth_date))
+        return member
+
+    def classify_row(self, row_num, row):
+        """Eine CSV-Zeile als Neuanlage oder Aktualisierung einordnen"""
+        # Pflichtfelder prüfen
+        vorname = row.get('vorname', '').strip()
+        nachname = row.get('nachname', '').strip()
+
+        if not vorname or not nachname:
+            self.errors.append(f'Zeile {row_num}: Vor- und Nachname sind erforderlich.')
+            return
+
+        # Status konvertieren
+        status_raw = row.get('status', 'aktiv').strip().lower()
+        status = STATUS_MAPPING.get(status_raw, 'active')
+
+        birth_date = parse_date(row.get('geburtsdatum', ''))
+        entry_date = parse_date(row.get('eintrittsdatum', ''))
+        member_number = row.get('mitgliedsnummer', '').strip()
+
+        member = self.find_existing(member_number, vorname, nachname, birth_date)
+
+        if member is None:
+            member = Member(is_active=True)
+            self.to_create.append(member)
+            self.created_count += 1
+        else:
+            if member.pk:
+                self.to_update[member.pk] = member
+            self.updated_count += 1
+
+        member.first_name = vorname
+        member.last_name = nachname
+        member.birth_date = birth_date
+        member.email = row.get('email', '').strip()
+        member.phone = row.get('telefon', '').strip()
+        member.mobile = row.get('mobil', '').strip()
+        member.member_number = member_number
+        member.entry_date = entry_date
+        member.status = status
+        member.notes = row.get('bemerkungen', '').strip()
+        # Einheit wird erst nach dem Anlegen fehlender Einheiten gesetzt
+        self.member_units[id(member)] = (member, row.get('einheit', '').strip())
+
+        self.register(member)
+
+    def classify(self, on_row=None):
+        """
+        Alle Zeilen einordnen.
+
+        Args:
+            on_row: Optionaler Callback (verarbeitete Zeilen) für Fortschrittsanzeigen
+        """
+        for index, row in enumerate(self.rows, start=1):
+            row_num = index + 1  # Zeile 1 ist die Kopfzeile
+            try:
+                self.classify_row(row_num, row)
+            except Exception as e:
+                self.errors.append(f'Zeile {row_num}: {str(e)}')
+            if on_row:
+                on_row(index)
+
+    @transaction.atomic
+    def apply(self):
+        """Einheiten und Mitglieder gesammelt schreiben"""
+        missing_units = {
+            name for _, name in self.member_units.values()
+            if name and name not in self.units
+        }
+        for unit in Unit.objects.bulk_create([
+            Unit(name=name, is_active=True) for name in sorted(missing_units)
+        ]):
+            self.units[unit.name] = unit
+
+        for member, name in self.member_units.values():
+            member.unit = self.units[name] if name else None
+
+        now = timezone.now()
+        for member in self.to_update.values():
+            member.updated_at = now
+
+        Member.objects.bulk_create(self.to_create)
+        Member.objects.bulk_update(list(self.to_update.values()), UPDATE_FIELDS)
+
+        # bulk_create/bulk_update lösen keine Signale aus
+        index_members([member.pk for member in self.to_create] + list(self.to_update))
+        eligibility.refresh(member_ids=[member.pk for member in self.to_create])
+        transaction.on_commit(dashboard.invalidate)
+        transaction.on_commit(readiness.invalidate)
+
+    def run(self, on_row=None, dry_run=False, on_apply=None):
+        """Import durchführen (bei dry_run nur prüfen); on_apply wird vor dem Speichern aufgerufen"""
+        self.build_lookups()
+        self.classify(on_row)
+        if not dry_run:
+            if on_apply:
+                on_apply()
+            self.apply()
+        return self
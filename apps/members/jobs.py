@@ -0,0 +1,183 @@
+"""
+Hintergrund-Verarbeitung von CSV-Importen.
+
+Ein Import-Job wird entweder direkt nach dem Hochladen in einem Thread des
+laufenden Servers verarbeitet oder vom Management-Command
+process_import_jobs (z.B. als separater Worker-Prozess). Ein Job wird vor
+der Verarbeitung per bedingtem Update beansprucht, sodass er auch bei
+mehreren Workern nur einmal läuft.
+
+Probeläufe (dry_run) prüfen nur die Zeilen und behalten den Dateiinhalt,
+bis sie über import_job_confirm als echter Import übernommen werden.
+
+Wird der Server während eines Imports beendet, bleibt der Job als 'läuft'
+stehen. Solche Jobs werden nach IMPORT_JOB_TIMEOUT_MINUTES als
+fehlgeschlagen markiert; beim Serverstart (resume_jobs) werden außerdem
+liegen gebliebene wartende Jobs verarbeitet.
+"""
+
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.qualifications.importer import MedicalExamImporter
+from .importer import MemberImporter, read_csv
+from .models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+# Importer je Job-Art
+IMPORTERS = {
+    ImportJob.Kind.MEMBERS: MemberImporter,
+    ImportJob.Kind.MEDICAL_EXAMS: MedicalExamImporter,
+}
+
+# Fortschritt alle n Zeilen in die Datenbank schreiben
+PROGRESS_INTERVAL = 100
+
+# Statusmeldung, während die geprüften Zeilen gespeichert werden
+APPLY_MESSAGE = 'Alle Zeilen geprüft, die Änderungen werden gespeichert …'
+
+
+def claim_job(job_id):
+    """Job von 'wartend' auf 'läuft' setzen; False wenn ihn schon jemand anderes verarbeitet"""
+    return ImportJob.objects.filter(
+        pk=job_id,
+        status=ImportJob.Status.PENDING
+    ).update(status=ImportJob.Status.RUNNING, started_at=timezone.now()) == 1
+
+
+def run_import_job(job_id):
+    """Einen wartenden Import-Job verarbeiten"""
+    if not claim_job(job_id):
+        return
+
+    job = ImportJob.objects.get(pk=job_id)
+    jobs = ImportJob.objects.filter(pk=job_id)
+
+    try:
+        rows = read_csv(job.content)
+        jobs.update(total_rows=len(rows))
+
+        def on_row(processed):
+            if processed % PROGRESS_INTERVAL == 0:
+                jobs.update(processed_rows=processed)
+
+        def on_apply():
+            # Alle Zeilen geprüft; das gesammelte Schreiben kann dauern
+            jobs.update(processed_rows=len(rows), message=APPLY_MESSAGE)
+
+        importer = IMPORTERS[job.kind](rows).run(on_row, dry_run=job.dry_run, on_apply=on_apply)
+
+        jobs.update(
+            status=ImportJob.Status.COMPLETED,
+            processed_rows=len(rows),
+            message='',
+            created_count=importer.created_count,
+            updated_count=importer.updated_count,
+            error_count=importer.error_count,
+            errors=importer.errors,
+            # Probeläufe behalten den Inhalt für die spätere Übernahme
+            content=job.content if job.dry_run else '',
+            finished_at=timezone.now()
+        )
+    except Exception as e:
+        logger.exception('Import-Job %s fehlgeschlagen', job_id)
+        jobs.update(
+            status=ImportJob.Status.FAILED,
+            message=f'Fehler beim Verarbeiten der CSV-Datei: {str(e)}',
+            content='',
+            finished_at=timezone.now()
+        )
+
+
+def run_import_job_in_thread(job_id):
+    try:
+        run_import_job(job_id)
+    finally:
+        # Jeder Thread hat eine eigene Datenbankverbindung
+        connection.close()
+
+
+def start_import_job(job):
+    """
+    Job nach dem Commit im Server-Prozess starten.
+
+    Ist IMPORT_JOBS_IN_PROCESS deaktiviert, bleibt der Job wartend und wird
+    von process_import_jobs verarbeitet.
+    """
+    if not getattr(settings, 'IMPORT_JOBS_IN_PROCESS', True):
+        return
+
+    def start():
+        threading.Thread(
+            target=run_import_job_in_thread,
+            args=(job.id,),
+            name=f'import-job-{job.id}',
+            daemon=True
+        ).start()
+
+    transaction.on_commit(start)
+
+
+def fail_stale_jobs():
+    """
+    Abgebrochene Jobs (seit IMPORT_JOB_TIMEOUT_MINUTES 'läuft') als fehlgeschlagen markieren.
+
+    Returns:
+        int: Anzahl der markierten Jobs
+    """
+    timeout = timedelta(minutes=getattr(settings, 'IMPORT_JOB_TIMEOUT_MINUTES', 30))
+    return ImportJob.objects.filter(
+        status=ImportJob.Status.RUNNING,
+        started_at__lt=timezone.now() - timeout
+    ).update(
+        status=ImportJob.Status.FAILED,
+        message='Der Import wurde abgebrochen (Server beendet). Bitte die Datei erneut hochladen.',
+        content='',
+        finished_at=timezone.now()
+    )
+
+
+def process_pending_jobs():
+    """Alle wartenden Jobs nacheinander verarbeiten; gibt die Anzahl zurück"""
+    fail_stale_jobs()
+
+    job_ids = list(ImportJob.objects.filter(
+        status=ImportJob.Status.PENDING
+    ).order_by('created_at').values_list('id', flat=True))
+
+    for job_id in job_ids:
+        run_import_job(job_id)
+    return len(job_ids)
+
+
+def process_pending_jobs_in_thread():
+    try:
+        process_pending_jobs()
+    finally:
+        connection.close()
+
+
+def resume_jobs():
+    """
+    Beim Serverstart: abgebrochene Jobs abschließen und wartende Jobs, die
+    vor einem Neustart nicht mehr verarbeitet wurden, im Hintergrund starten.
+
+    Returns:
+        int: Anzahl der als fehlgeschlagen markierten Jobs
+    """
+    failed = fail_stale_jobs()
+    if getattr(settings, 'IMPORT_JOBS_IN_PROCESS', True) and ImportJob.objects.filter(
+        status=ImportJob.Status.PENDING
+    ).exists():
+        threading.Thread(
+            target=process_pending_jobs_in_thread,
+            name='import-jobs-resume',
+            daemon=True
+        ).start()
+    return failed
@@ -0,0 +1,45 @@
+"""
+Management-Command zum Verarbeiten wartender Import-Jobs.
+
+Wird benötigt, wenn Importe nicht im Server-Prozess laufen sollen
+(IMPORT_JOBS_IN_PROCESS = False), oder um nach einem Neustart liegen
+gebliebene Jobs abzuarbeiten. Jobs, die seit IMPORT_JOB_TIMEOUT_MINUTES
+als 'läuft' markiert sind, werden dabei als fehlgeschlagen abgeschlossen.
+"manage.py serve" erledigt beides beim Start automatisch.
+
+Verwendung:
+    python manage.py process_import_jobs            # einmalig
+    python manage.py process_import_jobs --watch    # dauerhaft als Worker
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.members.jobs import process_pending_jobs
+
+
+class Command(BaseCommand):
+    help = 'Verarbeitet wartende CSV-Import-Jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--watch',
+            action='store_true',
+            help='Dauerhaft laufen und regelmäßig nach neuen Jobs sehen'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Abfrageintervall in Sekunden (mit --watch)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            count = process_pending_jobs()
+            if count:
+                self.stdout.write(self.style.SUCCESS(f'{count} Import-Job(s) verarbeitet'))
+            if not options['watch']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,42 @@
+# Generated by Django 6.0 on 2026-10-19 03:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('members', 'Mitglieder')], default='members', max_length=20, verbose_name='Art')),
+                ('status', models.CharField(choices=[('pending', 'Wartend'), ('running', 'Läuft'), ('completed', 'Abgeschlossen'), ('failed', 'Fehlgeschlagen')], default='pending', max_length=20, verbose_name='Status')),
+                ('file_name', models.CharField(max_length=255, verbose_name='Dateiname')),
+                ('content', models.TextField(blank=True, help_text='Wird nach Abschluss des Imports geleert', verbose_name='Dateiinhalt')),
+                ('total_rows', models.PositiveIntegerField(default=0, verbose_name='Zeilen gesamt')),
+                ('processed_rows', models.PositiveIntegerField(default=0, verbose_name='Zeilen verarbeitet')),
+                ('created_count', models.PositiveIntegerField(default=0, verbose_name='Erstellt')),
+                ('updated_count', models.PositiveIntegerField(default=0, verbose_name='Aktualisiert')),
+                ('error_count', models.PositiveIntegerField(default=0, verbose_name='Fehler')),
+                ('errors', models.JSONField(blank=True, default=list, help_text='["Zeile 4: Vor- und Nachname sind erforderlich."]', verbose_name='Zeilenfehler')),
+                ('message', models.TextField(blank=True, verbose_name='Meldung')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Gestartet')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Beendet')),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='import_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Erstellt von')),
+            ],
+            options={
+                'verbose_name': 'Import',
+                'verbose_name_plural': 'Importe',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 6.0 on 2026-10-19 05:40
+
+import unicodedata
+
+from django.db import migrations
+
+
+# Stand der Schreibweise bei Anlage des Index (siehe apps.members.search);
+# bewusst kopiert, damit spätere Änderungen dort diese Migration nicht verändern
+UMLAUTS = str.maketrans({
+    'ä': 'ae', 'ö': 'oe', 'ü': 'ue', 'ß': 'ss',
+})
+
+
+def strip_diacritics(text):
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def index_text(text):
+    text = (text or '').casefold()
+    folded = strip_diacritics(text.translate(UMLAUTS))
+    plain = strip_diacritics(text)
+    if plain == folded:
+        return folded
+    return f'{folded} {plain}'
+
+
+def build_index(apps, schema_editor):
+    Member = apps.get_model('members', 'Member')
+    db_alias = schema_editor.connection.alias
+
+    rows = Member.objects.using(db_alias).values_list(
+        'id', 'first_name', 'last_name', 'member_number', 'email', 'notes'
+    ).iterator(chunk_size=500)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO members_member_fts (rowid, name, member_number, email, notes) '
+            'VALUES (%s, %s, %s, %s, %s)',
+            [
+                (
+                    member_id,
+                    index_text(f'{first_name} {last_name}'),
+                    index_text(member_number),
+                    index_text(email),
+                    index_text(notes),
+                )
+                for member_id, first_name, last_name, member_number, email, notes in rows
+            ]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0003_import_job'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                'CREATE VIRTUAL TABLE members_member_fts USING fts5('
+                'name, member_number, email, notes, '
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            ),
+            reverse_sql='DROP TABLE members_member_fts',
+        ),
+        migrations.RunPython(build_index, migrations.RunPython.noop),
+    ]
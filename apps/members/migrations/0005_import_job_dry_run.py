@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-19 07:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0004_member_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='dry_run',
+            field=models.BooleanField(default=False, help_text='Zeilen nur prüfen, nichts speichern', verbose_name='Probelauf'),
+        ),
+        migrations.AlterField(
+            model_name='importjob',
+            name='content',
+            field=models.TextField(blank=True, help_text='Wird nach Abschluss des Imports geleert (bei Probeläufen erst nach Übernahme)', verbose_name='Dateiinhalt'),
+        ),
+        migrations.AlterField(
+            model_name='importjob',
+            name='kind',
+            field=models.CharField(choices=[('members', 'Mitglieder'), ('medical_exams', 'Untersuchungen')], default='members', max_length=20, verbose_name='Art'),
+        ),
+    ]
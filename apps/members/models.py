@@ -1,7 +1,7 @@
-from django.db import models
-from django.utils import timezone
 from datetime import date
 
+from django.db import models
+
 
 class Unit(models.Model):
     """Einheit/Gruppe innerhalb einer Feuerwehr (z.B. Löschzug 1, Gruppe A)"""
@@ -19,6 +19,39 @@ class Unit(models.Model):
         return self.name
 
 
+class MemberQuerySet(models.QuerySet):
+    """Massen-Auswertungen für Mitglieder als Annotationen und Filter in SQL"""
+
+    def with_agt_status(self, on_date=None):
+        """Annotiert agt_valid (G26.3 gültig und Belastungsübung im letzten Jahr)"""
+        from apps.qualifications.bulk import agt_valid_expression
+
+        return self.annotate(agt_valid=agt_valid_expression(on_date))
+
+    def with_qualification_codes(self):
+        """Annotiert qualification_codes (effektive Kürzel, kommagetrennt)"""
+        from apps.qualifications.bulk import effective_codes_expression
+
+        return self.annotate(qualification_codes=effective_codes_expression())
+
+    def with_qualification(self, qualification_code):
+        """Nur Mitglieder mit der Qualifikation oder einer abdeckenden"""
+        from apps.qualifications.bulk import has_effective_qualification
+
+        return self.filter(has_effective_qualification(qualification_code))
+
+    def qualified_for(self, vehicle_position, on_date=None):
+        """Nur Mitglieder, die alle Anforderungen einer Fahrzeugposition erfüllen"""
+        from apps.qualifications.bulk import agt_valid_expression
+
+        queryset = self
+        for code in vehicle_position.required_qualifications.values_list('code', flat=True):
+            queryset = queryset.with_qualification(code)
+        if vehicle_position.requires_agt:
+            queryset = queryset.filter(agt_valid_expression(on_date))
+        return queryset
+
+
 class Member(models.Model):
     """Mitglied der Feuerwehr (Kamerad:in)"""
 
@@ -77,6 +110,8 @@ class Member(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField('Aktiv', default=True)
 
+    objects = MemberQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Mitglied'
         verbose_name_plural = 'Mitglieder'
@@ -94,21 +129,55 @@ class Member(models.Model):
         """Prüft ob Mitglied grundsätzlich einsetzbar ist"""
         return self.is_active and self.status == self.Status.ACTIVE
 
+    @property
+    def qualification_code_list(self):
+        """Effektive Qualifikationskürzel (aus der Annotation qualification_codes)"""
+        codes = getattr(self, 'qualification_codes', None)
+        return codes.split(',') if codes else []
+
     def has_qualification(self, qualification_code):
         """Prüft ob Mitglied eine Qualifikation besitzt"""
+        # Vorab geladene Qualifikationen (prefetch_related) wiederverwenden
+        prefetched = getattr(self, '_prefetched_objects_cache', {}).get('qualifications')
+        if prefetched is not None:
+            return any(mq.qualification.code == qualification_code for mq in prefetched)
+
         return self.qualifications.filter(
             qualification__code=qualification_code
         ).exists()
 
-    def has_valid_agt_status(self):
+    def has_valid_agt_status(self, on_date=None):
         """Prüft ob AGT-Status gültig ist (G26.3 + Übungen)"""
+        from apps.qualifications.bulk import agt_exercise_cutoff
         from apps.qualifications.models import MedicalExam, ExerciseRecord
 
+        # Annotation aus MemberQuerySet.with_agt_status()
+        if hasattr(self, 'agt_valid'):
+            return self.agt_valid
+
+        # Gleicher Stichtag wie agt_valid_expression/agt_valid_member_ids
+        today = on_date or date.today()
+        one_year_ago = agt_exercise_cutoff(today)
+
+        # Vorab geladene Untersuchungen und Übungen wiederverwenden
+        prefetched = getattr(self, '_prefetched_objects_cache', {})
+        if 'medical_exams' in prefetched and 'exercise_records' in prefetched:
+            g26_valid = any(
+                exam.exam_type.code == 'G26.3'
+                and exam.result_positive
+                and exam.valid_until and exam.valid_until >= today
+                for exam in prefetched['medical_exams']
+            )
+            return g26_valid and any(
+                record.qualification.code == 'AGT' and record.exercise_date >= one_year_ago
+                for record in prefetched['exercise_records']
+            )
+
         # Prüfe G26.3
         g26_valid = MedicalExam.objects.filter(
             member=self,
             exam_type__code='G26.3',
-            valid_until__gte=timezone.now().date(),
+            valid_until__gte=today,
             result_positive=True
         ).exists()
 
@@ -116,7 +185,6 @@ class Member(models.Model):
             return False
 
         # Prüfe Übungen im letzten Jahr
-        one_year_ago = date.today().replace(year=date.today().year - 1)
         exercise_count = ExerciseRecord.objects.filter(
             member=self,
             qualification__code='AGT',
@@ -163,3 +231,84 @@ class Availability(models.Model):
 
     def __str__(self):
         return f"{self.member} - {self.duty}: {self.get_status_display()}"
+
+
+class ImportJob(models.Model):
+    """CSV-Import, der im Hintergrund verarbeitet wird (mit Fortschrittsanzeige)"""
+
+    class Kind(models.TextChoices):
+        MEMBERS = 'members', 'Mitglieder'
+        MEDICAL_EXAMS = 'medical_exams', 'Untersuchungen'
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Wartend'
+        RUNNING = 'running', 'Läuft'
+        COMPLETED = 'completed', 'Abgeschlossen'
+        FAILED = 'failed', 'Fehlgeschlagen'
+
+    kind = models.CharField(
+        'Art',
+        max_length=20,
+        choices=Kind.choices,
+        default=Kind.MEMBERS
+    )
+    status = models.CharField(
+        'Status',
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING
+    )
+    file_name = models.CharField('Dateiname', max_length=255)
+    content = models.TextField(
+        'Dateiinhalt',
+        blank=True,
+        help_text='Wird nach Abschluss des Imports geleert (bei Probeläufen erst nach Übernahme)'
+    )
+    dry_run = models.BooleanField(
+        'Probelauf',
+        default=False,
+        help_text='Zeilen nur prüfen, nichts speichern'
+    )
+
+    # Fortschritt
+    total_rows = models.PositiveIntegerField('Zeilen gesamt', default=0)
+    processed_rows = models.PositiveIntegerField('Zeilen verarbeitet', default=0)
+    created_count = models.PositiveIntegerField('Erstellt', default=0)
+    updated_count = models.PositiveIntegerField('Aktualisiert', default=0)
+    error_count = models.PositiveIntegerField('Fehler', default=0)
+    errors = models.JSONField(
+        'Zeilenfehler',
+        default=list,
+        blank=True,
+        help_text='["Zeile 4: Vor- und Nachname sind erforderlich."]'
+    )
+    message = models.TextField('Meldung', blank=True)
+
+    created_by = models.ForeignKey(
+        'core.User',
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='import_jobs',
+        verbose_name='Erstellt von'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField('Gestartet', null=True, blank=True)
+    finished_at = models.DateTimeField('Beendet', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Import'
+        verbose_name_plural = 'Importe'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.file_name} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self):
+        return self.status in [self.Status.COMPLETED, self.Status.FAILED]
+
+    @property
+    def progress_percent(self):
+        if not self.total_rows:
+            return 100 if self.is_finished else 0
+        return int(self.processed_rows * 100 / self.total_rows)
@@ -0,0 +1,149 @@
+"""
+Volltextsuche für Mitglieder (SQLite FTS5).
+
+Die Tabelle members_member_fts enthält je Mitglied (rowid = Member.id)
+Name, Mitgliedsnummer, E-Mail und Bemerkungen in gefalteter Schreibweise.
+Umlaute werden dabei doppelt abgelegt ("Müller" -> "mueller muller"),
+damit sowohl "Müller", "Mueller" als auch "Muller" gefunden werden.
+
+Der Index wird über Signale (Einzel-Speichern) und vom CSV-Import
+(Massen-Schreiben ohne Signale) aktuell gehalten.
+"""
+
+import re
+import unicodedata
+
+from django.db import connection
+
+
+FTS_TABLE = 'members_member_fts'
+
+# Maximale Anzahl Treffer einer Suche
+SEARCH_LIMIT = 200
+
+# Gewichtung der Spalten für bm25 (name, member_number, email, notes)
+COLUMN_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+UMLAUTS = str.maketrans({
+    'ä': 'ae', 'ö': 'oe', 'ü': 'ue', 'ß': 'ss',
+})
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def strip_diacritics(text):
+    """Diakritische Zeichen entfernen (é -> e, ü -> u)"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def fold(text):
+    """Text für Index und Suche vereinheitlichen"""
+    text = (text or '').casefold()
+    return strip_diacritics(text.translate(UMLAUTS))
+
+
+def index_text(text):
+    """Indexierter Text: Umlaute als Umschreibung und ohne Punkte"""
+    text = (text or '').casefold()
+    folded = fold(text)
+    plain = strip_diacritics(text)
+    if plain == folded:
+        return folded
+    return f'{folded} {plain}'
+
+
+def build_query(search):
+    """Suchbegriff in eine FTS5-Abfrage mit Präfix-Suche je Wort umwandeln"""
+    tokens = TOKEN_RE.findall(fold(search))
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def index_rows(rows):
+    """Zeilen (id, first_name, last_name, member_number, email, notes) in den Index schreiben"""
+    rows = list(rows)
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+            [(row[0],) for row in rows]
+        )
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, member_number, email, notes) '
+            f'VALUES (%s, %s, %s, %s, %s)',
+            [
+                (
+                    member_id,
+                    index_text(f'{first_name} {last_name}'),
+                    index_text(member_number),
+                    index_text(email),
+                    index_text(notes),
+                )
+                for member_id, first_name, last_name, member_number, email, notes in rows
+            ]
+        )
+
+
+def index_members(member_ids):
+    """Index für die angegebenen Mitglieder aktualisieren"""
+    from .models import Member
+
+    member_ids = list(member_ids)
+    # In Blöcken, um die Parametergrenze von SQLite nicht zu überschreiten
+    for start in range(0, len(member_ids), 500):
+        index_rows(Member.objects.filter(id__in=member_ids[start:start + 500]).values_list(
+            'id', 'first_name', 'last_name', 'member_number', 'email', 'notes'
+        ))
+
+
+def remove_members(member_ids):
+    """Mitglieder aus dem Index entfernen"""
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+            [(member_id,) for member_id in member_ids]
+        )
+
+
+def rebuild_index():
+    """Index vollständig neu aufbauen"""
+    from .models import Member
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    index_rows(Member.objects.values_list(
+        'id', 'first_name', 'last_name', 'member_number', 'email', 'notes'
+    ).iterator(chunk_size=500))
+
+
+def search_member_ids(search, limit=SEARCH_LIMIT, within=None):
+    """
+    Mitglieder per Volltextsuche finden.
+
+    Args:
+        search: Suchbegriff
+        limit: Maximale Anzahl Treffer
+        within: Optional Member-QuerySet (z.B. mit den Filtern der Liste); die
+            Suche wird in derselben Abfrage darauf beschränkt, die Begrenzung
+            auf limit gilt erst danach
+
+    Returns:
+        list: Member-IDs, nach Relevanz sortiert
+    """
+    query = build_query(search)
+    if not query:
+        return []
+    sql = f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+    params = [query]
+    if within is not None:
+        within_sql, within_params = within.order_by().values('id').query.sql_with_params()
+        sql += f' AND rowid IN ({within_sql})'
+        params.extend(within_params)
+    weights = ', '.join(str(weight) for weight in COLUMN_WEIGHTS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'{sql} ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s',
+            [*params, limit]
+        )
+        return [row[0] for row in cursor.fetchall()]
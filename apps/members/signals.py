@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Member
+from .search import index_members, remove_members
+
+
+@receiver(post_save, sender=Member)
+def update_search_index(sender, instance, raw=False, **kwargs):
+    """Suchindex nach dem Speichern eines Mitglieds aktualisieren"""
+    if raw:
+        return
+    index_members([instance.pk])
+
+
+@receiver(post_delete, sender=Member)
+def remove_from_search_index(sender, instance, **kwargs):
+    """Gelöschtes Mitglied aus dem Suchindex entfernen"""
+    remove_members([instance.pk])
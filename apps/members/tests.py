@@ -1,3 +1,649 @@
-from django.test import TestCase
+import csv
+import io
+from datetime import date, timedelta
+from functools import partial
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.core import dashboard
+from apps.core.models import User
+from apps.qualifications.bulk import agt_exercise_cutoff, agt_valid_member_ids, effective_qualification_codes
+from apps.qualifications.models import (
+    ExerciseRecord, MedicalExam, MedicalExamType, MemberQualification, Qualification, QualificationCategory
+)
+from apps.scheduling.models import AssignmentHistory, Duty, FairnessScore
+from apps.vehicles import readiness
+from apps.vehicles.models import Position, PositionEligibility, Vehicle, VehiclePosition, VehicleType
+from .importer import MemberImporter, read_csv
+from .models import ImportJob, Member, Unit
+from . import jobs, search
+from .search import search_member_ids
+
+
+HEADER = 'vorname;nachname;geburtsdatum;mitgliedsnummer;status;einheit;email\n'
+
+
+def import_csv(lines, dry_run=False):
+    return MemberImporter(read_csv(HEADER + ''.join(f'{line}\n' for line in lines))).run(dry_run=dry_run)
+
+
+class MemberImporterTests(TestCase):
+    """CSV-Import für Mitglieder (Massen-Schreiben ohne Signale)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.unit = Unit.objects.create(name='Löschzug 1')
+        cls.by_number = Member.objects.create(
+            first_name='Anna', last_name='Alt', member_number='100', status='active', unit=cls.unit
+        )
+        cls.by_name = Member.objects.create(
+            first_name='Bernd', last_name='Berg', birth_date=date(1980, 5, 1), status='active'
+        )
+
+    def test_creates_and_updates_members(self):
+        importer = import_csv([
+            'Anna;Neu-Alt;;100;inaktiv;Löschzug 1;anna@example.org',
+            'bernd;BERG;01.05.1980;;reserve;;',
+            'Clara;Christ;1990-02-03;200;jugend;Löschzug 2;',
+        ])
+
+        self.assertEqual((importer.created_count, importer.updated_count, importer.errors), (1, 2, []))
+        self.by_number.refresh_from_db()
+        self.assertEqual(self.by_number.last_name, 'Neu-Alt')
+        self.assertEqual(self.by_number.status, 'inactive')
+        self.assertEqual(self.by_number.email, 'anna@example.org')
+        self.by_name.refresh_from_db()
+        self.assertEqual(self.by_name.status, 'reserve')
+
+        clara = Member.objects.get(member_number='200')
+        self.assertEqual(clara.birth_date, date(1990, 2, 3))
+        self.assertEqual(clara.status, 'youth')
+        self.assertEqual(clara.unit.name, 'Löschzug 2')
+        self.assertEqual(Member.objects.count(), 3)
+
+    def test_repeated_rows_update_the_same_new_member(self):
+        importer = import_csv([
+            'Clara;Christ;;200;aktiv;;',
+            'Clara;Christ;;200;inaktiv;;',
+        ])
+
+        self.assertEqual((importer.created_count, importer.updated_count), (1, 1))
+        self.assertEqual(Member.objects.get(member_number='200').status, 'inactive')
+
+    def test_rows_without_name_are_reported(self):
+        importer = import_csv([
+            ';Christ;;200;aktiv;;',
+            'Dora;Dorn;;;aktiv;;',
+        ])
+
+        self.assertEqual(importer.errors, ['Zeile 2: Vor- und Nachname sind erforderlich.'])
+        self.assertEqual(importer.created_count, 1)
+        self.assertTrue(Member.objects.filter(last_name='Dorn').exists())
+
+    def test_search_index_follows_import(self):
+        import_csv(['Anna;Müller;;100;aktiv;;', 'Clara;Christ;;200;aktiv;;'])
+
+        self.assertEqual(search_member_ids('mueller'), [self.by_number.id])
+        self.assertEqual(search_member_ids('christ'), [Member.objects.get(member_number='200').id])
+        self.assertEqual(search_member_ids('alt'), [])
+
+    def test_imported_members_fill_positions_without_requirements(self):
+        vehicle_type = VehicleType.objects.create(name='Löschgruppenfahrzeug', short_name='LF')
+        vehicle = Vehicle.objects.create(vehicle_type=vehicle_type, call_sign='LF 1')
+        messenger = VehiclePosition.objects.create(
+            vehicle=vehicle, position=Position.objects.create(name='Melder', short_name='ME')
+        )
+
+        import_csv(['Clara;Christ;;200;aktiv;;'])
+
+        clara = Member.objects.get(member_number='200')
+        self.assertTrue(PositionEligibility.objects.filter(vehicle_position=messenger, member=clara).exists())
+        self.assertEqual(
+            set(PositionEligibility.objects.filter(vehicle_position=messenger).values_list('member_id', flat=True)),
+            set(Member.objects.qualified_for(messenger).values_list('id', flat=True))
+        )
+
+    def test_caches_are_invalidated_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            import_csv(['Clara;Christ;;200;aktiv;;'])
+
+        self.assertIn(dashboard.invalidate, callbacks)
+        self.assertIn(readiness.invalidate, callbacks)
+
+    def test_dry_run_counts_without_writing(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            importer = import_csv([
+                'Anna;Neu-Alt;;100;inaktiv;Löschzug 1;',
+                'Clara;Christ;;200;aktiv;Löschzug 2;',
+                ';Ohne;;;aktiv;;',
+            ], dry_run=True)
+
+        self.assertEqual((importer.created_count, importer.updated_count, importer.error_count), (1, 1, 1))
+        self.assertEqual(callbacks, [])
+        self.assertEqual(Member.objects.count(), 2)
+        self.assertFalse(Unit.objects.filter(name='Löschzug 2').exists())
+        self.by_number.refresh_from_db()
+        self.assertEqual(self.by_number.last_name, 'Alt')
+        self.assertEqual(search_member_ids('christ'), [])
+
+
+class MemberSearchTests(TestCase):
+    """Volltextsuche (FTS5) und ihre Pflege über Signale"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('leader', password='x', role=User.Role.LEADER)
+        cls.unit = Unit.objects.create(name='Löschzug 1')
+        cls.mueller = Member.objects.create(
+            first_name='Jörg', last_name='Müller', member_number='4711', email='joerg@example.org',
+            status='active', unit=cls.unit
+        )
+        cls.strasse = Member.objects.create(first_name='Hans', last_name='Straßer', status='active')
+        cls.jose = Member.objects.create(first_name='José', last_name='Núñez', status='inactive')
+        cls.noted = Member.objects.create(
+            first_name='Petra', last_name='Pohl', notes='Vertretung für Müller', status='active'
+        )
+
+    def test_umlaut_and_sharp_s_folding(self):
+        for term in ['Müller', 'mueller', 'MULLER', 'müll']:
+            self.assertEqual(search_member_ids(term)[0], self.mueller.id, term)
+        for term in ['Straßer', 'strasser', 'STRASS']:
+            self.assertEqual(search_member_ids(term), [self.strasse.id], term)
+        self.assertEqual(search_member_ids('jose nunez'), [self.jose.id])
+
+    def test_prefix_search_and_ranking(self):
+        # Treffer im Namen vor Treffer in den Bemerkungen
+        self.assertEqual(search_member_ids('mül'), [self.mueller.id, self.noted.id])
+        self.assertEqual(search_member_ids('jör mül'), [self.mueller.id])
+        self.assertEqual(search_member_ids('471'), [self.mueller.id])
+        self.assertEqual(search_member_ids('joerg@example'), [self.mueller.id])
+
+    def test_empty_and_punctuation_only_queries(self):
+        self.assertEqual(search_member_ids(''), [])
+        self.assertEqual(search_member_ids('"*()'), [])
+        self.assertEqual(search_member_ids('"mül"'), [self.mueller.id, self.noted.id])
+
+    def test_index_follows_save_and_delete(self):
+        self.mueller.last_name = 'Meier'
+        self.mueller.save()
+        self.assertEqual(search_member_ids('müller'), [self.noted.id])
+        self.assertEqual(search_member_ids('meier'), [self.mueller.id])
+
+        self.noted.delete()
+        self.assertEqual(search_member_ids('müller'), [])
+
+        created = Member.objects.create(first_name='Anna', last_name='Öztürk', status='active')
+        self.assertEqual(search_member_ids('oeztuerk'), [created.id])
+
+    def test_rebuild_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {search.FTS_TABLE}')
+        self.assertEqual(search_member_ids('müller'), [])
+
+        search.rebuild_index()
+        self.assertEqual(search_member_ids('müller'), [self.mueller.id, self.noted.id])
+
+    def list_ids(self, **params):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('member_list'), params)
+        self.assertEqual(response.status_code, 200)
+        return [member.id for member in response.context['members']]
+
+    def test_member_list_combines_search_with_filters(self):
+        self.assertEqual(self.list_ids(search='müller'), [self.mueller.id, self.noted.id])
+        self.assertEqual(self.list_ids(search='müller', unit=self.unit.id), [self.mueller.id])
+        self.assertEqual(self.list_ids(search='müller', status='inactive'), [])
+        self.assertEqual(self.list_ids(search='nunez', status='inactive'), [self.jose.id])
+
+    def test_result_limit_applies_after_filters(self):
+        # Namenstreffer vor Bemerkungen: bei zwei Treffern Grenze fiele Max
+        # ohne Filter in der Suchabfrage weg
+        Member.objects.create(first_name='Anna', last_name='Müller', status='active')
+        max_ = Member.objects.create(first_name='Max', last_name='Mai', notes='Müller', status='inactive')
+        with mock.patch('apps.members.views.search_member_ids', partial(search_member_ids, limit=2)):
+            self.assertNotIn(max_.id, self.list_ids(search='müller'))
+            self.assertEqual(self.list_ids(search='müller', status='inactive'), [max_.id])
+
+
+@override_settings(IMPORT_JOBS_IN_PROCESS=False)
+class ImportJobTests(TestCase):
+    """Import-Jobs: Beanspruchen, Abbruch, Wiederaufnahme und Probelauf"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('leader', password='x', role=User.Role.LEADER)
+
+    def create_job(self, lines, **kwargs):
+        return ImportJob.objects.create(
+            kind=ImportJob.Kind.MEMBERS,
+            file_name='mitglieder.csv',
+            content=HEADER + ''.join(f'{line}\n' for line in lines),
+            created_by=self.user,
+            **kwargs
+        )
+
+    def test_claim_job_only_once(self):
+        job = self.create_job(['Clara;Christ;;200;aktiv;;'])
+
+        self.assertTrue(jobs.claim_job(job.id))
+        self.assertFalse(jobs.claim_job(job.id))
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.Status.RUNNING)
+        self.assertIsNotNone(job.started_at)
+
+    def test_claimed_job_is_not_run_twice(self):
+        job = self.create_job(['Clara;Christ;;200;aktiv;;'])
+        jobs.claim_job(job.id)
+
+        jobs.run_import_job(job.id)
+
+        self.assertFalse(Member.objects.exists())
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.Status.RUNNING)
+
+    def test_run_import_job(self):
+        job = self.create_job(['Clara;Christ;;200;aktiv;;', ';Ohne;;;aktiv;;'])
+
+        jobs.run_import_job(job.id)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.Status.COMPLETED)
+        self.assertEqual((job.total_rows, job.processed_rows), (2, 2))
+        self.assertEqual((job.created_count, job.error_count), (1, 1))
+        self.assertEqual((job.content, job.message), ('', ''))
+        self.assertIsNotNone(job.finished_at)
+        self.assertTrue(Member.objects.filter(member_number='200').exists())
+
+    def test_save_phase_is_reported_before_apply(self):
+        job = self.create_job(['Clara;Christ;;200;aktiv;;'])
+        states = []
+
+        def apply(importer):
+            states.append(ImportJob.objects.values_list('processed_rows', 'message').get(pk=job.pk))
+
+        with mock.patch.object(MemberImporter, 'apply', apply):
+            jobs.run_import_job(job.id)
+
+        self.assertEqual(states, [(1, jobs.APPLY_MESSAGE)])
+        job.refresh_from_db()
+        self.assertEqual(job.message, '')
+
+    def test_failed_job(self):
+        job = self.create_job(['Clara;Christ;;200;aktiv;;'])
+
+        with mock.patch.object(MemberImporter, 'apply', side_effect=ValueError('kaputt')), \
+                self.assertLogs('apps.members.jobs', 'ERROR'):
+            jobs.run_import_job(job.id)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.Status.FAILED)
+        self.assertEqual(job.message, 'Fehler beim Verarbeiten der CSV-Datei: kaputt')
+        self.assertEqual(job.content, '')
+
+    @override_settings(IMPORT_JOB_TIMEOUT_MINUTES=30)
+    def test_fail_stale_jobs(self):
+        now = timezone.now()
+        stale = self.create_job([], status=ImportJob.Status.RUNNING, started_at=now - timedelta(minutes=31))
+        fresh = self.create_job([], status=ImportJob.Status.RUNNING, started_at=now - timedelta(minutes=29))
+        pending = self.create_job([])
+
+        self.assertEqual(jobs.fail_stale_jobs(), 1)
+
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, ImportJob.Status.FAILED)
+        self.assertEqual(stale.content, '')
+        self.assertIn('abgebrochen', stale.message)
+        fresh.refresh_from_db()
+        self.assertEqual(fresh.status, ImportJob.Status.RUNNING)
+        pending.refresh_from_db()
+        self.assertEqual(pending.status, ImportJob.Status.PENDING)
+
+    def test_resume_jobs(self):
+        self.create_job([], status=ImportJob.Status.RUNNING, started_at=timezone.now() - timedelta(days=1))
+
+        with mock.patch.object(jobs.threading, 'Thread') as thread:
+            self.assertEqual(jobs.resume_jobs(), 1)
+            thread.assert_not_called()
+
+            pending = self.create_job(['Clara;Christ;;200;aktiv;;'])
+            self.assertEqual(jobs.resume_jobs(), 0)
+            thread.assert_not_called()
+
+            with override_settings(IMPORT_JOBS_IN_PROCESS=True):
+                jobs.resume_jobs()
+            thread.assert_called_once()
+            self.assertEqual(thread.call_args.kwargs['target'], jobs.process_pending_jobs_in_thread)
+
+        self.assertEqual(jobs.process_pending_jobs(), 1)
+        pending.refresh_from_db()
+        self.assertEqual(pending.status, ImportJob.Status.COMPLETED)
+
+    def test_dry_run_and_confirm(self):
+        job = self.create_job(['Clara;Christ;;200;aktiv;;'], dry_run=True)
+
+        jobs.run_import_job(job.id)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.created_count), (ImportJob.Status.COMPLETED, 1))
+        self.assertNotEqual(job.content, '')
+        self.assertFalse(Member.objects.exists())
+
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('import_job_confirm', args=[job.id]))
+        confirmed = ImportJob.objects.exclude(pk=job.pk).get()
+        self.assertRedirects(response, reverse('import_job_detail', args=[confirmed.id]))
+        job.refresh_from_db()
+        self.assertEqual(job.content, '')
+        self.assertFalse(confirmed.dry_run)
+
+        jobs.run_import_job(confirmed.id)
+
+        confirmed.refresh_from_db()
+        self.assertEqual((confirmed.status, confirmed.created_count), (ImportJob.Status.COMPLETED, 1))
+        self.assertTrue(Member.objects.filter(member_number='200').exists())
+
+        # Ein Probelauf kann nur einmal übernommen werden
+        self.client.post(reverse('import_job_confirm', args=[job.id]))
+        self.assertEqual(ImportJob.objects.count(), 2)
+
+
+class MemberStatusParityTests(TestCase):
+    """Annotationen, vorab geladene Daten und Einzelabfragen liefern dasselbe Ergebnis"""
+
+    # Stichtage: Schalttag (Frist 28.02. des Vorjahres) und ein gewöhnlicher Tag
+    LEAP_DAY = date(2028, 2, 29)
+    ORDINARY_DAY = date(2027, 10, 19)
+
+    @classmethod
+    def setUpTestData(cls):
+        g26 = MedicalExamType.objects.create(code='G26.3', name='Atemschutz', validity_months=36)
+        agt = Qualification.objects.create(code='AGT', name='Atemschutzgeräteträger', requires_exercises=True)
+        tm = Qualification.objects.create(code='TM', name='Truppmann')
+        tf = Qualification.objects.create(code='TF', name='Truppführer')
+        tf.covers.add(tm)
+
+        def member(name, exam_until=None, exam_passed=True, exercise_dates=(), qualifications=()):
+            created = Member.objects.create(first_name=name, last_name='Parität', status='active')
+            if exam_until:
+                MedicalExam.objects.create(
+                    member=created, exam_type=g26, exam_date=date(2025, 1, 1), valid_until=exam_until,
+                    result_positive=exam_passed
+                )
+            for exercise_date in exercise_dates:
+                ExerciseRecord.objects.create(
+                    member=created, qualification=agt, exercise_date=exercise_date, exercise_type='Belastungsübung'
+                )
+            for qualification in qualifications:
+                MemberQualification.objects.create(member=created, qualification=qualification)
+            return created
+
+        cls.members = [
+            member('Gueltig', date(2030, 1, 1), exercise_dates=[date(2027, 6, 1)], qualifications=[agt, tf]),
+            member('Frist', date(2030, 1, 1), exercise_dates=[date(2027, 2, 28)], qualifications=[tm]),
+            member('Vortag', date(2030, 1, 1), exercise_dates=[date(2027, 2, 27)]),
+            member('Jahrestag', date(2030, 1, 1), exercise_dates=[date(2026, 10, 19)]),
+            member('Ablauf', cls.LEAP_DAY, exercise_dates=[date(2027, 12, 1)]),
+            member('Untauglich', date(2030, 1, 1), exam_passed=False, exercise_dates=[date(2027, 12, 1)]),
+            member('OhneUebung', date(2030, 1, 1)),
+            member('Ohne'),
+        ]
+
+    def by_name(self, values):
+        return {member.first_name: value for member, value in values}
+
+    def agt_status(self, on_date):
+        annotated = self.by_name(
+            (member, member.has_valid_agt_status()) for member in Member.objects.with_agt_status(on_date)
+        )
+
+        members = list(Member.objects.prefetch_related('medical_exams__exam_type', 'exercise_records__qualification'))
+        with self.assertNumQueries(0):
+            prefetched = self.by_name((member, member.has_valid_agt_status(on_date)) for member in members)
+
+        per_row = self.by_name((member, member.has_valid_agt_status(on_date)) for member in Member.objects.all())
+
+        bulk_ids = agt_valid_member_ids(on_date=on_date)
+        bulk = self.by_name((member, member.id in bulk_ids) for member in self.members)
+
+        self.assertEqual(annotated, prefetched)
+        self.assertEqual(annotated, per_row)
+        self.assertEqual(annotated, bulk)
+        return {name for name, valid in annotated.items() if valid}
+
+    def test_agt_status_on_leap_day(self):
+        self.assertEqual(agt_exercise_cutoff(self.LEAP_DAY), date(2027, 2, 28))
+        self.assertEqual(self.agt_status(self.LEAP_DAY), {'Gueltig', 'Frist', 'Ablauf'})
+
+    def test_agt_status_on_ordinary_day(self):
+        self.assertEqual(self.agt_status(self.ORDINARY_DAY), {'Gueltig', 'Frist', 'Vortag', 'Jahrestag', 'Ablauf'})
+
+    def test_agt_status_default_date(self):
+        with mock.patch('apps.qualifications.bulk.date', wraps=date) as bulk_date, \
+                mock.patch('apps.members.models.date', wraps=date) as model_date:
+            bulk_date.today.return_value = model_date.today.return_value = self.LEAP_DAY
+            self.assertEqual(
+                {member.first_name for member in Member.objects.with_agt_status() if member.agt_valid},
+                {member.first_name for member in Member.objects.all() if member.has_valid_agt_status()}
+            )
+
+    def test_qualification_codes(self):
+        annotated = self.by_name(
+            (member, set(member.qualification_code_list)) for member in Member.objects.with_qualification_codes()
+        )
+        effective = effective_qualification_codes()
+        self.assertEqual(annotated, self.by_name((member, effective.get(member.id, set())) for member in self.members))
+        self.assertEqual(annotated['Gueltig'], {'AGT', 'TF', 'TM'})
+
+        for code in ['AGT', 'TF', 'TM']:
+            self.assertEqual(
+                set(Member.objects.with_qualification(code).values_list('first_name', flat=True)),
+                {name for name, codes in annotated.items() if code in codes},
+                code
+            )
+
+    def test_has_qualification_prefetch_and_per_row(self):
+        members = list(Member.objects.prefetch_related('qualifications__qualification'))
+        with self.assertNumQueries(0):
+            prefetched = self.by_name(
+                (member, {code for code in ['AGT', 'TF', 'TM'] if member.has_qualification(code)})
+                for member in members
+            )
+
+        per_row = self.by_name(
+            (member, {code for code in ['AGT', 'TF', 'TM'] if member.has_qualification(code)})
+            for member in Member.objects.all()
+        )
+
+        self.assertEqual(prefetched, per_row)
+        # has_qualification prüft nur eigene Qualifikationen, die Annotation auch abgedeckte
+        annotated = self.by_name(
+            (member, set(member.qualification_code_list)) for member in Member.objects.with_qualification_codes()
+        )
+        self.assertTrue(all(prefetched[name] <= annotated[name] for name in prefetched))
+        self.assertEqual((prefetched['Gueltig'], prefetched['Frist']), ({'AGT', 'TF'}, {'TM'}))
+
+
+class MemberExportTests(TestCase):
+    """CSV-Export mit optionalen Qualifikations- und AGT-Spalten"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('leader', password='x', role=User.Role.LEADER)
+        cls.unit = Unit.objects.create(name='Löschzug 1')
+        g26 = MedicalExamType.objects.create(code='G26.3', name='Atemschutz', validity_months=36)
+        agt = Qualification.objects.create(code='AGT', name='Atemschutzgeräteträger', requires_exercises=True)
+        tm = Qualification.objects.create(code='TM', name='Truppmann')
+        tf = Qualification.objects.create(code='TF', name='Truppführer')
+        tf.covers.add(tm)
+
+        cls.anna = Member.objects.create(
+            first_name='Anna', last_name='Alt', birth_date=date(1990, 2, 3), status='active', unit=cls.unit
+        )
+        MemberQualification.objects.create(member=cls.anna, qualification=tf)
+        MemberQualification.objects.create(member=cls.anna, qualification=agt)
+        MedicalExam.objects.create(
+            member=cls.anna, exam_type=g26, exam_date=date.today(), valid_until=date.today() + timedelta(days=365)
+        )
+        ExerciseRecord.objects.create(
+            member=cls.anna, qualification=agt, exercise_date=date.today(), exercise_type='Belastungsübung'
+        )
+        cls.bernd = Member.objects.create(first_name='Bernd', last_name='Berg', status='inactive')
+
+    def export(self, **params):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('member_export_csv'), params)
+        self.assertEqual(response.status_code, 200)
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertTrue(content.startswith('\ufeff'))
+        return list(csv.reader(io.StringIO(content[1:]), delimiter=';'))
+
+    def test_plain_export(self):
+        rows = self.export()
+
+        self.assertEqual(rows[0][-1], 'bemerkungen')
+        self.assertEqual([row[:3] for row in rows[1:]], [['Anna', 'Alt', '03.02.1990'], ['Bernd', 'Berg', '']])
+        self.assertEqual([row[8:10] for row in rows[1:]], [['Aktiv', 'Löschzug 1'], ['Inaktiv', '']])
+
+    def test_qualification_and_agt_columns(self):
+        rows = self.export(qualifikationen='1', agt='1')
+
+        self.assertEqual(rows[0][-2:], ['qualifikationen', 'agt_gueltig'])
+        self.assertEqual([row[-2:] for row in rows[1:]], [['AGT, TF, TM', 'ja'], ['', 'nein']])
+
+        rows = self.export(agt='1')
+        self.assertEqual(rows[0][-1], 'agt_gueltig')
+        self.assertNotIn('qualifikationen', rows[0])
+
+    def test_filters_apply_to_extra_columns(self):
+        rows = self.export(qualifikationen='1', agt='1', status='inactive')
+        self.assertEqual([row[:2] + row[-2:] for row in rows[1:]], [['Bernd', 'Berg', '', 'nein']])
+
+        rows = self.export(qualifikationen='1', unit=self.unit.id)
+        self.assertEqual([row[-1] for row in rows[1:]], ['AGT, TF, TM'])
+
+
+@mock.patch('apps.members.views.MEMBER_PAGE_SIZE', 3)
+class MemberListTests(TestCase):
+    """Mitgliederliste: Seiten zusammen mit Filtern"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('leader', password='x', role=User.Role.LEADER)
+        cls.unit = Unit.objects.create(name='Löschzug 1')
+        cls.tm = Qualification.objects.create(code='TM', name='Truppmann')
+        cls.members = []
+        for index, name in enumerate(['Adler', 'Bach', 'Clausen', 'Dorn', 'Eck', 'Fink', 'Gans']):
+            member = Member.objects.create(
+                first_name='Mitglied', last_name=name, status='active' if index % 2 == 0 else 'reserve',
+                unit=cls.unit if index < 5 else None
+            )
+            if index % 3 == 0:
+                MemberQualification.objects.create(member=member, qualification=cls.tm)
+            cls.members.append(member)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def get(self, **params):
+        response = self.client.get(reverse('member_list'), params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def names(self, response):
+        return [member.last_name for member in response.context['members']]
+
+    def test_pages_in_name_order(self):
+        self.assertEqual(self.names(self.get()), ['Adler', 'Bach', 'Clausen'])
+        self.assertEqual(self.names(self.get(page=2)), ['Dorn', 'Eck', 'Fink'])
+        self.assertEqual(self.names(self.get(page=3)), ['Gans'])
+        # Ungültige Seiten führen auf die erste bzw. letzte Seite
+        self.assertEqual(self.names(self.get(page='x')), ['Adler', 'Bach', 'Clausen'])
+        self.assertEqual(self.names(self.get(page=99)), ['Gans'])
+
+    def test_filters_are_applied_before_paging(self):
+        response = self.get(status='active')
+        self.assertEqual(self.names(response), ['Adler', 'Clausen', 'Eck'])
+        self.assertEqual(response.context['page'].paginator.count, 4)
+        self.assertEqual(self.names(self.get(status='active', page=2)), ['Gans'])
+
+        self.assertEqual(self.names(self.get(unit=self.unit.id, page=2)), ['Dorn', 'Eck'])
+        self.assertEqual(self.names(self.get(qualification='TM')), ['Adler', 'Dorn', 'Gans'])
+        self.assertEqual(self.names(self.get(qualification='TM', status='reserve')), ['Dorn'])
+
+    def test_page_links_keep_filters(self):
+        response = self.get(qualification='', status='active', page=1)
+
+        self.assertEqual(response.context['page_query'], 'qualification=&status=active')
+        self.assertContains(response, '?qualification=&amp;status=active&page=2')
+
+    def test_htmx_request_renders_rows_only(self):
+        response = self.client.get(
+            reverse('member_list'), {'status': 'active', 'page': 2}, HTTP_HX_REQUEST='true', HTTP_HX_TARGET='member-rows'
+        )
+
+        self.assertTemplateUsed(response, 'members/partials/member_rows.html')
+        self.assertTemplateNotUsed(response, 'members/member_list.html')
+        self.assertEqual(self.names(response), ['Gans'])
+
+
+@override_settings(REFERENCE_DATA_CHECK_INTERVAL=3600)
+class MemberDetailQueryTests(TestCase):
+    """Detailseite mit fester Anzahl Abfragen, unabhängig von der Datenmenge"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('leader', password='x', role=User.Role.LEADER)
+        cls.unit = Unit.objects.create(name='Löschzug 1')
+        cls.member = Member.objects.create(first_name='Anna', last_name='Alt', status='active', unit=cls.unit)
+        cls.category = QualificationCategory.objects.create(name='Grundausbildung')
+        cls.g26 = MedicalExamType.objects.create(code='G26.3', name='Atemschutz', validity_months=36)
+        cls.agt = Qualification.objects.create(code='AGT', name='Atemschutzgeräteträger', requires_exercises=True)
+        vehicle_type = VehicleType.objects.create(name='Löschgruppenfahrzeug', short_name='LF')
+        cls.vehicle = Vehicle.objects.create(vehicle_type=vehicle_type, call_sign='LF 1')
+        cls.position = Position.objects.create(name='Maschinist', short_name='MA')
+
+    def add_records(self, count):
+        start = self.member.qualifications.count()
+        for index in range(start, start + count):
+            qualification = Qualification.objects.create(
+                code=f'Q{index}', name=f'Lehrgang {index}', category=self.category
+            )
+            MemberQualification.objects.create(member=self.member, qualification=qualification)
+            MedicalExam.objects.create(member=self.member, exam_type=self.g26, exam_date=date(2020 + index, 1, 1))
+            ExerciseRecord.objects.create(
+                member=self.member, qualification=self.agt, exercise_date=date(2020 + index, 6, 1),
+                exercise_type='Belastungsübung'
+            )
+            duty = Duty.objects.create(title=f'Dienst {index}', date=date(2026, 1, 1 + index))
+            AssignmentHistory.objects.create(
+                member=self.member, duty=duty, vehicle=self.vehicle, position=self.position, date=duty.date
+            )
+            FairnessScore.objects.create(member=self.member, year=2020 + index)
+
+    def get(self):
+        response = self.client.get(reverse('member_detail', args=[self.member.id]))
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_query_count_does_not_grow_with_records(self):
+        self.client.force_login(self.user)
+        self.add_records(1)
+        # Stammdaten-Cache füllen; Sitzung, Benutzer, Mitglied, drei Prefetches,
+        # Positionsstatistik, Historie und Fairness-Werte bleiben
+        self.get()
+
+        with self.assertNumQueries(9):
+            response = self.get()
+        self.assertEqual(len(response.context['qualifications']), 1)
+
+        self.add_records(4)
+        self.get()
+        with self.assertNumQueries(9):
+            response = self.get()
+        self.assertEqual(len(response.context['medical_exams']), 5)
+        self.assertEqual(len(response.context['assignment_history']), 5)
+        self.assertContains(response, 'Q4')
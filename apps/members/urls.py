@@ -5,8 +5,14 @@ urlpatterns = [
     path('', views.member_list, name='member_list'),
     path('new/', views.member_edit, name='member_create'),
     path('import/', views.member_import_csv, name='member_import_csv'),
+    path('import/<int:job_id>/', views.import_job_detail, name='import_job_detail'),
+    path('import/<int:job_id>/progress/', views.import_job_progress, name='import_job_progress'),
+    path('import/<int:job_id>/confirm/', views.import_job_confirm, name='import_job_confirm'),
+    path('import/exams/', views.medical_exam_import_csv, name='medical_exam_import_csv'),
+    path('import/exams/template/', views.medical_exam_csv_template, name='medical_exam_csv_template'),
     path('export/', views.member_export_csv, name='member_export_csv'),
     path('template/', views.member_export_csv_template, name='member_csv_template'),
+    path('exercises/', views.exercise_bulk_add, name='exercise_bulk_add'),
     path('<int:member_id>/', views.member_detail, name='member_detail'),
     path('<int:member_id>/edit/', views.member_edit, name='member_edit'),
     path('<int:member_id>/delete/', views.member_delete, name='member_delete'),
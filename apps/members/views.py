@@ -1,90 +1,171 @@
 import csv
-import io
-from datetime import datetime
+from datetime import date
 
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q
-from django.http import HttpResponse, JsonResponse
+from django.core.paginator import Paginator
+from django.db.models import BooleanField, Case, Count, ExpressionWrapper, Prefetch, Q, When
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.db import transaction
+from django.urls import reverse
+from django.utils.dateparse import parse_date
 from django.views.decorators.http import require_POST
 
+from apps.core.refdata import reference_data
 from apps.core.views import leader_required
+from apps.scheduling.ical import feed_token
+from apps.scheduling.models import AssignmentHistory, Duty, DutyAttendance, FairnessScore
+from apps.qualifications.bulk import agt_valid_member_ids, effective_qualification_codes
+from apps.qualifications.records import record_exercises
 from apps.qualifications.models import (
     Qualification, MemberQualification, MedicalExamType, MedicalExam, ExerciseRecord
 )
-from .models import Member, Unit
+from .importer import decode_csv
+from .jobs import start_import_job
+from .models import ImportJob, Member, Unit
+from .search import search_member_ids
+
+
+# Mitglieder pro Seite in der Mitgliederliste
+MEMBER_PAGE_SIZE = 50
 
 
 @login_required
 @leader_required
 def member_list(request):
-    """Mitgliederliste"""
-    members = Member.objects.all().select_related('unit')
+    """Mitgliederliste (seitenweise, mit effektiven Qualifikationen und AGT-Status)"""
+    members = Member.objects.select_related('unit').with_qualification_codes().with_agt_status()
 
     # Filter
     status_filter = request.GET.get('status', '')
     unit_filter = request.GET.get('unit', '')
+    qualification_filter = request.GET.get('qualification', '')
+    agt_filter = request.GET.get('agt', '')
     search = request.GET.get('search', '')
 
     if status_filter:
         members = members.filter(status=status_filter)
     if unit_filter:
         members = members.filter(unit_id=unit_filter)
+    if qualification_filter:
+        members = members.with_qualification(qualification_filter)
+    if agt_filter == 'valid':
+        members = members.filter(agt_valid=True)
+    elif agt_filter == 'invalid':
+        members = members.filter(agt_valid=False)
     if search:
-        members = members.filter(
-            Q(first_name__icontains=search) |
-            Q(last_name__icontains=search) |
-            Q(member_number__icontains=search)
-        )
+        # Volltextsuche, Treffer nach Relevanz sortiert; die übrigen Filter
+        # gelten schon in der Suchabfrage, damit die Trefferbegrenzung nicht
+        # passende Mitglieder abschneidet
+        filtered = status_filter or unit_filter or qualification_filter or agt_filter
+        member_ids = search_member_ids(search, within=members if filtered else None)
+        members = members.filter(id__in=member_ids).order_by(
+            Case(*[When(id=member_id, then=rank) for rank, member_id in enumerate(member_ids)])
+        ) if member_ids else members.none()
+    else:
+        members = members.order_by('last_name', 'first_name', 'id')
 
-    units = Unit.objects.filter(is_active=True)
+    page = Paginator(members, MEMBER_PAGE_SIZE).get_page(request.GET.get('page'))
+
+    params = request.GET.copy()
+    params.pop('page', None)
 
     context = {
-        'members': members,
-        'units': units,
+        'members': page.object_list,
+        'page': page,
+        'page_query': params.urlencode(),
+        'search': search,
+    }
+
+    if request.htmx and request.htmx.target == 'member-rows':
+        return render(request, 'members/partials/member_rows.html', context)
+
+    context.update({
+        'units': Unit.objects.filter(is_active=True),
+        'qualifications': reference_data().active_qualifications,
         'status_choices': Member.Status.choices,
         'current_status': status_filter,
         'current_unit': unit_filter,
-        'search': search,
-    }
+        'current_qualification': qualification_filter,
+        'current_agt': agt_filter,
+    })
     return render(request, 'members/member_list.html', context)
 
 
+# Anzahl der Einträge in der Einsatz-Historie auf der Detailseite
+MEMBER_HISTORY_LIMIT = 20
+
+
 @login_required
 @leader_required
 def member_detail(request, member_id):
     """Mitglied-Detailansicht"""
-    member = get_object_or_404(Member, id=member_id)
-
-    # Qualifikationen laden
-    qualifications = member.qualifications.select_related(
-        'qualification', 'qualification__category'
-    ).order_by('qualification__category__order', 'qualification__order')
-
-    # Untersuchungen laden
-    medical_exams = MedicalExam.objects.filter(member=member).select_related('exam_type').order_by('-exam_date')
-
-    # AGT-Übungen laden
-    exercise_records = ExerciseRecord.objects.filter(member=member).select_related('qualification').order_by('-exercise_date')
+    # Qualifikationen, Untersuchungen und Übungen mit je einer Abfrage vorab laden
+    member = get_object_or_404(
+        Member.objects.select_related('unit').prefetch_related(
+            Prefetch('qualifications', queryset=MemberQualification.objects.select_related(
+                'qualification', 'qualification__category'
+            ).order_by('qualification__category__order', 'qualification__order')),
+            Prefetch('medical_exams', queryset=MedicalExam.objects.select_related(
+                'exam_type'
+            ).order_by('-exam_date')),
+            Prefetch('exercise_records', queryset=ExerciseRecord.objects.select_related(
+                'qualification'
+            ).order_by('-exercise_date')),
+        ),
+        id=member_id
+    )
+
+    qualifications = member.qualifications.all()
+    medical_exams = member.medical_exams.all()
+    exercise_records = member.exercise_records.all()
 
     # Verfügbare Qualifikationen für Modal (ohne bereits zugewiesene)
-    assigned_qualification_ids = qualifications.values_list('qualification_id', flat=True)
-    available_qualifications = Qualification.objects.filter(
-        is_active=True
-    ).exclude(
-        id__in=assigned_qualification_ids
-    ).select_related('category').order_by('category__order', 'order')
+    refdata = reference_data()
+    assigned_qualification_ids = {mq.qualification_id for mq in qualifications}
+    available_qualifications = sorted(
+        (q for q in refdata.active_qualifications if q.id not in assigned_qualification_ids),
+        key=lambda q: (q.category.order if q.category else -1, q.order)
+    )
+
+    # Einsatz-Historie und Fairness (aktuelles Jahr) aus der Einteilungs-Historie
+    current_year = date.today().year
+    assignment_history = AssignmentHistory.objects.filter(
+        member=member
+    ).select_related('duty', 'vehicle', 'position').order_by('-date')[:MEMBER_HISTORY_LIMIT]
+    position_counts = AssignmentHistory.objects.filter(
+        member=member,
+        year=current_year
+    ).values('position__short_name').annotate(count=Count('id')).order_by('-count', 'position__short_name')
+    fairness_scores = FairnessScore.objects.filter(member=member).order_by('-year')[:5]
 
     # Verfügbare Untersuchungstypen
-    exam_types = MedicalExamType.objects.all()
+    exam_types = refdata.exam_types
+
+    # Kalender-Abonnements
+    ical_member_url = request.build_absolute_uri(reverse(
+        'member_ical_feed', args=[member.id, feed_token('member', member.id)]
+    ))
+    ical_unit_url = None
+    if member.unit_id:
+        ical_unit_url = request.build_absolute_uri(reverse(
+            'unit_ical_feed', args=[member.unit_id, feed_token('unit', member.unit_id)]
+        ))
 
     context = {
         'member': member,
         'qualifications': qualifications,
         'medical_exams': medical_exams,
         'exercise_records': exercise_records,
+        # Nutzt die vorab geladenen Untersuchungen und Übungen
         'agt_valid': member.has_valid_agt_status(),
+        'assignment_history': assignment_history,
+        'position_counts': position_counts,
+        'fairness_scores': fairness_scores,
+        'current_year': current_year,
+        'ical_member_url': ical_member_url,
+        'ical_unit_url': ical_unit_url,
         # Für Modals
         'available_qualifications': available_qualifications,
         'exam_types': exam_types,
@@ -168,152 +249,105 @@ def member_delete(request, member_id):
     return render(request, 'members/member_confirm_delete.html', {'member': member})
 
 
+def create_import_job(request, kind):
+    """Hochgeladene CSV-Datei prüfen und als Import-Job anlegen; None bei Fehlern"""
+    csv_file = request.FILES.get('csv_file')
+
+    if not csv_file:
+        messages.error(request, 'Bitte wählen Sie eine CSV-Datei aus.')
+        return None
+
+    if not csv_file.name.endswith('.csv'):
+        messages.error(request, 'Bitte laden Sie eine CSV-Datei hoch.')
+        return None
+
+    try:
+        content = decode_csv(csv_file.read())
+    except UnicodeDecodeError:
+        messages.error(request, 'Die CSV-Datei muss UTF-8-kodiert sein.')
+        return None
+
+    job = ImportJob.objects.create(
+        kind=kind,
+        file_name=csv_file.name,
+        content=content,
+        dry_run=request.POST.get('dry_run') == 'on',
+        created_by=request.user
+    )
+    start_import_job(job)
+    return job
+
+
 @login_required
 @leader_required
 def member_import_csv(request):
-    """CSV-Import für Mitglieder"""
+    """CSV-Import für Mitglieder (wird im Hintergrund verarbeitet)"""
     if request.method == 'POST':
-        csv_file = request.FILES.get('csv_file')
+        job = create_import_job(request, ImportJob.Kind.MEMBERS)
+        if job:
+            return redirect('import_job_detail', job_id=job.id)
 
-        if not csv_file:
-            messages.error(request, 'Bitte wählen Sie eine CSV-Datei aus.')
-            return redirect('member_list')
+    return redirect('member_list')
 
-        if not csv_file.name.endswith('.csv'):
-            messages.error(request, 'Bitte laden Sie eine CSV-Datei hoch.')
-            return redirect('member_list')
 
-        try:
-            # CSV lesen
-            decoded_file = csv_file.read().decode('utf-8-sig')
-            io_string = io.StringIO(decoded_file)
-            reader = csv.DictReader(io_string, delimiter=';')
-
-            created_count = 0
-            updated_count = 0
-            error_count = 0
-            errors = []
-
-            # Status-Mapping (deutsch -> english)
-            status_mapping = {
-                'aktiv': 'active',
-                'inaktiv': 'inactive',
-                'jugendfeuerwehr': 'youth',
-                'jugend': 'youth',
-                'altersabteilung': 'honorary',
-                'ehrenabteilung': 'honorary',
-                'reserve': 'reserve',
-            }
-
-            for row_num, row in enumerate(reader, start=2):
-                try:
-                    # Pflichtfelder prüfen
-                    vorname = row.get('vorname', '').strip()
-                    nachname = row.get('nachname', '').strip()
-
-                    if not vorname or not nachname:
-                        errors.append(f'Zeile {row_num}: Vor- und Nachname sind erforderlich.')
-                        error_count += 1
-                        continue
-
-                    # Einheit finden/erstellen
-                    unit = None
-                    einheit_name = row.get('einheit', '').strip()
-                    if einheit_name:
-                        unit, _ = Unit.objects.get_or_create(
-                            name=einheit_name,
-                            defaults={'is_active': True}
-                        )
-
-                    # Status konvertieren
-                    status_raw = row.get('status', 'aktiv').strip().lower()
-                    status = status_mapping.get(status_raw, 'active')
-
-                    # Datum parsen
-                    def parse_date(date_str):
-                        if not date_str or not date_str.strip():
-                            return None
-                        date_str = date_str.strip()
-                        for fmt in ['%d.%m.%Y', '%Y-%m-%d', '%d/%m/%Y']:
-                            try:
-                                return datetime.strptime(date_str, fmt).date()
-                            except ValueError:
-                                continue
-                        return None
-
-                    birth_date = parse_date(row.get('geburtsdatum', ''))
-                    entry_date = parse_date(row.get('eintrittsdatum', ''))
-
-                    # Mitglied erstellen oder aktualisieren
-                    member_number = row.get('mitgliedsnummer', '').strip()
-
-                    # Prüfen ob Mitglied existiert (nach Mitgliedsnummer oder Name)
-                    existing_member = None
-                    if member_number:
-                        existing_member = Member.objects.filter(member_number=member_number).first()
-
-                    if not existing_member:
-                        existing_member = Member.objects.filter(
-                            first_name__iexact=vorname,
-                            last_name__iexact=nachname,
-                            birth_date=birth_date
-                        ).first()
-
-                    if existing_member:
-                        # Update
-                        existing_member.first_name = vorname
-                        existing_member.last_name = nachname
-                        existing_member.birth_date = birth_date
-                        existing_member.email = row.get('email', '').strip()
-                        existing_member.phone = row.get('telefon', '').strip()
-                        existing_member.mobile = row.get('mobil', '').strip()
-                        existing_member.member_number = member_number
-                        existing_member.entry_date = entry_date
-                        existing_member.status = status
-                        existing_member.unit = unit
-                        existing_member.notes = row.get('bemerkungen', '').strip()
-                        existing_member.save()
-                        updated_count += 1
-                    else:
-                        # Create
-                        Member.objects.create(
-                            first_name=vorname,
-                            last_name=nachname,
-                            birth_date=birth_date,
-                            email=row.get('email', '').strip(),
-                            phone=row.get('telefon', '').strip(),
-                            mobile=row.get('mobil', '').strip(),
-                            member_number=member_number,
-                            entry_date=entry_date,
-                            status=status,
-                            unit=unit,
-                            notes=row.get('bemerkungen', '').strip(),
-                            is_active=True
-                        )
-                        created_count += 1
-
-                except Exception as e:
-                    errors.append(f'Zeile {row_num}: {str(e)}')
-                    error_count += 1
-
-            # Ergebnis-Meldung
-            if created_count > 0 or updated_count > 0:
-                msg = []
-                if created_count > 0:
-                    msg.append(f'{created_count} Mitglied(er) erstellt')
-                if updated_count > 0:
-                    msg.append(f'{updated_count} Mitglied(er) aktualisiert')
-                messages.success(request, ', '.join(msg) + '.')
-
-            if error_count > 0:
-                messages.warning(request, f'{error_count} Zeile(n) konnten nicht importiert werden.')
-                for error in errors[:5]:  # Nur erste 5 Fehler anzeigen
-                    messages.error(request, error)
-
-        except Exception as e:
-            messages.error(request, f'Fehler beim Verarbeiten der CSV-Datei: {str(e)}')
+@login_required
+@leader_required
+def medical_exam_import_csv(request):
+    """CSV-Import für ärztliche Untersuchungen (wird im Hintergrund verarbeitet)"""
+    if request.method == 'POST':
+        job = create_import_job(request, ImportJob.Kind.MEDICAL_EXAMS)
+        if job:
+            return redirect('import_job_detail', job_id=job.id)
+        return redirect('medical_exam_import_csv')
 
-    return redirect('member_list')
+    exam_types = reference_data().exam_types
+    return render(request, 'members/medical_exam_import.html', {'exam_types': exam_types})
+
+
+@login_required
+@leader_required
+@require_POST
+def import_job_confirm(request, job_id):
+    """Geprüften Probelauf als echten Import übernehmen"""
+    job = get_object_or_404(ImportJob, id=job_id)
+
+    if not job.dry_run or job.status != ImportJob.Status.COMPLETED or not job.content:
+        messages.error(request, 'Dieser Import kann nicht übernommen werden.')
+        return redirect('import_job_detail', job_id=job.id)
+
+    with transaction.atomic():
+        confirmed = ImportJob.objects.create(
+            kind=job.kind,
+            file_name=job.file_name,
+            content=job.content,
+            created_by=request.user
+        )
+        ImportJob.objects.filter(pk=job.pk).update(content='')
+        start_import_job(confirmed)
+    return redirect('import_job_detail', job_id=confirmed.id)
+
+
+def import_jobs():
+    """Import-Jobs ohne den (großen) Dateiinhalt, nur mit der Info, ob er noch vorliegt"""
+    return ImportJob.objects.defer('content').annotate(
+        has_content=ExpressionWrapper(~Q(content=''), output_field=BooleanField())
+    )
+
+
+@login_required
+@leader_required
+def import_job_detail(request, job_id):
+    """Fortschritt und Ergebnis eines Imports"""
+    job = get_object_or_404(import_jobs(), id=job_id)
+    return render(request, 'members/import_job_detail.html', {'job': job})
+
+
+@login_required
+@leader_required
+def import_job_progress(request, job_id):
+    """Fortschrittsanzeige eines Imports (wird per htmx abgefragt)"""
+    job = get_object_or_404(import_jobs(), id=job_id)
+    return render(request, 'members/partials/import_job_progress.html', {'job': job})
 
 
 @login_required
@@ -391,30 +425,82 @@ def member_export_csv_template(request):
 
 @login_required
 @leader_required
-def member_export_csv(request):
-    """Export aller Mitglieder als CSV"""
-    response = HttpResponse(content_type='text/csv; charset=utf-8-sig')
-    response['Content-Disposition'] = 'attachment; filename="mitglieder_export.csv"'
+def medical_exam_csv_template(request):
+    """Beispiel-CSV-Datei für den Untersuchungs-Import"""
+    response = HttpResponse(content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = 'attachment; filename="untersuchungen_vorlage.csv"'
 
     # BOM für Excel-Kompatibilität
     response.write('\ufeff')
 
     writer = csv.writer(response, delimiter=';')
-
-    # Header
     writer.writerow([
+        'mitgliedsnummer',
         'vorname',
         'nachname',
         'geburtsdatum',
-        'email',
-        'telefon',
-        'mobil',
-        'mitgliedsnummer',
-        'eintrittsdatum',
-        'status',
-        'einheit',
+        'untersuchung',
+        'datum',
+        'gueltig_bis',
+        'ergebnis',
         'bemerkungen'
     ])
+    writer.writerow(['M-001', 'Max', 'Mustermann', '', 'G26.3', '12.03.2026', '', 'bestanden', ''])
+    writer.writerow(['', 'Anna', 'Beispiel', '22.07.1995', 'G26.3', '12.03.2026', '11.03.2027', 'bestanden', 'Nachuntersuchung nach 12 Monaten'])
+
+    return response
+
+
+class Echo:
+    """Pseudo-Datei für csv.writer, die die geschriebene Zeile direkt zurückgibt"""
+
+    def write(self, value):
+        return value
+
+
+# Exportierte Spalten (Kopfzeile -> Feld)
+EXPORT_COLUMNS = [
+    ('vorname', 'first_name'),
+    ('nachname', 'last_name'),
+    ('geburtsdatum', 'birth_date'),
+    ('email', 'email'),
+    ('telefon', 'phone'),
+    ('mobil', 'mobile'),
+    ('mitgliedsnummer', 'member_number'),
+    ('eintrittsdatum', 'entry_date'),
+    ('status', 'status'),
+    ('einheit', 'unit__name'),
+    ('bemerkungen', 'notes'),
+]
+
+
+@login_required
+@leader_required
+def member_export_csv(request):
+    """
+    Export der Mitglieder als CSV (gestreamt).
+
+    Optionale Parameter:
+        status, unit: Filter wie in der Mitgliederliste
+        qualifikationen=1: Spalte mit effektiven Qualifikationen
+        agt=1: Spalte mit AGT-Status
+    """
+    members = Member.objects.all()
+
+    status_filter = request.GET.get('status', '')
+    unit_filter = request.GET.get('unit', '')
+    if status_filter:
+        members = members.filter(status=status_filter)
+    if unit_filter.isdigit():
+        members = members.filter(unit_id=unit_filter)
+
+    with_qualifications = request.GET.get('qualifikationen') == '1'
+    with_agt = request.GET.get('agt') == '1'
+
+    # Zusatzspalten vorab gesammelt berechnen statt pro Zeile abzufragen
+    member_ids = members.values('id')
+    qualification_codes = effective_qualification_codes(member_ids) if with_qualifications else {}
+    agt_valid_ids = agt_valid_member_ids(member_ids) if with_agt else set()
 
     # Status-Mapping (english -> deutsch)
     status_display = {
@@ -425,23 +511,45 @@ def member_export_csv(request):
         'reserve': 'Reserve',
     }
 
-    members = Member.objects.all().select_related('unit').order_by('last_name', 'first_name')
-
-    for member in members:
-        writer.writerow([
-            member.first_name,
-            member.last_name,
-            member.birth_date.strftime('%d.%m.%Y') if member.birth_date else '',
-            member.email,
-            member.phone,
-            member.mobile,
-            member.member_number,
-            member.entry_date.strftime('%d.%m.%Y') if member.entry_date else '',
-            status_display.get(member.status, member.status),
-            member.unit.name if member.unit else '',
-            member.notes
-        ])
-
+    header = [column for column, _ in EXPORT_COLUMNS]
+    if with_qualifications:
+        header.append('qualifikationen')
+    if with_agt:
+        header.append('agt_gueltig')
+
+    rows = members.order_by('last_name', 'first_name', 'id').values_list(
+        'id', *[field for _, field in EXPORT_COLUMNS]
+    ).iterator(chunk_size=500)
+
+    def stream():
+        writer = csv.writer(Echo(), delimiter=';')
+        # BOM für Excel-Kompatibilität
+        yield '\ufeff'
+        yield writer.writerow(header)
+
+        for (member_id, first_name, last_name, birth_date, email, phone, mobile,
+             member_number, entry_date, status, unit_name, notes) in rows:
+            row = [
+                first_name,
+                last_name,
+                birth_date.strftime('%d.%m.%Y') if birth_date else '',
+                email,
+                phone,
+                mobile,
+                member_number,
+                entry_date.strftime('%d.%m.%Y') if entry_date else '',
+                status_display.get(status, status),
+                unit_name or '',
+                notes,
+            ]
+            if with_qualifications:
+                row.append(', '.join(sorted(qualification_codes.get(member_id, ()))))
+            if with_agt:
+                row.append('ja' if member_id in agt_valid_ids else 'nein')
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(stream(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = 'attachment; filename="mitglieder_export.csv"'
     return response
 
 
@@ -560,7 +668,7 @@ def member_exercise_add(request, member_id):
 
         if exercise_date and exercise_type:
             # AGT-Qualifikation finden
-            agt_qual = Qualification.objects.filter(code='AGT').first()
+            agt_qual = reference_data().qualification('AGT')
 
             if agt_qual:
                 ExerciseRecord.objects.create(
@@ -591,3 +699,87 @@ def member_exercise_delete(request, member_id, exercise_id):
         messages.success(request, 'Übung wurde gelöscht.')
 
     return redirect('member_detail', member_id=member_id)
+
+
+# Übungsarten zur Auswahl bei der Massen-Erfassung
+EXERCISE_TYPES = [
+    'Belastungsübung',
+    'Einsatzübung',
+    'Wärmegewöhnung',
+    'Streckenbegehung',
+    'Realeinsatz',
+]
+
+
+@login_required
+@leader_required
+def exercise_bulk_add(request):
+    """Übung für mehrere Mitglieder auf einmal erfassen (z.B. alle Anwesenden eines Dienstes)"""
+    duty = None
+    duty_id = request.POST.get('duty') or request.GET.get('duty', '')
+    if duty_id.isdigit():
+        duty = get_object_or_404(Duty, id=duty_id)
+
+    exercise_qualifications = [
+        q for q in reference_data().active_qualifications if q.requires_exercises
+    ]
+
+    if request.method == 'POST':
+        qualification = next(
+            (q for q in exercise_qualifications if str(q.id) == request.POST.get('qualification')), None
+        )
+        exercise_type = request.POST.get('exercise_type', '').strip()
+        notes = request.POST.get('notes', '')
+        try:
+            exercise_date = parse_date(request.POST.get('exercise_date', ''))
+        except ValueError:
+            exercise_date = None
+        member_ids = Member.objects.filter(
+            id__in=[value for value in request.POST.getlist('members') if value.isdigit()]
+        ).values_list('id', flat=True)
+
+        if not qualification:
+            messages.error(request, 'Bitte wählen Sie eine Qualifikation mit Übungspflicht.')
+        elif not exercise_date or not exercise_type:
+            messages.error(request, 'Bitte füllen Sie Datum und Übungsart aus.')
+        elif not member_ids:
+            messages.error(request, 'Bitte wählen Sie mindestens ein Mitglied aus.')
+        else:
+            created, skipped = record_exercises(
+                member_ids, qualification, exercise_date, exercise_type, notes
+            )
+            message = f'{created} Übungsnachweise ({qualification.code}) wurden erfasst.'
+            if skipped:
+                message += f' {skipped} Mitglieder hatten an diesem Tag bereits einen Nachweis.'
+            messages.success(request, message)
+            if duty:
+                return redirect('duty_detail', duty_id=duty.id)
+            return redirect('member_list')
+
+    members = Member.objects.filter(
+        status='active',
+        is_active=True
+    ).select_related('unit').order_by('unit__order', 'last_name', 'first_name')
+
+    # Bei Aufruf aus einem Dienst die Anwesenden vorauswählen
+    selected_ids = set()
+    if duty:
+        selected_ids = set(DutyAttendance.objects.filter(
+            duty=duty,
+            is_present=True
+        ).values_list('member_id', flat=True))
+
+    default_qualification = next(
+        (q for q in exercise_qualifications if q.code == 'AGT'), None
+    )
+
+    context = {
+        'duty': duty,
+        'members': members,
+        'selected_ids': selected_ids,
+        'exercise_qualifications': exercise_qualifications,
+        'default_qualification_id': default_qualification.id if default_qualification else None,
+        'exercise_date': duty.date if duty else date.today(),
+        'exercise_types': EXERCISE_TYPES,
+    }
+    return render(request, 'members/exercise_bulk.html', context)
@@ -0,0 +1,158 @@
+"""
+Qualifikations-Auswertungen für viele Mitglieder auf einmal.
+
+Statt pro Mitglied einzeln abzufragen (Member.has_qualification,
+Member.has_valid_agt_status), werden die benötigten Daten mit wenigen
+Abfragen geladen und im Speicher zugeordnet, oder als Ausdrücke für
+Annotationen und Filter direkt in SQL ausgewertet. Effektive
+Qualifikationen kommen aus der Tabelle MemberEffectiveQualification.
+"""
+
+from datetime import date
+
+from django.db.models import BooleanField, CharField, Exists, ExpressionWrapper, OuterRef, Q
+from django.db.models.expressions import RawSQL
+
+from apps.core.dates import add_months
+from .models import (
+    Qualification, MemberEffectiveQualification, MedicalExam, ExerciseRecord
+)
+
+
+def covered_qualifications():
+    """
+    Abdeckungs-Hierarchie auflösen (transitiv über Qualification.covers).
+
+    Returns:
+        dict: {qualification_id: set(qualification_ids)} inklusive der Qualifikation selbst
+    """
+    covers = {}
+    for qualification_id, covered_id in Qualification.covers.through.objects.values_list(
+        'from_qualification_id', 'to_qualification_id'
+    ):
+        covers.setdefault(qualification_id, set()).add(covered_id)
+
+    resolved = {}
+    for qualification_id in Qualification.objects.values_list('id', flat=True):
+        result = {qualification_id}
+        pending = [qualification_id]
+        while pending:
+            for covered_id in covers.get(pending.pop(), ()):
+                if covered_id not in result:
+                    result.add(covered_id)
+                    pending.append(covered_id)
+        resolved[qualification_id] = result
+    return resolved
+
+
+def effective_qualification_codes(member_ids=None):
+    """
+    Effektive Qualifikationen (eigene und abgedeckte) je Mitglied.
+
+    Args:
+        member_ids: Optional auf diese Mitglieder beschränken
+
+    Returns:
+        dict: {member_id: set(codes)}
+    """
+    effective = MemberEffectiveQualification.objects.all()
+    if member_ids is not None:
+        effective = effective.filter(member_id__in=member_ids)
+
+    result = {}
+    for member_id, code in effective.values_list('member_id', 'qualification__code'):
+        result.setdefault(member_id, set()).add(code)
+    return result
+
+
+def agt_exercise_cutoff(on_date=None):
+    """
+    Frühestes Datum einer Belastungsübung, die am Stichtag noch zählt.
+
+    Ein Jahr vor dem Stichtag; vom 29.02. aus der 28.02. des Vorjahres.
+    """
+    return add_months(on_date or date.today(), -12)
+
+
+def agt_valid_member_ids(member_ids=None, on_date=None):
+    """
+    Mitglieder mit gültigem AGT-Status (G26.3 gültig und Belastungsübung im letzten Jahr).
+
+    Gleiche Regeln wie Member.has_valid_agt_status, aber mit zwei Abfragen für alle Mitglieder.
+
+    Returns:
+        set: IDs der Mitglieder mit gültigem AGT-Status
+    """
+    on_date = on_date or date.today()
+    one_year_ago = agt_exercise_cutoff(on_date)
+
+    exams = MedicalExam.objects.filter(
+        exam_type__code='G26.3',
+        valid_until__gte=on_date,
+        result_positive=True
+    )
+    exercises = ExerciseRecord.objects.filter(
+        qualification__code='AGT',
+        exercise_date__gte=one_year_ago
+    )
+    if member_ids is not None:
+        exams = exams.filter(member_id__in=member_ids)
+        exercises = exercises.filter(member_id__in=member_ids)
+
+    g26_valid = set(exams.values_list('member_id', flat=True))
+    with_exercise = set(exercises.values_list('member_id', flat=True))
+    return g26_valid & with_exercise
+
+
+def has_effective_qualification(code, member_ref='pk'):
+    """
+    Filter-Ausdruck: Mitglied besitzt die Qualifikation oder eine abdeckende.
+
+    Einfacher Join über den Index von MemberEffectiveQualification.
+    """
+    return Exists(MemberEffectiveQualification.objects.filter(
+        member_id=OuterRef(member_ref),
+        qualification__code=code
+    ))
+
+
+def effective_codes_expression():
+    """
+    Annotation: effektive Qualifikationskürzel eines Mitglieds als kommagetrennter Text.
+
+    Korrelierte Unterabfrage mit GROUP_CONCAT (alphabetisch sortiert).
+    """
+    member_table = MemberEffectiveQualification._meta.get_field('member').related_model._meta.db_table
+    return RawSQL(
+        f'''
+        SELECT GROUP_CONCAT(code, ',') FROM (
+            SELECT qualification.code FROM {MemberEffectiveQualification._meta.db_table} effective
+            JOIN {Qualification._meta.db_table} qualification ON qualification.id = effective.qualification_id
+            WHERE effective.member_id = "{member_table}"."id"
+            ORDER BY qualification.code
+        )
+        ''',
+        [],
+        output_field=CharField()
+    )
+
+
+def agt_valid_expression(on_date=None, member_ref='pk'):
+    """
+    Annotation/Filter: AGT-Status gültig (gleiche Regeln wie agt_valid_member_ids).
+    """
+    on_date = on_date or date.today()
+    one_year_ago = agt_exercise_cutoff(on_date)
+
+    g26_valid = Exists(MedicalExam.objects.filter(
+        member_id=OuterRef(member_ref),
+        exam_type__code='G26.3',
+        valid_until__gte=on_date,
+        result_positive=True
+    ))
+    with_exercise = Exists(ExerciseRecord.objects.filter(
+        member_id=OuterRef(member_ref),
+        qualification__code='AGT',
+        exercise_date__gte=one_year_ago
+    ))
+    return ExpressionWrapper(Q(g26_valid) & Q(with_exercise), output_field=BooleanField())
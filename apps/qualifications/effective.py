@@ -0,0 +1,109 @@
+"""
+Pflege der Tabelle MemberEffectiveQualification.
+
+Die effektiven Qualifikationen eines Mitglieds ergeben sich aus seinen
+eigenen Qualifikationen und allen, die diese (transitiv) über
+Qualification.covers abdecken. Statt die Hierarchie bei jeder Abfrage
+aufzulösen, werden sie hier bei Änderungen nachgeführt:
+
+- MemberQualification angelegt/gelöscht: nur dieses Mitglied neu berechnen
+- Qualification.covers geändert: nur Mitglieder neu berechnen, die die
+  geänderte Qualifikation oder eine sie abdeckende besitzen
+"""
+
+from django.db import transaction
+from django.dispatch import Signal
+
+from .bulk import covered_qualifications
+from .models import MemberEffectiveQualification, MemberQualification
+
+
+# Gesendet nach Änderungen mit member_ids (None = alle Mitglieder)
+effective_qualifications_changed = Signal()
+
+
+def expected_pairs(member_ids=None, coverage=None):
+    """Soll-Zustand als Menge von (member_id, qualification_id)"""
+    coverage = coverage if coverage is not None else covered_qualifications()
+
+    member_qualifications = MemberQualification.objects.all()
+    if member_ids is not None:
+        member_qualifications = member_qualifications.filter(member_id__in=member_ids)
+
+    pairs = set()
+    for member_id, qualification_id in member_qualifications.values_list('member_id', 'qualification_id'):
+        pairs.update(
+            (member_id, covered_id)
+            for covered_id in coverage.get(qualification_id, {qualification_id})
+        )
+    return pairs
+
+
+@transaction.atomic
+def refresh_members(member_ids, coverage=None):
+    """
+    Effektive Qualifikationen für die angegebenen Mitglieder abgleichen.
+
+    Returns:
+        tuple: (angelegt, gelöscht)
+    """
+    member_ids = list(member_ids)
+    if not member_ids:
+        return 0, 0
+
+    expected = expected_pairs(member_ids, coverage)
+    existing = {
+        (member_id, qualification_id): pk
+        for pk, member_id, qualification_id in MemberEffectiveQualification.objects.filter(
+            member_id__in=member_ids
+        ).values_list('pk', 'member_id', 'qualification_id')
+    }
+
+    stale = {pair: pk for pair, pk in existing.items() if pair not in expected}
+    missing = [pair for pair in expected if pair not in existing]
+
+    if stale:
+        MemberEffectiveQualification.objects.filter(pk__in=stale.values()).delete()
+    MemberEffectiveQualification.objects.bulk_create([
+        MemberEffectiveQualification(member_id=member_id, qualification_id=qualification_id)
+        for member_id, qualification_id in missing
+    ])
+
+    changed_member_ids = {member_id for member_id, _ in missing} | {member_id for member_id, _ in stale}
+    if changed_member_ids:
+        effective_qualifications_changed.send(
+            sender=MemberEffectiveQualification, member_ids=changed_member_ids
+        )
+    return len(missing), len(stale)
+
+
+def refresh_for_qualification(qualification_id):
+    """Nach Änderung von covers: betroffene Mitglieder neu berechnen"""
+    coverage = covered_qualifications()
+    covering_ids = [
+        covering_id
+        for covering_id, covered in coverage.items()
+        if qualification_id in covered
+    ]
+    member_ids = MemberQualification.objects.filter(
+        qualification_id__in=covering_ids
+    ).values_list('member_id', flat=True).distinct()
+    return refresh_members(member_ids, coverage)
+
+
+@transaction.atomic
+def rebuild():
+    """
+    Tabelle vollständig neu aufbauen.
+
+    Returns:
+        int: Anzahl der Einträge
+    """
+    MemberEffectiveQualification.objects.all().delete()
+    created = MemberEffectiveQualification.objects.bulk_create([
+        MemberEffectiveQualification(member_id=member_id, qualification_id=qualification_id)
+        for member_id, qualification_id in expected_pairs()
+    ], batch_size=1000)
+
+    effective_qualifications_changed.send(sender=MemberEffectiveQualification, member_ids=None)
+    return len(created)
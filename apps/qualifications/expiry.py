@@ -0,0 +1,188 @@
+"""
+Ablauftermine erneuerungspflichtiger Status (Tabelle StatusExpiry).
+
+Je Mitglied wird gespeichert, wann ein Status als Nächstes abläuft:
+
+- Untersuchung: spätestes valid_until der bestandenen Untersuchungen
+  eines Typs (z.B. G26.3)
+- Übungen: bei Qualifikationen mit Übungspflicht (z.B. AGT) gilt der
+  Status, solange in den letzten 12 Monaten mindestens exercise_count
+  Übungen liegen. Er läuft also ein Jahr nach der exercise_count-letzten
+  Übung ab.
+
+Die Tabelle wird bei Änderungen an Untersuchungen und Übungen für das
+betroffene Mitglied nachgeführt. "Wer läuft in den nächsten 60 Tagen ab"
+ist damit eine einzige Bereichsabfrage auf expires_on.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Max
+
+from apps.core.dates import add_months
+from apps.core.refdata import reference_data
+from .models import ExerciseRecord, MedicalExam, StatusExpiry
+
+
+# Vorwarnzeit für ablaufende Status (Tage)
+EXPIRY_WARNING_DAYS = 60
+
+
+def exam_expiries(member_ids=None):
+    """
+    Ablauftermine aus Untersuchungen.
+
+    Returns:
+        dict: {(member_id, exam_type_id): date}
+    """
+    exams = MedicalExam.objects.filter(result_positive=True).exclude(valid_until=None)
+    if member_ids is not None:
+        exams = exams.filter(member_id__in=member_ids)
+    return {
+        (member_id, exam_type_id): until
+        for member_id, exam_type_id, until in exams.values('member_id', 'exam_type_id').annotate(
+            until=Max('valid_until')
+        ).values_list('member_id', 'exam_type_id', 'until')
+    }
+
+
+def exercise_expiries(member_ids=None):
+    """
+    Ablauftermine aus Übungen.
+
+    Returns:
+        dict: {(member_id, qualification_id): date}
+    """
+    required_counts = {
+        q.id: q.exercise_count
+        for q in reference_data().qualifications
+        if q.requires_exercises
+    }
+    if not required_counts:
+        return {}
+
+    records = ExerciseRecord.objects.filter(qualification_id__in=list(required_counts))
+    if member_ids is not None:
+        records = records.filter(member_id__in=member_ids)
+
+    dates = {}
+    for member_id, qualification_id, exercise_date in records.order_by('-exercise_date').values_list(
+        'member_id', 'qualification_id', 'exercise_date'
+    ):
+        dates.setdefault((member_id, qualification_id), []).append(exercise_date)
+
+    result = {}
+    for (member_id, qualification_id), exercise_dates in dates.items():
+        required = required_counts[qualification_id] or 1
+        if len(exercise_dates) >= required:
+            result[(member_id, qualification_id)] = add_months(exercise_dates[required - 1], 12)
+    return result
+
+
+def compute(member_ids=None):
+    """
+    Soll-Zustand berechnen.
+
+    Returns:
+        dict: {(member_id, kind, exam_type_id, qualification_id): date}
+    """
+    expected = {
+        (member_id, StatusExpiry.Kind.EXAM, exam_type_id, None): until
+        for (member_id, exam_type_id), until in exam_expiries(member_ids).items()
+    }
+    expected.update({
+        (member_id, StatusExpiry.Kind.EXERCISE, None, qualification_id): until
+        for (member_id, qualification_id), until in exercise_expiries(member_ids).items()
+    })
+    return expected
+
+
+@transaction.atomic
+def refresh_members(member_ids=None):
+    """
+    Ablauftermine für die angegebenen Mitglieder abgleichen (None = alle).
+
+    Returns:
+        tuple: (angelegt, geändert, gelöscht)
+    """
+    if member_ids is not None:
+        member_ids = list(member_ids)
+        if not member_ids:
+            return 0, 0, 0
+
+    expected = compute(member_ids)
+
+    existing = StatusExpiry.objects.all()
+    if member_ids is not None:
+        existing = existing.filter(member_id__in=member_ids)
+
+    stale = []
+    changed = []
+    for expiry in existing:
+        key = (expiry.member_id, expiry.kind, expiry.exam_type_id, expiry.qualification_id)
+        if key not in expected:
+            stale.append(expiry.pk)
+            continue
+        expires_on = expected.pop(key)
+        if expiry.expires_on != expires_on:
+            expiry.expires_on = expires_on
+            changed.append(expiry)
+
+    if stale:
+        StatusExpiry.objects.filter(pk__in=stale).delete()
+    StatusExpiry.objects.bulk_update(changed, ['expires_on'])
+    StatusExpiry.objects.bulk_create([
+        StatusExpiry(
+            member_id=member_id,
+            kind=kind,
+            exam_type_id=exam_type_id,
+            qualification_id=qualification_id,
+            expires_on=expires_on
+        )
+        for (member_id, kind, exam_type_id, qualification_id), expires_on in expected.items()
+    ], batch_size=1000)
+    return len(expected), len(changed), len(stale)
+
+
+def refresh_for_qualification(qualification_id):
+    """Nach Änderung der Übungspflicht: betroffene Mitglieder neu berechnen"""
+    member_ids = set(ExerciseRecord.objects.filter(
+        qualification_id=qualification_id
+    ).values_list('member_id', flat=True))
+    member_ids.update(StatusExpiry.objects.filter(
+        qualification_id=qualification_id
+    ).values_list('member_id', flat=True))
+    return refresh_members(member_ids)
+
+
+@transaction.atomic
+def rebuild():
+    """
+    Tabelle vollständig neu aufbauen.
+
+    Returns:
+        int: Anzahl der Einträge
+    """
+    StatusExpiry.objects.all().delete()
+    created = StatusExpiry.objects.bulk_create([
+        StatusExpiry(
+            member_id=member_id,
+            kind=kind,
+            exam_type_id=exam_type_id,
+            qualification_id=qualification_id,
+            expires_on=expires_on
+        )
+        for (member_id, kind, exam_type_id, qualification_id), expires_on in compute().items()
+    ], batch_size=1000)
+    return len(created)
+
+
+def expiring(on_date, days=EXPIRY_WARNING_DAYS):
+    """Status, die zwischen Stichtag und Stichtag + days ablaufen (aktive Mitglieder)"""
+    return StatusExpiry.objects.filter(
+        expires_on__gte=on_date,
+        expires_on__lte=on_date + timedelta(days=days),
+        member__is_active=True,
+        member__status='active'
+    ).select_related('member', 'exam_type', 'qualification')
@@ -0,0 +1,174 @@
+"""
+CSV-Import für ärztliche Untersuchungen (z.B. G26.3-Listen des Betriebsarztes).
+
+Ablauf wie beim Mitglieder-Import:
+1. Mitglieder und bereits erfasste Untersuchungen mit je einer Abfrage
+   laden und daraus Nachschlage-Tabellen im Speicher aufbauen;
+   Untersuchungstypen kommen aus dem Stammdaten-Cache
+2. Jede Zeile prüfen; valid_until wird aus der Gültigkeitsdauer des
+   (einmal geladenen) Untersuchungstyps berechnet, nicht je Zeile in save()
+3. Alle Untersuchungen mit einem bulk_create schreiben und Ablauftermine
+   sowie Eignungen der betroffenen Mitglieder einmalig nachführen
+"""
+
+from django.db import transaction
+
+from apps.core.dates import add_months
+from apps.core.refdata import reference_data
+from apps.members.importer import parse_date
+from apps.members.models import Member
+from .models import MedicalExam
+from .records import send_records_changed
+
+
+# Ergebnis-Mapping (leer = bestanden)
+RESULT_MAPPING = {
+    '': True,
+    'bestanden': True,
+    'tauglich': True,
+    'positiv': True,
+    'ja': True,
+    'nicht bestanden': False,
+    'untauglich': False,
+    'negativ': False,
+    'nein': False,
+}
+
+
+class MedicalExamImporter:
+    """Importiert Untersuchungs-Zeilen mit wenigen Massen-Abfragen"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.created_count = 0
+        self.updated_count = 0
+        self.errors = []
+
+        self.to_create = []
+
+    @property
+    def error_count(self):
+        return len(self.errors)
+
+    def build_lookups(self):
+        """Nachschlage-Tabellen für Mitglieder, Untersuchungstypen und bestehende Untersuchungen"""
+        self.by_number = {}
+        self.by_name = {}
+        for member_id, member_number, first_name, last_name, birth_date in Member.objects.values_list(
+            'id', 'member_number', 'first_name', 'last_name', 'birth_date'
+        ):
+            if member_number:
+                self.by_number.setdefault(member_number, member_id)
+            self.by_name.setdefault(
+                (first_name.casefold(), last_name.casefold()), []
+            ).append((member_id, birth_date))
+
+        self.exam_types = reference_data().exam_types_by_code
+
+        self.existing = set(MedicalExam.objects.values_list('member_id', 'exam_type_id', 'exam_date'))
+
+    def find_member(self, member_number, first_name, last_name, birth_date):
+        """
+        Mitglied nach Mitgliedsnummer oder Name (+ Geburtsdatum) suchen.
+
+        Returns:
+            tuple: (member_id oder None, Fehlermeldung oder None)
+        """
+        if member_number:
+            member_id = self.by_number.get(member_number)
+            if member_id:
+                return member_id, None
+
+        candidates = self.by_name.get((first_name.casefold(), last_name.casefold()), [])
+        if birth_date:
+            candidates = [candidate for candidate in candidates if candidate[1] == birth_date]
+
+        if len(candidates) == 1:
+            return candidates[0][0], None
+        if candidates:
+            return None, f'{first_name} {last_name} ist nicht eindeutig (bitte Mitgliedsnummer oder Geburtsdatum angeben)'
+        return None, 'Mitglied nicht gefunden'
+
+    def classify_row(self, row_num, row):
+        """Eine CSV-Zeile prüfen und als neue Untersuchung vormerken"""
+        member_number = row.get('mitgliedsnummer', '').strip()
+        vorname = row.get('vorname', '').strip()
+        nachname = row.get('nachname', '').strip()
+
+        if not member_number and not (vorname and nachname):
+            self.errors.append(f'Zeile {row_num}: Mitgliedsnummer oder Vor- und Nachname sind erforderlich.')
+            return
+
+        code = row.get('untersuchung', '').strip()
+        exam_type = self.exam_types.get(code.casefold())
+        if not exam_type:
+            self.errors.append(f'Zeile {row_num}: Unbekannte Untersuchung "{code}".')
+            return
+
+        exam_date = parse_date(row.get('datum', ''))
+        if not exam_date:
+            self.errors.append(f'Zeile {row_num}: Untersuchungsdatum fehlt oder ist ungültig.')
+            return
+
+        result = row.get('ergebnis', '').strip().lower()
+        if result not in RESULT_MAPPING:
+            self.errors.append(f'Zeile {row_num}: Unbekanntes Ergebnis "{result}".')
+            return
+
+        member_id, error = self.find_member(
+            member_number, vorname, nachname, parse_date(row.get('geburtsdatum', ''))
+        )
+        if error:
+            self.errors.append(f'Zeile {row_num}: {error}.')
+            return
+
+        key = (member_id, exam_type.id, exam_date)
+        if key in self.existing:
+            self.errors.append(f'Zeile {row_num}: {exam_type.code} vom {exam_date:%d.%m.%Y} ist bereits erfasst.')
+            return
+        self.existing.add(key)
+
+        valid_until = parse_date(row.get('gueltig_bis', '')) or add_months(exam_date, exam_type.validity_months)
+        self.to_create.append(MedicalExam(
+            member_id=member_id,
+            exam_type=exam_type,
+            exam_date=exam_date,
+            valid_until=valid_until,
+            result_positive=RESULT_MAPPING[result],
+            notes=row.get('bemerkungen', '').strip()
+        ))
+        self.created_count += 1
+
+    def classify(self, on_row=None):
+        """
+        Alle Zeilen prüfen.
+
+        Args:
+            on_row: Optionaler Callback (verarbeitete Zeilen) für Fortschrittsanzeigen
+        """
+        for index, row in enumerate(self.rows, start=1):
+            row_num = index + 1  # Zeile 1 ist die Kopfzeile
+            try:
+                self.classify_row(row_num, row)
+            except Exception as e:
+                self.errors.append(f'Zeile {row_num}: {str(e)}')
+            if on_row:
+                on_row(index)
+
+    @transaction.atomic
+    def apply(self):
+        """Untersuchungen gesammelt schreiben"""
+        MedicalExam.objects.bulk_create(self.to_create, batch_size=500)
+
+        # bulk_create löst keine Signale aus
+        send_records_changed(exam.member_id for exam in self.to_create)
+
+    def run(self, on_row=None, dry_run=False, on_apply=None):
+        """Import durchführen (bei dry_run nur prüfen); on_apply wird vor dem Speichern aufgerufen"""
+        self.build_lookups()
+        self.classify(on_row)
+        if not dry_run:
+            if on_apply:
+                on_apply()
+            self.apply()
+        return self
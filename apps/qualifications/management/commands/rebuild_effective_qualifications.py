@@ -0,0 +1,22 @@
+"""
+Management-Command zum Neuaufbau der effektiven Qualifikationen.
+
+Die Tabelle wird normalerweise automatisch nachgeführt. Der Neuaufbau ist
+nur nötig, wenn Daten an den Signalen vorbei geändert wurden (z.B. direkt
+in der Datenbank oder per bulk_create).
+
+Verwendung:
+    python manage.py rebuild_effective_qualifications
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.qualifications.effective import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Baut die Tabelle der effektiven Qualifikationen neu auf'
+
+    def handle(self, *args, **options):
+        count = rebuild()
+        self.stdout.write(self.style.SUCCESS(f'{count} effektive Qualifikationen angelegt'))
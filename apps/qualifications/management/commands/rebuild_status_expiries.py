@@ -0,0 +1,22 @@
+"""
+Management-Command zum Neuaufbau der Ablauftermine.
+
+Die Tabelle wird normalerweise automatisch nachgeführt. Der Neuaufbau ist
+nur nötig, wenn Untersuchungen oder Übungen an den Signalen vorbei
+geändert wurden (z.B. direkt in der Datenbank oder per bulk_create).
+
+Verwendung:
+    python manage.py rebuild_status_expiries
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.qualifications.expiry import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Baut die Tabelle der Ablauftermine (Untersuchungen, Übungen) neu auf'
+
+    def handle(self, *args, **options):
+        count = rebuild()
+        self.stdout.write(self.style.SUCCESS(f'{count} Ablauftermine angelegt'))
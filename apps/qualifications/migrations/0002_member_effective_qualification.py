@@ -0,0 +1,58 @@
+# Generated by Django 6.0 on 2026-10-19 05:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_effective_qualifications(apps, schema_editor):
+    Qualification = apps.get_model('qualifications', 'Qualification')
+    MemberQualification = apps.get_model('qualifications', 'MemberQualification')
+    MemberEffectiveQualification = apps.get_model('qualifications', 'MemberEffectiveQualification')
+
+    covers = {}
+    for qualification_id, covered_id in Qualification.covers.through.objects.values_list(
+        'from_qualification_id', 'to_qualification_id'
+    ):
+        covers.setdefault(qualification_id, set()).add(covered_id)
+
+    pairs = set()
+    for member_id, qualification_id in MemberQualification.objects.values_list('member_id', 'qualification_id'):
+        pending = [qualification_id]
+        seen = {qualification_id}
+        while pending:
+            for covered_id in covers.get(pending.pop(), ()):
+                if covered_id not in seen:
+                    seen.add(covered_id)
+                    pending.append(covered_id)
+        pairs.update((member_id, covered_id) for covered_id in seen)
+
+    MemberEffectiveQualification.objects.bulk_create([
+        MemberEffectiveQualification(member_id=member_id, qualification_id=qualification_id)
+        for member_id, qualification_id in pairs
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0004_member_fts'),
+        ('qualifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MemberEffectiveQualification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='effective_qualifications', to='members.member', verbose_name='Mitglied')),
+                ('qualification', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='effective_members', to='qualifications.qualification', verbose_name='Qualifikation')),
+            ],
+            options={
+                'verbose_name': 'Effektive Qualifikation',
+                'verbose_name_plural': 'Effektive Qualifikationen',
+                'indexes': [models.Index(fields=['qualification', 'member'], name='qualificati_qualifi_39c2bd_idx')],
+                'unique_together': {('member', 'qualification')},
+            },
+        ),
+        migrations.RunPython(fill_effective_qualifications, migrations.RunPython.noop),
+    ]
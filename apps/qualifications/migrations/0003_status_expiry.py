@@ -0,0 +1,71 @@
+# Generated by Django 6.0 on 2026-10-19 06:45
+
+import django.db.models.deletion
+from dateutil.relativedelta import relativedelta
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def fill_status_expiries(apps, schema_editor):
+    Qualification = apps.get_model('qualifications', 'Qualification')
+    MedicalExam = apps.get_model('qualifications', 'MedicalExam')
+    ExerciseRecord = apps.get_model('qualifications', 'ExerciseRecord')
+    StatusExpiry = apps.get_model('qualifications', 'StatusExpiry')
+
+    expiries = [
+        StatusExpiry(member_id=member_id, kind='exam', exam_type_id=exam_type_id, expires_on=until)
+        for member_id, exam_type_id, until in MedicalExam.objects.filter(
+            result_positive=True
+        ).exclude(valid_until=None).values('member_id', 'exam_type_id').annotate(
+            until=Max('valid_until')
+        ).values_list('member_id', 'exam_type_id', 'until')
+    ]
+
+    required_counts = dict(
+        Qualification.objects.filter(requires_exercises=True).values_list('id', 'exercise_count')
+    )
+    dates = {}
+    for member_id, qualification_id, exercise_date in ExerciseRecord.objects.filter(
+        qualification_id__in=list(required_counts)
+    ).order_by('-exercise_date').values_list('member_id', 'qualification_id', 'exercise_date'):
+        dates.setdefault((member_id, qualification_id), []).append(exercise_date)
+    for (member_id, qualification_id), exercise_dates in dates.items():
+        required = required_counts[qualification_id] or 1
+        if len(exercise_dates) >= required:
+            expiries.append(StatusExpiry(
+                member_id=member_id,
+                kind='exercise',
+                qualification_id=qualification_id,
+                expires_on=exercise_dates[required - 1] + relativedelta(years=1)
+            ))
+
+    StatusExpiry.objects.bulk_create(expiries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0004_member_fts'),
+        ('qualifications', '0002_member_effective_qualification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusExpiry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('exam', 'Untersuchung'), ('exercise', 'Übungen')], max_length=10, verbose_name='Art')),
+                ('expires_on', models.DateField(verbose_name='Läuft ab am')),
+                ('exam_type', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='status_expiries', to='qualifications.medicalexamtype', verbose_name='Untersuchungstyp')),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_expiries', to='members.member', verbose_name='Mitglied')),
+                ('qualification', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='status_expiries', to='qualifications.qualification', verbose_name='Qualifikation')),
+            ],
+            options={
+                'verbose_name': 'Ablauftermin',
+                'verbose_name_plural': 'Ablauftermine',
+                'ordering': ['expires_on'],
+                'indexes': [models.Index(fields=['expires_on'], name='qualificati_expires_8756d4_idx'), models.Index(fields=['member', 'kind'], name='qualificati_member__53f422_idx')],
+            },
+        ),
+        migrations.RunPython(fill_status_expiries, migrations.RunPython.noop),
+    ]
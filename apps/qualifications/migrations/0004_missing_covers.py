@@ -0,0 +1,54 @@
+# Generated by Django 6.0 on 2026-10-19 08:10
+
+from importlib import import_module
+
+from django.db import migrations
+
+
+# Beziehungen der früher fest im Dienstplan-Generator hinterlegten Hierarchie,
+# die der Einrichtungsassistent nicht als covers angelegt hat:
+# (abdeckende Qualifikation, abgedeckte Qualifikation)
+MISSING_COVERS = [
+    ('TM2', 'TM1'),
+    ('ABC2', 'ABC1'),
+    ('VF', 'ZF'),
+]
+
+
+def add_missing_covers(apps, schema_editor):
+    Qualification = apps.get_model('qualifications', 'Qualification')
+    MemberEffectiveQualification = apps.get_model('qualifications', 'MemberEffectiveQualification')
+    Covers = Qualification.covers.through
+
+    by_code = dict(Qualification.objects.values_list('code', 'id'))
+    existing = set(Covers.objects.values_list('from_qualification_id', 'to_qualification_id'))
+    missing = [
+        (by_code[code], by_code[covered_code])
+        for code, covered_code in MISSING_COVERS
+        if code in by_code and covered_code in by_code
+        and (by_code[code], by_code[covered_code]) not in existing
+    ]
+    if not missing:
+        return
+
+    Covers.objects.bulk_create([
+        Covers(from_qualification_id=qualification_id, to_qualification_id=covered_id)
+        for qualification_id, covered_id in missing
+    ])
+
+    # Effektive Qualifikationen mit der ergänzten Hierarchie neu aufbauen
+    MemberEffectiveQualification.objects.all().delete()
+    import_module(
+        'apps.qualifications.migrations.0002_member_effective_qualification'
+    ).fill_effective_qualifications(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qualifications', '0003_status_expiry'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_missing_covers, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.utils import timezone
-from dateutil.relativedelta import relativedelta
+
+from apps.core.dates import add_months
 
 
 class QualificationCategory(models.Model):
@@ -122,6 +123,38 @@ class MemberQualification(models.Model):
         return f"{self.member} - {self.qualification.code}"
 
 
+class MemberEffectiveQualification(models.Model):
+    """
+    Effektive Qualifikation eines Mitglieds (eigene und über covers abgedeckte).
+
+    Denormalisiert aus MemberQualification und Qualification.covers, wird
+    über Signale gepflegt (siehe effective.py).
+    """
+    member = models.ForeignKey(
+        'members.Member',
+        on_delete=models.CASCADE,
+        related_name='effective_qualifications',
+        verbose_name='Mitglied'
+    )
+    qualification = models.ForeignKey(
+        Qualification,
+        on_delete=models.CASCADE,
+        related_name='effective_members',
+        verbose_name='Qualifikation'
+    )
+
+    class Meta:
+        verbose_name = 'Effektive Qualifikation'
+        verbose_name_plural = 'Effektive Qualifikationen'
+        unique_together = ['member', 'qualification']
+        indexes = [
+            models.Index(fields=['qualification', 'member']),
+        ]
+
+    def __str__(self):
+        return f"{self.member} - {self.qualification.code}"
+
+
 class MedicalExam(models.Model):
     """Ärztliche Untersuchung eines Mitglieds"""
     member = models.ForeignKey(
@@ -149,9 +182,7 @@ class MedicalExam(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.valid_until and self.exam_type:
-            self.valid_until = self.exam_date + relativedelta(
-                months=self.exam_type.validity_months
-            )
+            self.valid_until = add_months(self.exam_date, self.exam_type.validity_months)
         super().save(*args, **kwargs)
 
     @property
@@ -188,3 +219,60 @@ class ExerciseRecord(models.Model):
 
     def __str__(self):
         return f"{self.member} - {self.exercise_type} ({self.exercise_date})"
+
+
+class StatusExpiry(models.Model):
+    """
+    Nächster Ablauftermin eines erneuerungspflichtigen Status je Mitglied.
+
+    Denormalisiert aus MedicalExam (je Untersuchungstyp) und ExerciseRecord
+    (je Qualifikation mit Übungspflicht), wird über Signale gepflegt
+    (siehe expiry.py).
+    """
+
+    class Kind(models.TextChoices):
+        EXAM = 'exam', 'Untersuchung'
+        EXERCISE = 'exercise', 'Übungen'
+
+    member = models.ForeignKey(
+        'members.Member',
+        on_delete=models.CASCADE,
+        related_name='status_expiries',
+        verbose_name='Mitglied'
+    )
+    kind = models.CharField('Art', max_length=10, choices=Kind.choices)
+    exam_type = models.ForeignKey(
+        MedicalExamType,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='status_expiries',
+        verbose_name='Untersuchungstyp'
+    )
+    qualification = models.ForeignKey(
+        Qualification,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='status_expiries',
+        verbose_name='Qualifikation'
+    )
+    expires_on = models.DateField('Läuft ab am')
+
+    class Meta:
+        verbose_name = 'Ablauftermin'
+        verbose_name_plural = 'Ablauftermine'
+        ordering = ['expires_on']
+        indexes = [
+            models.Index(fields=['expires_on']),
+            models.Index(fields=['member', 'kind']),
+        ]
+
+    @property
+    def label(self):
+        if self.kind == self.Kind.EXAM:
+            return self.exam_type.code
+        return f'{self.qualification.code}-Übungen'
+
+    def __str__(self):
+        return f"{self.member} - {self.label} ({self.expires_on})"
@@ -0,0 +1,57 @@
+"""
+Massen-Erfassung von Nachweisen (Übungen, Untersuchungen).
+
+bulk_create löst keine post_save-Signale aus. Damit abgeleitete Tabellen
+(Ablauftermine, Eignungs-Index) trotzdem aktuell bleiben, wird nach jeder
+Massen-Erfassung einmalig records_changed mit den betroffenen Mitgliedern
+gesendet.
+"""
+
+from django.db import transaction
+from django.dispatch import Signal
+
+from .models import ExerciseRecord
+
+
+# Gesendet nach Massen-Änderungen an Untersuchungen/Übungen mit member_ids
+records_changed = Signal()
+
+
+def send_records_changed(member_ids):
+    """Abgeleitete Tabellen für die betroffenen Mitglieder nachführen"""
+    member_ids = set(member_ids)
+    if member_ids:
+        records_changed.send(sender=ExerciseRecord, member_ids=member_ids)
+
+
+@transaction.atomic
+def record_exercises(member_ids, qualification, exercise_date, exercise_type, notes=''):
+    """
+    Eine Übung für mehrere Mitglieder erfassen.
+
+    Mitglieder, für die am selben Tag bereits eine Übung zu dieser
+    Qualifikation erfasst ist, werden übersprungen.
+
+    Returns:
+        tuple: (angelegt, übersprungen)
+    """
+    member_ids = set(member_ids)
+    existing = set(ExerciseRecord.objects.filter(
+        member_id__in=member_ids,
+        qualification=qualification,
+        exercise_date=exercise_date
+    ).values_list('member_id', flat=True))
+
+    created = ExerciseRecord.objects.bulk_create([
+        ExerciseRecord(
+            member_id=member_id,
+            qualification=qualification,
+            exercise_date=exercise_date,
+            exercise_type=exercise_type,
+            notes=notes
+        )
+        for member_id in sorted(member_ids - existing)
+    ])
+
+    send_records_changed(record.member_id for record in created)
+    return len(created), len(existing)
@@ -0,0 +1,59 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from . import expiry
+from .effective import rebuild, refresh_for_qualification, refresh_members
+from .models import ExerciseRecord, MedicalExam, MemberQualification, Qualification
+from .records import records_changed
+
+
+@receiver(post_save, sender=MemberQualification)
+@receiver(post_delete, sender=MemberQualification)
+def update_effective_qualifications(sender, instance, raw=False, **kwargs):
+    """Effektive Qualifikationen des Mitglieds nachführen"""
+    if raw:
+        return
+    refresh_members([instance.member_id])
+
+
+@receiver(m2m_changed, sender=Qualification.covers.through)
+def update_effective_qualifications_for_covers(sender, instance, action, reverse, pk_set, **kwargs):
+    """Nach Änderung der Abdeckungs-Hierarchie betroffene Mitglieder nachführen"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        # qualification.covers.add(...): instance ist die abdeckende Qualifikation
+        refresh_for_qualification(instance.pk)
+    elif pk_set:
+        # qualification.covered_by.add(...): pk_set sind die abdeckenden Qualifikationen
+        for qualification_id in pk_set:
+            refresh_for_qualification(qualification_id)
+    else:
+        # covered_by.clear(): die bisher abdeckenden Qualifikationen sind nicht mehr bekannt
+        rebuild()
+
+
+@receiver(post_save, sender=MedicalExam)
+@receiver(post_delete, sender=MedicalExam)
+@receiver(post_save, sender=ExerciseRecord)
+@receiver(post_delete, sender=ExerciseRecord)
+def update_status_expiries(sender, instance, raw=False, **kwargs):
+    """Ablauftermine des Mitglieds nachführen"""
+    if raw:
+        return
+    expiry.refresh_members([instance.member_id])
+
+
+@receiver(records_changed)
+def update_status_expiries_for_records(sender, member_ids, **kwargs):
+    """Ablauftermine nach Massen-Erfassung nachführen"""
+    expiry.refresh_members(member_ids)
+
+
+@receiver(post_save, sender=Qualification)
+def update_status_expiries_for_qualification(sender, instance, created, raw=False, **kwargs):
+    """Ablauftermine nach Änderung der Übungspflicht nachführen"""
+    if raw or created:
+        return
+    expiry.refresh_for_qualification(instance.pk)
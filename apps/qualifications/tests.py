@@ -1,3 +1,373 @@
+from datetime import date, timedelta
+
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.core.models import Settings, User
+from apps.members.importer import read_csv
+from apps.members.models import Member
+from . import expiry
+from .importer import MedicalExamImporter
+from .records import record_exercises, records_changed
+from .models import (
+    ExerciseRecord, MedicalExam, MedicalExamType, MemberEffectiveQualification, MemberQualification, Qualification,
+    StatusExpiry
+)
+
+
+HEADER = 'mitgliedsnummer;vorname;nachname;geburtsdatum;untersuchung;datum;ergebnis;gueltig_bis\n'
+
+
+def import_csv(lines, dry_run=False):
+    return MedicalExamImporter(read_csv(HEADER + ''.join(f'{line}\n' for line in lines))).run(dry_run=dry_run)
+
+
+class MedicalExamImporterTests(TestCase):
+    """CSV-Import für ärztliche Untersuchungen"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.g26 = MedicalExamType.objects.create(code='G26.3', name='Atemschutz', validity_months=36)
+        cls.anna = Member.objects.create(first_name='Anna', last_name='Alt', member_number='100', status='active')
+        cls.bernd_1980 = Member.objects.create(
+            first_name='Bernd', last_name='Berg', birth_date=date(1980, 5, 1), status='active'
+        )
+        cls.bernd_1990 = Member.objects.create(
+            first_name='Bernd', last_name='Berg', birth_date=date(1990, 5, 1), status='active'
+        )
+
+    def test_creates_exams_with_validity_from_exam_type(self):
+        importer = import_csv([
+            '100;;;;g26.3;15.01.2026;;',
+            ';Bernd;Berg;01.05.1980;G26.3;2026-02-01;untauglich;2026-06-30',
+        ])
+
+        self.assertEqual((importer.created_count, importer.errors), (2, []))
+        exam = MedicalExam.objects.get(member=self.anna)
+        self.assertEqual(exam.exam_type, self.g26)
+        self.assertEqual(exam.valid_until, date(2029, 1, 15))
+        self.assertTrue(exam.result_positive)
+        exam = MedicalExam.objects.get(member=self.bernd_1980)
+        self.assertEqual(exam.valid_until, date(2026, 6, 30))
+        self.assertFalse(exam.result_positive)
+
+    def test_status_expiries_follow_import(self):
+        import_csv(['100;;;;G26.3;15.01.2026;bestanden;'])
+
+        expiry = StatusExpiry.objects.get(member=self.anna, kind=StatusExpiry.Kind.EXAM)
+        self.assertEqual(expiry.exam_type, self.g26)
+        self.assertEqual(expiry.expires_on, date(2029, 1, 15))
+
+    def test_invalid_rows_are_reported(self):
+        MedicalExam.objects.create(
+            member=self.anna, exam_type=self.g26, exam_date=date(2025, 3, 1), valid_until=date(2028, 3, 1)
+        )
+
+        importer = import_csv([
+            ';;;;G26.3;15.01.2026;;',
+            '100;;;;G99;15.01.2026;;',
+            '100;;;;G26.3;;;',
+            '100;;;;G26.3;15.01.2026;vielleicht;',
+            ';Clara;Christ;;G26.3;15.01.2026;;',
+            ';Bernd;Berg;;G26.3;15.01.2026;;',
+            '100;;;;G26.3;01.03.2025;;',
+            '100;;;;G26.3;15.01.2026;;',
+            '100;;;;G26.3;15.01.2026;;',
+        ])
+
+        self.assertEqual(importer.created_count, 1)
+        self.assertEqual(importer.errors, [
+            'Zeile 2: Mitgliedsnummer oder Vor- und Nachname sind erforderlich.',
+            'Zeile 3: Unbekannte Untersuchung "G99".',
+            'Zeile 4: Untersuchungsdatum fehlt oder ist ungültig.',
+            'Zeile 5: Unbekanntes Ergebnis "vielleicht".',
+            'Zeile 6: Mitglied nicht gefunden.',
+            'Zeile 7: Bernd Berg ist nicht eindeutig (bitte Mitgliedsnummer oder Geburtsdatum angeben).',
+            'Zeile 8: G26.3 vom 01.03.2025 ist bereits erfasst.',
+            'Zeile 10: G26.3 vom 15.01.2026 ist bereits erfasst.',
+        ])
+        self.assertEqual(MedicalExam.objects.filter(member=self.anna).count(), 2)
+
+    def test_dry_run_checks_without_writing(self):
+        importer = import_csv([
+            '100;;;;G26.3;15.01.2026;;',
+            ';Bernd;Berg;01.05.1990;G26.3;15.01.2026;;',
+            '100;;;;G99;15.01.2026;;',
+        ], dry_run=True)
+
+        self.assertEqual((importer.created_count, importer.error_count), (2, 1))
+        self.assertFalse(MedicalExam.objects.exists())
+        self.assertFalse(StatusExpiry.objects.exists())
+
+
+class EffectiveQualificationTests(TestCase):
+    """MemberEffectiveQualification folgt Qualifikationen und Abdeckungs-Hierarchie"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.quals = {
+            code: Qualification.objects.create(code=code, name=code)
+            for code in ['TM1', 'TM2', 'TM', 'TF', 'GF', 'ZF', 'VF']
+        }
+        cls.quals['TM'].covers.add(cls.quals['TM1'], cls.quals['TM2'])
+        cls.quals['TF'].covers.add(cls.quals['TM'])
+        cls.quals['GF'].covers.add(cls.quals['TF'])
+        cls.members = {
+            code: Member.objects.create(first_name=code, last_name='Mitglied', status='active')
+            for code in ['TM2', 'TF', 'GF', 'ZF', 'VF']
+        }
+        for code, member in cls.members.items():
+            MemberQualification.objects.create(member=member, qualification=cls.quals[code])
+
+    def expected_codes(self):
+        """Effektive Kürzel je Mitglied, unabhängig von bulk/effective berechnet"""
+        covers = {}
+        for qualification in Qualification.objects.prefetch_related('covers'):
+            covers[qualification.code] = {covered.code for covered in qualification.covers.all()}
+
+        def closure(code):
+            result = {code}
+            for covered in covers[code]:
+                result |= closure(covered)
+            return result
+
+        expected = {}
+        for member_qualification in MemberQualification.objects.select_related('member', 'qualification'):
+            expected.setdefault(member_qualification.member.first_name, set()).update(
+                closure(member_qualification.qualification.code)
+            )
+        return expected
+
+    def assert_table_matches_hierarchy(self):
+        table = {}
+        for first_name, code in MemberEffectiveQualification.objects.values_list(
+            'member__first_name', 'qualification__code'
+        ):
+            table.setdefault(first_name, set()).add(code)
+        self.assertEqual(table, self.expected_codes())
+
+        for code in self.quals:
+            self.assertEqual(
+                set(Member.objects.with_qualification(code).values_list('first_name', flat=True)),
+                {first_name for first_name, codes in table.items() if code in codes},
+                code
+            )
+
+    def test_initial_state(self):
+        self.assert_table_matches_hierarchy()
+        self.assertTrue(Member.objects.with_qualification('TM1').filter(pk=self.members['GF'].pk).exists())
+        self.assertFalse(Member.objects.with_qualification('TM1').filter(pk=self.members['TM2'].pk).exists())
+
+    def test_covers_add_and_remove(self):
+        self.quals['TM2'].covers.add(self.quals['TM1'])
+        self.quals['ZF'].covers.add(self.quals['GF'])
+        self.assert_table_matches_hierarchy()
+        self.assertTrue(Member.objects.with_qualification('TM1').filter(pk=self.members['TM2'].pk).exists())
+
+        self.quals['TF'].covers.remove(self.quals['TM'])
+        self.assert_table_matches_hierarchy()
+        self.assertFalse(Member.objects.with_qualification('TM1').filter(pk=self.members['GF'].pk).exists())
+
+    def test_covers_added_below_existing_chain(self):
+        # VF -> ZF -> GF: Inhaber von VF erhalten auch alles unterhalb von GF
+        self.quals['VF'].covers.add(self.quals['ZF'])
+        self.quals['GF'].covered_by.add(self.quals['ZF'])
+        self.assert_table_matches_hierarchy()
+        self.assertTrue(Member.objects.with_qualification('TM1').filter(pk=self.members['VF'].pk).exists())
+
+    def test_covered_by_clear_rebuilds(self):
+        self.quals['TM'].covered_by.clear()
+        self.assert_table_matches_hierarchy()
+
+    def test_member_qualification_changes(self):
+        MemberQualification.objects.create(member=self.members['TM2'], qualification=self.quals['GF'])
+        self.assert_table_matches_hierarchy()
+
+        MemberQualification.objects.filter(member=self.members['GF']).delete()
+        self.assert_table_matches_hierarchy()
+        self.assertFalse(MemberEffectiveQualification.objects.filter(member=self.members['GF']).exists())
+
+
+class StatusExpiryTests(TestCase):
+    """StatusExpiry folgt Untersuchungen und Übungen; Vorwarnfenster auf dem Dashboard"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.g26 = MedicalExamType.objects.create(code='G26.3', name='Atemschutz', validity_months=36)
+        cls.agt = Qualification.objects.create(code='AGT', name='Atemschutz', requires_exercises=True, exercise_count=2)
+        cls.anna = Member.objects.create(first_name='Anna', last_name='Alt', status='active')
+
+    def expiries(self, kind):
+        return list(StatusExpiry.objects.filter(member=self.anna, kind=kind).values_list('expires_on', flat=True))
+
+    def test_exam_save_and_delete(self):
+        first = MedicalExam.objects.create(member=self.anna, exam_type=self.g26, exam_date=date(2025, 3, 1))
+        self.assertEqual(self.expiries(StatusExpiry.Kind.EXAM), [date(2028, 3, 1)])
+
+        second = MedicalExam.objects.create(
+            member=self.anna, exam_type=self.g26, exam_date=date(2026, 3, 1), valid_until=date(2029, 1, 31)
+        )
+        self.assertEqual(self.expiries(StatusExpiry.Kind.EXAM), [date(2029, 1, 31)])
+
+        # Nicht bestandene Untersuchungen zählen nicht
+        second.result_positive = False
+        second.save()
+        self.assertEqual(self.expiries(StatusExpiry.Kind.EXAM), [date(2028, 3, 1)])
+
+        second.delete()
+        first.delete()
+        self.assertEqual(self.expiries(StatusExpiry.Kind.EXAM), [])
+
+    def test_exercise_save_and_delete(self):
+        first = ExerciseRecord.objects.create(
+            member=self.anna, qualification=self.agt, exercise_date=date(2026, 2, 10), exercise_type='Übung'
+        )
+        # Zwei Übungen erforderlich
+        self.assertEqual(self.expiries(StatusExpiry.Kind.EXERCISE), [])
+
+        ExerciseRecord.objects.create(
+            member=self.anna, qualification=self.agt, exercise_date=date(2026, 5, 20), exercise_type='Übung'
+        )
+        self.assertEqual(self.expiries(StatusExpiry.Kind.EXERCISE), [date(2027, 2, 10)])
+
+        first.exercise_date = date(2026, 4, 1)
+        first.save()
+        self.assertEqual(self.expiries(StatusExpiry.Kind.EXERCISE), [date(2027, 4, 1)])
+
+        self.agt.exercise_count = 1
+        self.agt.save()
+        self.assertEqual(self.expiries(StatusExpiry.Kind.EXERCISE), [date(2027, 5, 20)])
+
+        first.delete()
+        ExerciseRecord.objects.filter(member=self.anna).delete()
+        self.assertEqual(self.expiries(StatusExpiry.Kind.EXERCISE), [])
+
+    def test_rebuild_matches_incremental_table(self):
+        MedicalExam.objects.create(member=self.anna, exam_type=self.g26, exam_date=date(2025, 3, 1))
+        for day in [1, 2]:
+            ExerciseRecord.objects.create(
+                member=self.anna, qualification=self.agt, exercise_date=date(2026, 1, day), exercise_type='Übung'
+            )
+        table = set(StatusExpiry.objects.values_list('member_id', 'kind', 'exam_type_id', 'qualification_id', 'expires_on'))
+
+        self.assertEqual(expiry.rebuild(), 2)
+
+        self.assertEqual(
+            set(StatusExpiry.objects.values_list('member_id', 'kind', 'exam_type_id', 'qualification_id', 'expires_on')),
+            table
+        )
+
+    def test_expiring_window_boundaries(self):
+        today = date(2026, 10, 19)
+        days = {}
+        for offset in [-1, 0, expiry.EXPIRY_WARNING_DAYS, expiry.EXPIRY_WARNING_DAYS + 1]:
+            member = Member.objects.create(first_name='Tag', last_name=str(offset), status='active')
+            MedicalExam.objects.create(
+                member=member, exam_type=self.g26, exam_date=date(2024, 1, 1), valid_until=today + timedelta(days=offset)
+            )
+            days[member.id] = offset
+        inactive = Member.objects.create(first_name='Inga', last_name='Inaktiv', status='inactive')
+        MedicalExam.objects.create(member=inactive, exam_type=self.g26, exam_date=date(2024, 1, 1), valid_until=today)
+
+        self.assertEqual(
+            sorted(days[entry.member_id] for entry in expiry.expiring(today)),
+            [0, expiry.EXPIRY_WARNING_DAYS]
+        )
+        self.assertEqual([entry.member_id for entry in expiry.expiring(today, days=0)], [
+            member_id for member_id, offset in days.items() if offset == 0
+        ])
+
+    def test_dashboard_lists_expiring_status(self):
+        Settings.objects.create(name='Freiwillige Feuerwehr Musterstadt', short_name='FF Musterstadt')
+        user = User.objects.create_user('leader', password='x', role=User.Role.LEADER)
+        today = timezone.now().date()
+        MedicalExam.objects.create(
+            member=self.anna, exam_type=self.g26, exam_date=date(2020, 1, 1), valid_until=today + timedelta(days=5)
+        )
+        ExerciseRecord.objects.create(
+            member=self.anna, qualification=self.agt, exercise_date=today - timedelta(days=400), exercise_type='Übung'
+        )
+        ExerciseRecord.objects.create(
+            member=self.anna, qualification=self.agt, exercise_date=today - timedelta(days=300), exercise_type='Übung'
+        )
+
+        self.client.force_login(user)
+        response = self.client.get(reverse('dashboard'))
+
+        self.assertEqual(
+            [(entry.kind, entry.expires_on) for entry in response.context['expiring_soon']],
+            [(StatusExpiry.Kind.EXAM, today + timedelta(days=5))]
+        )
+        self.assertContains(response, 'Alt')
+
+        ExerciseRecord.objects.create(
+            member=self.anna, qualification=self.agt, exercise_date=today - timedelta(days=350), exercise_type='Übung'
+        )
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(
+            [entry.kind for entry in response.context['expiring_soon']],
+            [StatusExpiry.Kind.EXAM, StatusExpiry.Kind.EXERCISE]
+        )
+
+
+class RecordExercisesTests(TestCase):
+    """Massen-Erfassung von Übungen mit records_changed"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agt = Qualification.objects.create(code='AGT', name='Atemschutz', requires_exercises=True, exercise_count=1)
+        cls.members = [
+            Member.objects.create(first_name=name, last_name='Mitglied', status='active')
+            for name in ['Anna', 'Bernd', 'Clara']
+        ]
+
+    def record(self, member_ids, exercise_date=date(2026, 10, 1)):
+        received = []
+
+        def receiver(sender, member_ids, **kwargs):
+            received.append(member_ids)
+
+        records_changed.connect(receiver)
+        try:
+            result = record_exercises(member_ids, self.agt, exercise_date, 'Belastungsübung')
+        finally:
+            records_changed.disconnect(receiver)
+        return result, received
+
+    def test_creates_records_and_sends_signal_once(self):
+        anna, bernd, _ = self.members
+
+        (created, skipped), received = self.record([anna.id, bernd.id, anna.id])
+
+        self.assertEqual((created, skipped), (2, 0))
+        self.assertEqual(received, [{anna.id, bernd.id}])
+        self.assertEqual(
+            set(StatusExpiry.objects.values_list('member_id', 'expires_on')),
+            {(anna.id, date(2027, 10, 1)), (bernd.id, date(2027, 10, 1))}
+        )
+
+    def test_skips_existing_records_of_the_same_day(self):
+        anna, bernd, clara = self.members
+        ExerciseRecord.objects.create(
+            member=anna, qualification=self.agt, exercise_date=date(2026, 10, 1), exercise_type='Übung'
+        )
+
+        (created, skipped), received = self.record([anna.id, bernd.id, clara.id])
+
+        self.assertEqual((created, skipped), (2, 1))
+        self.assertEqual(received, [{bernd.id, clara.id}])
+        self.assertEqual(ExerciseRecord.objects.filter(member=anna).count(), 1)
+
+        # Anderer Tag zählt als neue Übung
+        (created, skipped), _ = self.record([anna.id], date(2026, 10, 2))
+        self.assertEqual((created, skipped), (1, 0))
+
+    def test_nothing_to_record_sends_no_signal(self):
+        anna = self.members[0]
+        self.record([anna.id])
+
+        (created, skipped), received = self.record([anna.id])
 
-# Create your tests here.
+        self.assertEqual((created, skipped), (0, 1))
+        self.assertEqual(received, [])
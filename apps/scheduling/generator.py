@@ -14,79 +14,34 @@ Algorithmus:
 
 import random
 from datetime import date
+from django.db import IntegrityError, transaction
 from django.db.models import Count, Q
 
+from apps.qualifications.bulk import effective_qualification_codes
+from apps.vehicles.eligibility import agt_valid_until, eligible_member_ids, missing_requirements
 
-# Qualifikationshierarchie: Höhere Qualifikationen erfüllen niedrigere
-QUALIFICATION_HIERARCHY = {
-    'TM1': ['TM2', 'TM', 'TF', 'GF', 'ZF', 'VF'],
-    'TM2': ['TM', 'TF', 'GF', 'ZF', 'VF'],
-    'TM': ['TF', 'GF', 'ZF', 'VF'],
-    'TF': ['GF', 'ZF', 'VF'],
-    'GF': ['ZF', 'VF'],
-    'ZF': ['VF'],
-    'VF': [],
-    # Spezielle Qualifikationen (keine Hierarchie)
-    'MA': [],
-    'AGT': [],
-    'MZF-FA': [],
-    'ABC1': ['ABC2'],
-    'ABC2': [],
-    'MKS': [],
-}
-
-
-def has_qualification_or_higher(member, qual_code):
-    """
-    Prüft ob ein Mitglied eine Qualifikation oder eine höhere hat.
-
-    Args:
-        member: Member-Objekt
-        qual_code: Qualifikationscode (z.B. 'TM', 'TF', 'GF')
-
-    Returns:
-        bool: True wenn qualifiziert
-    """
-    # Hat das Mitglied genau diese Qualifikation?
-    if member.has_qualification(qual_code):
-        return True
 
-    # Hat das Mitglied eine höhere Qualifikation?
-    higher_quals = QUALIFICATION_HIERARCHY.get(qual_code, [])
-    for higher_code in higher_quals:
-        if member.has_qualification(higher_code):
-            return True
-
-    return False
-
-
-def check_member_qualification(member, vehicle_position):
+def check_member_qualification(member, vehicle_position, on_date=None):
     """
     Prüft ob ein Mitglied alle Anforderungen für eine Position erfüllt.
 
+    Liest den vorberechneten Eignungs-Index (apps.vehicles.eligibility).
+
     Args:
         member: Member-Objekt
         vehicle_position: VehiclePosition-Objekt
+        on_date: Stichtag für den AGT-Status (default: heute)
 
     Returns:
         tuple: (is_qualified: bool, warning_text: str or None)
     """
-    warnings = []
+    if member.id in eligible_member_ids([vehicle_position.id], on_date)[vehicle_position.id]:
+        return True, None
 
-    # Required Qualifications prüfen
-    for qual in vehicle_position.required_qualifications.all():
-        if not has_qualification_or_higher(member, qual.code):
-            warnings.append(f'Fehlende Qualifikation: {qual.code}')
-
-    # AGT-Status prüfen wenn erforderlich
-    if vehicle_position.requires_agt:
-        if not member.has_valid_agt_status():
-            warnings.append('AGT-Status nicht gültig (G26.3 oder Übungen fehlen)')
-
-    if warnings:
-        return False, '; '.join(warnings)
-
-    return True, None
+    codes = effective_qualification_codes([member.id]).get(member.id, set())
+    agt_until = agt_valid_until([member.id]).get(member.id)
+    warning = missing_requirements(vehicle_position, codes, agt_until, on_date)
+    return False, warning or 'Anforderungen der Position nicht erfüllt'
 
 
 def get_fairness_score(member, position_code, year=None):
@@ -122,6 +77,12 @@ class AssignmentGenerator:
         self.assigned_members = set()  # IDs bereits zugewiesener Mitglieder
         self.results = []
         self.warnings_count = 0
+        self.conflicts_count = 0
+
+        # Eignungs-Index und Qualifikationen, einmalig pro Generierung geladen
+        self.eligible = {}
+        self.qualification_codes = {}
+        self.agt_until = {}
 
     def get_present_members(self):
         """Lade alle anwesenden Mitglieder für diesen Dienst"""
@@ -138,7 +99,14 @@ class AssignmentGenerator:
             id__in=attendance_ids,
             status='active',
             is_active=True
-        ).prefetch_related('qualifications__qualification')
+        )
+
+    def load_eligibility(self, vehicle_position_ids, present_members):
+        """Eignungen, effektive Qualifikationen und AGT-Status gesammelt laden"""
+        member_ids = [member.id for member in present_members]
+        self.eligible = eligible_member_ids(vehicle_position_ids, self.duty.date)
+        self.qualification_codes = effective_qualification_codes(member_ids)
+        self.agt_until = agt_valid_until(member_ids)
 
     def find_candidates(self, vehicle_position, present_members):
         """
@@ -153,22 +121,27 @@ class AssignmentGenerator:
         """
         candidates = []
         position_code = vehicle_position.position.short_name
+        eligible_ids = self.eligible.get(vehicle_position.id, set())
+        preferred_codes = [qual.code for qual in vehicle_position.preferred_qualifications.all()]
 
         for member in present_members:
             # Bereits zugewiesen?
             if member.id in self.assigned_members:
                 continue
 
-            is_qualified, warning = check_member_qualification(member, vehicle_position)
+            codes = self.qualification_codes.get(member.id, set())
+            is_qualified = member.id in eligible_ids
+            warning = None
+            if not is_qualified:
+                warning = missing_requirements(
+                    vehicle_position, codes, self.agt_until.get(member.id), self.duty.date
+                ) or 'Anforderungen der Position nicht erfüllt'
 
             # Fairness-Score berechnen
             fairness_score = get_fairness_score(member, position_code)
 
             # Preferred Qualifications als Bonus
-            preferred_bonus = 0
-            for pref_qual in vehicle_position.preferred_qualifications.all():
-                if has_qualification_or_higher(member, pref_qual.code):
-                    preferred_bonus += 1
+            preferred_bonus = sum(1 for code in preferred_codes if code in codes)
 
             candidates.append({
                 'member': member,
@@ -215,6 +188,7 @@ class AssignmentGenerator:
                     'success': False,
                     'assigned_count': 0,
                     'warning_count': 0,
+                    'conflict_count': 0,
                     'error': 'Keine anwesenden Mitglieder markiert'
                 }
 
@@ -230,9 +204,20 @@ class AssignmentGenerator:
                     'success': False,
                     'assigned_count': 0,
                     'warning_count': 0,
+                    'conflict_count': 0,
                     'error': 'Keine Fahrzeuge für diesen Dienst ausgewählt'
                 }
 
+            # Versionsstand der bestehenden Einteilungen einmalig merken
+            known_versions = dict(
+                Assignment.objects.filter(duty=self.duty).values_list('vehicle_position_id', 'version')
+            )
+
+            self.load_eligibility(
+                VehiclePosition.objects.filter(vehicle__in=vehicles).values_list('id', flat=True),
+                present_members
+            )
+
             assigned_count = 0
 
             for vehicle in vehicles:
@@ -255,18 +240,17 @@ class AssignmentGenerator:
                     best = candidates[0]
                     member = best['member']
 
-                    # Assignment erstellen/aktualisieren
-                    assignment, created = Assignment.objects.update_or_create(
-                        duty=self.duty,
-                        vehicle_position=vehicle_position,
-                        defaults={
-                            'vehicle': vehicle,
-                            'member': member,
-                            'status': Assignment.Status.SUGGESTED,
-                            'has_warning': not best['is_qualified'],
-                            'warning_text': best['warning'] or '',
-                        }
-                    )
+                    # Assignment erstellen/aktualisieren (nur wenn unverändert seit dem Laden)
+                    if not self.write_assignment(vehicle_position, member, best, known_versions):
+                        # Die Einteilung des anderen bleibt; deren Mitglied ist damit vergeben
+                        self.conflicts_count += 1
+                        current_member_id = Assignment.objects.filter(
+                            duty=self.duty,
+                            vehicle_position=vehicle_position
+                        ).values_list('member_id', flat=True).first()
+                        if current_member_id:
+                            self.assigned_members.add(current_member_id)
+                        continue
 
                     self.assigned_members.add(member.id)
                     assigned_count += 1
@@ -278,6 +262,7 @@ class AssignmentGenerator:
                 'success': True,
                 'assigned_count': assigned_count,
                 'warning_count': self.warnings_count,
+                'conflict_count': self.conflicts_count,
                 'error': None
             }
 
@@ -286,5 +271,43 @@ class AssignmentGenerator:
                 'success': False,
                 'assigned_count': 0,
                 'warning_count': 0,
+                'conflict_count': 0,
                 'error': str(e)
             }
+
+    def write_assignment(self, vehicle_position, member, candidate, known_versions):
+        """
+        Schreibt eine Einteilung als bedingtes Update.
+
+        Wurde die Einteilung seit Beginn der Generierung von jemand anderem
+        geändert (oder angelegt), wird sie nicht überschrieben.
+
+        Returns:
+            bool: True wenn geschrieben wurde, False bei Konflikt
+        """
+        from .models import Assignment
+
+        fields = {
+            'vehicle_id': vehicle_position.vehicle_id,
+            'member': member,
+            'status': Assignment.Status.SUGGESTED,
+            'has_warning': not candidate['is_qualified'],
+            'warning_text': candidate['warning'] or '',
+        }
+
+        version = known_versions.get(vehicle_position.id)
+        if version is not None:
+            return Assignment.update_if_current(
+                self.duty.id, vehicle_position.id, version, **fields
+            )
+
+        try:
+            with transaction.atomic():
+                Assignment.objects.create(
+                    duty=self.duty,
+                    vehicle_position=vehicle_position,
+                    **fields
+                )
+        except IntegrityError:
+            return False
+        return True
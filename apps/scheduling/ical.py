@@ -0,0 +1,138 @@
+"""
+iCalendar-Feeds (RFC 5545) für Dienste.
+
+Die Feeds werden von Kalender-Apps ohne Anmeldung abonniert. Der Zugriff
+wird deshalb über ein signiertes Token in der URL geschützt.
+
+Die Ausgabe erfolgt zeilenweise als Generator, damit auch lange
+Dienst-Historien mit konstantem Speicherbedarf gestreamt werden.
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.core import signing
+
+
+# Felder, die für einen Kalendereintrag benötigt werden
+EVENT_FIELDS = (
+    'duty_id', 'duty__title', 'duty__date', 'duty__start_time', 'duty__end_time',
+    'duty__location', 'duty__status', 'duty__updated_at',
+)
+
+
+def feed_token(kind, object_id):
+    """Signiertes Token für einen Feed (kind: 'member' oder 'unit')"""
+    return signing.Signer(salt=f'ical-{kind}').sign(str(object_id)).split(':', 1)[1]
+
+
+def check_feed_token(kind, object_id, token):
+    """Prüft ein Feed-Token"""
+    try:
+        signing.Signer(salt=f'ical-{kind}').unsign(f'{object_id}:{token}')
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def escape_text(value):
+    """Text-Werte nach RFC 5545 maskieren"""
+    return (
+        (value or '')
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def fold_line(line):
+    """Zeilen nach 75 Oktetten umbrechen (Fortsetzungszeilen beginnen mit Leerzeichen)"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+
+    parts = []
+    current = ''
+    limit = 75
+    for char in line:
+        if len((current + char).encode('utf-8')) > limit:
+            parts.append(current)
+            current = ''
+            limit = 74  # Platz für das führende Leerzeichen
+        current += char
+    parts.append(current)
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def format_utc(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def event_lines(row, local_tz, description=''):
+    """Zeilen eines VEVENT aus einer values()-Zeile mit EVENT_FIELDS"""
+    date = row['duty__date']
+    start_time = row['duty__start_time']
+    end_time = row['duty__end_time']
+
+    yield 'BEGIN:VEVENT'
+    yield f"UID:duty-{row['duty_id']}@ff-feuerwehr-fairness"
+    # DTSTAMP aus dem Änderungszeitpunkt, damit der Feed bei gleichen Daten identisch bleibt
+    yield f"DTSTAMP:{format_utc(row['duty__updated_at'])}"
+
+    if start_time:
+        start = datetime.combine(date, start_time, tzinfo=local_tz)
+        yield f'DTSTART:{format_utc(start)}'
+        if end_time:
+            end = datetime.combine(date, end_time, tzinfo=local_tz)
+            if end <= start:
+                # Dienst endet nach Mitternacht
+                end += timedelta(days=1)
+            yield f'DTEND:{format_utc(end)}'
+    else:
+        yield f"DTSTART;VALUE=DATE:{date.strftime('%Y%m%d')}"
+        yield f"DTEND;VALUE=DATE:{(date + timedelta(days=1)).strftime('%Y%m%d')}"
+
+    yield f"SUMMARY:{escape_text(row['duty__title'])}"
+    if row['duty__location']:
+        yield f"LOCATION:{escape_text(row['duty__location'])}"
+    if description:
+        yield f'DESCRIPTION:{escape_text(description)}'
+    if row['duty__status'] == 'cancelled':
+        yield 'STATUS:CANCELLED'
+    elif row['duty__status'] in ('confirmed', 'completed'):
+        yield 'STATUS:CONFIRMED'
+    else:
+        yield 'STATUS:TENTATIVE'
+    yield 'END:VEVENT'
+
+
+def calendar_stream(name, rows, describe=None):
+    """
+    Generator für einen kompletten VCALENDAR.
+
+    Args:
+        name: Kalendername
+        rows: Iterable von values()-Zeilen mit EVENT_FIELDS
+        describe: Optionale Funktion row -> Beschreibungstext
+    """
+    local_tz = ZoneInfo(settings.TIME_ZONE)
+
+    header = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//FF Feuerwehr-Fairness//Dienstplan//DE',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escape_text(name)}',
+        f'X-WR-TIMEZONE:{settings.TIME_ZONE}',
+    ]
+    yield ''.join(fold_line(line) for line in header)
+
+    for row in rows:
+        description = describe(row) if describe else ''
+        yield ''.join(fold_line(line) for line in event_lines(row, local_tz, description))
+
+    yield fold_line('END:VCALENDAR')
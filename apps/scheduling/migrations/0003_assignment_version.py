@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 03:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0002_add_duty_attendance'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assignment',
+            name='version',
+            field=models.PositiveIntegerField(default=0, verbose_name='Version'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 6.0 on 2026-10-19 03:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0003_assignment_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecurrenceSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200, verbose_name='Titel')),
+                ('pattern', models.CharField(choices=[('weekly', 'Wöchentlich'), ('biweekly', 'Alle 2 Wochen'), ('monthly', 'Monatlich')], default='weekly', max_length=20, verbose_name='Wiederholung')),
+                ('start_date', models.DateField(verbose_name='Beginn')),
+                ('end_date', models.DateField(verbose_name='Ende')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_series', to=settings.AUTH_USER_MODEL, verbose_name='Erstellt von')),
+            ],
+            options={
+                'verbose_name': 'Dienstserie',
+                'verbose_name_plural': 'Dienstserien',
+                'ordering': ['-start_date'],
+            },
+        ),
+        migrations.AddField(
+            model_name='duty',
+            name='series',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duties', to='scheduling.recurrenceseries', verbose_name='Serie'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-19 03:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0004_recurrence_series'),
+        ('vehicles', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='duty',
+            index=models.Index(fields=['date', 'start_time', 'id'], name='scheduling__date_a6e386_idx'),
+        ),
+    ]
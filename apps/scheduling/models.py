@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 
 
@@ -21,6 +21,41 @@ class DutyType(models.Model):
         return self.name
 
 
+class RecurrenceSeries(models.Model):
+    """Serie wiederkehrender Dienste (z.B. wöchentlicher Dienstabend)"""
+
+    class Pattern(models.TextChoices):
+        WEEKLY = 'weekly', 'Wöchentlich'
+        BIWEEKLY = 'biweekly', 'Alle 2 Wochen'
+        MONTHLY = 'monthly', 'Monatlich'
+
+    title = models.CharField('Titel', max_length=200)
+    pattern = models.CharField(
+        'Wiederholung',
+        max_length=20,
+        choices=Pattern.choices,
+        default=Pattern.WEEKLY
+    )
+    start_date = models.DateField('Beginn')
+    end_date = models.DateField('Ende')
+    created_by = models.ForeignKey(
+        'core.User',
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='created_series',
+        verbose_name='Erstellt von'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Dienstserie'
+        verbose_name_plural = 'Dienstserien'
+        ordering = ['-start_date']
+
+    def __str__(self):
+        return f"{self.title} ({self.get_pattern_display()})"
+
+
 class Duty(models.Model):
     """Dienst/Übung/Termin"""
 
@@ -38,6 +73,14 @@ class Duty(models.Model):
         related_name='duties',
         verbose_name='Diensttyp'
     )
+    series = models.ForeignKey(
+        RecurrenceSeries,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='duties',
+        verbose_name='Serie'
+    )
     title = models.CharField('Titel', max_length=200)
     description = models.TextField('Beschreibung', blank=True)
     date = models.DateField('Datum')
@@ -82,6 +125,10 @@ class Duty(models.Model):
         verbose_name = 'Dienst'
         verbose_name_plural = 'Dienste'
         ordering = ['-date', '-start_time']
+        indexes = [
+            # Für Keyset-Pagination der Dienstliste
+            models.Index(fields=['date', 'start_time', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.date})"
@@ -164,6 +211,9 @@ class Assignment(models.Model):
     has_warning = models.BooleanField('Hat Warnung', default=False)
     warning_text = models.TextField('Warnungstext', blank=True)
 
+    # Optimistische Sperre: wird bei jeder Änderung hochgezählt
+    version = models.PositiveIntegerField('Version', default=0)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -177,6 +227,27 @@ class Assignment(models.Model):
         member_name = self.member.full_name if self.member else 'Unbesetzt'
         return f"{self.duty} - {self.vehicle_position}: {member_name}"
 
+    @classmethod
+    def update_if_current(cls, duty_id, vehicle_position_id, version, **fields):
+        """
+        Bedingtes Update: schreibt nur, wenn die Einteilung noch die erwartete Version hat.
+
+        Returns:
+            bool: True wenn geschrieben wurde, False bei Konflikt
+        """
+        fields['version'] = models.F('version') + 1
+        fields['updated_at'] = timezone.now()
+        updated = cls.objects.filter(
+            duty_id=duty_id,
+            vehicle_position_id=vehicle_position_id,
+            version=version
+        ).update(**fields)
+        if updated:
+            # update() löst keine Signale aus
+            from apps.core import dashboard
+            transaction.on_commit(dashboard.invalidate)
+        return updated == 1
+
 
 class AssignmentHistory(models.Model):
     """Historie aller Einteilungen für Fairness-Auswertungen"""
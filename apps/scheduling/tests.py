@@ -1,3 +1,501 @@
+from datetime import date, time
+from unittest import mock
+
+from django.http import QueryDict
 from django.test import TestCase
+from django.urls import reverse
+
+from apps.core import refdata
+from apps.core.models import User
+from apps.members.models import Member, Unit
+from apps.vehicles.models import Position, Vehicle, VehiclePosition, VehicleType
+from .generator import AssignmentGenerator
+from .ical import escape_text, feed_token, fold_line
+from .models import Assignment, Duty, DutyAttendance, DutyType, RecurrenceSeries
+from .views import duty_cursor, filter_after_cursor
+
+
+class UpdateAssignmentTests(TestCase):
+    """Bedingtes Schreiben von Einteilungen (Assignment.version)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('leader', password='x', role=User.Role.LEADER)
+        cls.duty = Duty.objects.create(title='Übungsdienst', date=date(2026, 11, 2))
+        vehicle_type = VehicleType.objects.create(name='Löschgruppenfahrzeug', short_name='LF')
+        cls.vehicle = Vehicle.objects.create(vehicle_type=vehicle_type, call_sign='LF 1')
+        position = Position.objects.create(name='Maschinist', short_name='MA')
+        cls.vehicle_position = VehiclePosition.objects.create(vehicle=cls.vehicle, position=position)
+        cls.first = Member.objects.create(first_name='Anna', last_name='Alt', status='active')
+        cls.second = Member.objects.create(first_name='Bernd', last_name='Berg', status='active')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.url = reverse('update_assignment', args=[self.duty.id, self.vehicle_position.id])
+
+    def create_assignment(self, member):
+        return Assignment.objects.create(
+            duty=self.duty,
+            vehicle=self.vehicle,
+            vehicle_position=self.vehicle_position,
+            member=member,
+        )
+
+    def test_update_if_current_writes_and_increments_version(self):
+        assignment = self.create_assignment(self.first)
+
+        written = Assignment.update_if_current(
+            self.duty.id, self.vehicle_position.id, assignment.version, member=self.second
+        )
+
+        self.assertTrue(written)
+        assignment.refresh_from_db()
+        self.assertEqual(assignment.member, self.second)
+        self.assertEqual(assignment.version, 1)
+
+    def test_update_if_current_rejects_stale_version(self):
+        assignment = self.create_assignment(self.first)
+        Assignment.update_if_current(self.duty.id, self.vehicle_position.id, 0, member=self.second)
+
+        written = Assignment.update_if_current(
+            self.duty.id, self.vehicle_position.id, 0, member=None
+        )
+
+        self.assertFalse(written)
+        assignment.refresh_from_db()
+        self.assertEqual(assignment.member, self.second)
+        self.assertEqual(assignment.version, 1)
+
+    def test_stale_version_returns_conflict_with_current_state(self):
+        assignment = self.create_assignment(self.second)
+        Assignment.objects.filter(pk=assignment.pk).update(version=3)
+
+        response = self.client.post(self.url, {'member_id': self.first.id, 'version': '2'})
+
+        self.assertEqual(response.status_code, 409)
+        data = response.json()
+        self.assertTrue(data['conflict'])
+        self.assertEqual(data['member_id'], self.second.id)
+        self.assertEqual(data['version'], 3)
+        assignment.refresh_from_db()
+        self.assertEqual(assignment.member, self.second)
+
+    def test_current_version_updates_assignment(self):
+        self.create_assignment(self.second)
+
+        response = self.client.post(self.url, {'member_id': self.first.id, 'version': '0'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['version'], 1)
+
+    def test_without_version_creates_assignment(self):
+        response = self.client.post(self.url, {'member_id': self.first.id, 'version': ''})
+
+        self.assertEqual(response.status_code, 200)
+        assignment = Assignment.objects.get(duty=self.duty, vehicle_position=self.vehicle_position)
+        self.assertEqual(assignment.member, self.first)
+        self.assertEqual(assignment.version, 0)
+
+    def test_create_after_concurrent_create_returns_conflict(self):
+        # Jemand anderes hat die Einteilung inzwischen angelegt: das Anlegen
+        # scheitert am Unique-Constraint und liefert den aktuellen Stand
+        self.create_assignment(self.second)
+
+        response = self.client.post(self.url, {'member_id': self.first.id, 'version': ''})
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['member_id'], self.second.id)
+        self.assertEqual(
+            Assignment.objects.filter(duty=self.duty, vehicle_position=self.vehicle_position).count(), 1
+        )
+
+
+class DutyKeysetPaginationTests(TestCase):
+    """Keyset-Pagination der Dienstliste über (date, start_time, id)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('member', password='x')
+        day = date(2026, 11, 2)
+        for title, duty_date, start_time in [
+            ('Abend', day, time(19, 0)),
+            ('Ohne Beginn 1', day, None),
+            ('Morgen', day, time(8, 0)),
+            ('Ohne Beginn 2', day, None),
+            ('Gleiche Zeit 1', day, time(8, 0)),
+            ('Vortag', date(2026, 11, 1), time(20, 0)),
+            ('Folgetag ohne Beginn', date(2026, 11, 3), None),
+        ]:
+            Duty.objects.create(title=title, date=duty_date, start_time=start_time)
+
+    def ordered(self):
+        return list(Duty.objects.order_by('date', 'start_time', 'id'))
+
+    def test_cursor_format(self):
+        duty = Duty.objects.get(title='Morgen')
+        self.assertEqual(duty_cursor(duty), f'2026-11-02_08:00:00_{duty.id}')
+        duty = Duty.objects.get(title='Ohne Beginn 1')
+        self.assertEqual(duty_cursor(duty), f'2026-11-02__{duty.id}')
+
+    def test_filter_after_each_cursor_returns_remaining_duties(self):
+        # Dienste ohne Beginn stehen bei SQLite vor allen anderen des Tages
+        ordered = self.ordered()
+        for index, duty in enumerate(ordered):
+            remaining = filter_after_cursor(Duty.objects.all(), duty_cursor(duty))
+            self.assertEqual(
+                list(remaining.order_by('date', 'start_time', 'id')),
+                ordered[index + 1:],
+                duty.title
+            )
+
+    def test_invalid_cursor_is_ignored(self):
+        for cursor in ['', 'abc', '2026-13-01__1', '2026-11-02_25:00:00_1', '2026-11-02_08:00:00_x']:
+            self.assertEqual(filter_after_cursor(Duty.objects.all(), cursor).count(), 7, cursor)
+
+    def test_duty_list_pages_cover_every_duty_once(self):
+        self.client.force_login(self.user)
+        seen = []
+        query = 'show=all'
+        with mock.patch('apps.scheduling.views.DUTY_PAGE_SIZE', 2):
+            while query:
+                response = self.client.get(f"{reverse('duty_list')}?{query}")
+                self.assertEqual(response.status_code, 200)
+                seen.extend(response.context['duties'])
+                query = response.context['next_query']
+                if query:
+                    self.assertIn('after', QueryDict(query))
+
+        self.assertEqual(seen, self.ordered())
+
+
+class GeneratorConflictTests(TestCase):
+    """Automatische Besetzung, wenn parallel jemand anderes einteilt"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.duty = Duty.objects.create(title='Übungsdienst', date=date(2026, 11, 2))
+        vehicle_type = VehicleType.objects.create(name='Löschgruppenfahrzeug', short_name='LF')
+        cls.vehicle = Vehicle.objects.create(vehicle_type=vehicle_type, call_sign='LF 1')
+        cls.duty.vehicles.add(cls.vehicle)
+        cls.first_seat = VehiclePosition.objects.create(
+            vehicle=cls.vehicle, position=Position.objects.create(name='Maschinist', short_name='MA')
+        )
+        cls.second_seat = VehiclePosition.objects.create(
+            vehicle=cls.vehicle, position=Position.objects.create(name='Melder', short_name='ME'), seat_number=2
+        )
+        # Sortierung ohne Zufall: Anna vor Bernd
+        cls.anna = Member.objects.create(first_name='Anna', last_name='Alt', status='active')
+        cls.bernd = Member.objects.create(first_name='Bernd', last_name='Berg', status='active')
+        for member in (cls.anna, cls.bernd):
+            DutyAttendance.objects.create(duty=cls.duty, member=member, is_present=True)
+
+    def generate_with_concurrent_assignment(self, member):
+        """Generieren, während ein anderer den ersten Sitz mit member besetzt"""
+        load_eligibility = AssignmentGenerator.load_eligibility
+
+        def load_and_interfere(generator, *args):
+            load_eligibility(generator, *args)
+            Assignment.objects.create(
+                duty=self.duty, vehicle=self.vehicle, vehicle_position=self.first_seat, member=member
+            )
+
+        with mock.patch.object(AssignmentGenerator, 'load_eligibility', load_and_interfere), \
+                mock.patch('apps.scheduling.generator.random.shuffle'):
+            return AssignmentGenerator(self.duty).generate()
+
+    def test_without_conflict(self):
+        with mock.patch('apps.scheduling.generator.random.shuffle'):
+            result = AssignmentGenerator(self.duty).generate()
+
+        self.assertEqual((result['assigned_count'], result['conflict_count']), (2, 0))
+        self.assertEqual(
+            dict(Assignment.objects.filter(duty=self.duty).values_list('vehicle_position_id', 'member_id')),
+            {self.first_seat.id: self.anna.id, self.second_seat.id: self.bernd.id}
+        )
+
+    def test_member_of_concurrent_assignment_is_not_assigned_twice(self):
+        result = self.generate_with_concurrent_assignment(self.anna)
+
+        self.assertTrue(result['success'])
+        self.assertEqual((result['assigned_count'], result['conflict_count']), (1, 1))
+        self.assertEqual(
+            dict(Assignment.objects.filter(duty=self.duty).values_list('vehicle_position_id', 'member_id')),
+            {self.first_seat.id: self.anna.id, self.second_seat.id: self.bernd.id}
+        )
+
+    def test_concurrent_assignment_of_the_other_member(self):
+        result = self.generate_with_concurrent_assignment(self.bernd)
+
+        self.assertEqual((result['assigned_count'], result['conflict_count']), (1, 1))
+        self.assertEqual(
+            dict(Assignment.objects.filter(duty=self.duty).values_list('vehicle_position_id', 'member_id')),
+            {self.first_seat.id: self.bernd.id, self.second_seat.id: self.anna.id}
+        )
+
+
+class DutySeriesTests(TestCase):
+    """Wiederkehrende Dienste anlegen und gemeinsam bearbeiten"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('leader', password='x', role=User.Role.LEADER)
+        vehicle_type = VehicleType.objects.create(name='Löschgruppenfahrzeug', short_name='LF')
+        cls.lf1 = Vehicle.objects.create(vehicle_type=vehicle_type, call_sign='LF 1')
+        cls.lf2 = Vehicle.objects.create(vehicle_type=vehicle_type, call_sign='LF 2')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def create_series(self, **data):
+        return self.client.post(reverse('duty_create'), {
+            'title': 'Übungsdienst',
+            'date': '2026-11-02',
+            'start_time': '19:00',
+            'location': 'Gerätehaus',
+            'status': 'draft',
+            'min_agt_count': '0',
+            'vehicles': [self.lf1.id, self.lf2.id],
+            'is_recurring': 'on',
+            'recurrence_pattern': 'weekly',
+            'recurrence_end': '2026-11-30',
+            **data,
+        })
+
+    def series_duties(self):
+        return list(Duty.objects.order_by('date'))
+
+    def edit(self, duty, **data):
+        return self.client.post(reverse('duty_edit', args=[duty.id]), {
+            'title': duty.title,
+            'date': duty.date.isoformat(),
+            'start_time': '19:00',
+            'status': 'draft',
+            'min_agt_count': '0',
+            **data,
+        })
+
+    def test_create_weekly_series(self):
+        response = self.create_series()
+
+        duties = self.series_duties()
+        self.assertRedirects(response, reverse('duty_detail', args=[duties[0].id]), fetch_redirect_response=False)
+        self.assertEqual(
+            [duty.date for duty in duties],
+            [date(2026, 11, 2), date(2026, 11, 9), date(2026, 11, 16), date(2026, 11, 23), date(2026, 11, 30)]
+        )
+        series = RecurrenceSeries.objects.get()
+        self.assertEqual((series.start_date, series.end_date, series.pattern), (date(2026, 11, 2), date(2026, 11, 30), 'weekly'))
+        self.assertEqual(duties[1].title, 'Übungsdienst (09.11.2026)')
+        self.assertTrue(all(duty.series_id == series.id and duty.start_time == time(19, 0) for duty in duties))
+        self.assertEqual(Duty.vehicles.through.objects.count(), 10)
+        self.assertEqual(set(duties[4].vehicles.all()), {self.lf1, self.lf2})
+
+    def test_create_monthly_and_biweekly_series(self):
+        self.create_series(recurrence_pattern='monthly', date='2026-01-31', recurrence_end='2026-04-30')
+        self.assertEqual(
+            [duty.date for duty in self.series_duties()],
+            [date(2026, 1, 31), date(2026, 2, 28), date(2026, 3, 28), date(2026, 4, 28)]
+        )
+
+        Duty.objects.all().delete()
+        self.create_series(recurrence_pattern='biweekly')
+        self.assertEqual(len(self.series_duties()), 3)
+
+    def test_end_before_start_creates_nothing(self):
+        response = self.create_series(recurrence_end='2026-11-01')
+
+        self.assertRedirects(response, reverse('duty_create'), fetch_redirect_response=False)
+        self.assertFalse(Duty.objects.exists())
+        self.assertFalse(RecurrenceSeries.objects.exists())
+
+    def test_apply_to_following_occurrences(self):
+        self.create_series()
+        duties = self.series_duties()
+
+        self.edit(duties[2], location='Übungsplatz', vehicles=[self.lf2.id], apply_to_series='on')
+
+        locations = [duty.location for duty in self.series_duties()]
+        self.assertEqual(locations, ['Gerätehaus', 'Gerätehaus', 'Übungsplatz', 'Übungsplatz', 'Übungsplatz'])
+        self.assertEqual(
+            [list(duty.vehicles.all()) for duty in self.series_duties()],
+            [[self.lf1, self.lf2], [self.lf1, self.lf2], [self.lf2], [self.lf2], [self.lf2]]
+        )
+
+    def test_moved_occurrence_updates_occurrences_after_original_date(self):
+        self.create_series()
+        duties = self.series_duties()
+
+        # 16.11. auf den 03.11. vorziehen: 09.11. liegt davor und bleibt unverändert
+        self.edit(duties[2], date='2026-11-03', location='Übungsplatz', apply_to_series='on')
+
+        updated = set(Duty.objects.filter(location='Übungsplatz').values_list('date', flat=True))
+        self.assertEqual(updated, {date(2026, 11, 3), date(2026, 11, 23), date(2026, 11, 30)})
+
+        # 23.11. auf den 27.11. verschieben: 30.11. folgt weiterhin
+        self.edit(duties[3], date='2026-11-27', location='Wache', apply_to_series='on')
+
+        updated = set(Duty.objects.filter(location='Wache').values_list('date', flat=True))
+        self.assertEqual(updated, {date(2026, 11, 27), date(2026, 11, 30)})
+
+    def test_edit_without_series_changes_only_this_duty(self):
+        self.create_series()
+        duties = self.series_duties()
+
+        self.edit(duties[2], location='Übungsplatz', vehicles=[self.lf2.id])
+
+        self.assertEqual(Duty.objects.filter(location='Übungsplatz').get(), duties[2])
+        self.assertEqual(list(duties[3].vehicles.all()), [self.lf1, self.lf2])
+
+
+class ICalFeedTests(TestCase):
+    """iCal-Feeds: Token, ETag und Formatierung nach RFC 5545"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.unit = Unit.objects.create(name='Löschzug 1')
+        cls.member = Member.objects.create(first_name='Anna', last_name='Alt', status='active', unit=cls.unit)
+        vehicle_type = VehicleType.objects.create(name='Löschgruppenfahrzeug', short_name='LF')
+        vehicle = Vehicle.objects.create(vehicle_type=vehicle_type, call_sign='LF 1')
+        vehicle_position = VehiclePosition.objects.create(
+            vehicle=vehicle, position=Position.objects.create(name='Maschinist', short_name='MA')
+        )
+        cls.duty = Duty.objects.create(
+            title='Übung; Teil 1, Atemschutz', date=date(2026, 11, 2), start_time=time(19, 0),
+            end_time=time(1, 0), location='Gerätehaus', status='confirmed'
+        )
+        Assignment.objects.create(
+            duty=cls.duty, vehicle=vehicle, vehicle_position=vehicle_position, member=cls.member
+        )
+
+    def member_url(self, token=None):
+        return reverse('member_ical_feed', args=[self.member.id, token or feed_token('member', self.member.id)])
+
+    def unit_url(self):
+        return reverse('unit_ical_feed', args=[self.unit.id, feed_token('unit', self.unit.id)])
+
+    def test_invalid_token(self):
+        other = feed_token('member', self.member.id + 1)
+        for url in [
+            self.member_url('falsch'),
+            self.member_url(other),
+            reverse('unit_ical_feed', args=[self.unit.id, feed_token('member', self.unit.id)]),
+        ]:
+            self.assertEqual(self.client.get(url).status_code, 404, url)
+
+    def test_member_feed(self):
+        response = self.client.get(self.member_url())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        body = b''.join(response.streaming_content).decode()
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertTrue(body.endswith('END:VCALENDAR\r\n'))
+        self.assertIn('X-WR-CALNAME:Dienste Anna Alt\r\n', body)
+        self.assertIn('SUMMARY:Übung\\; Teil 1\\, Atemschutz\r\n', body)
+        self.assertIn('DESCRIPTION:LF 1: Maschinist\r\n', body)
+        # 19:00 bis 01:00 Ortszeit (MEZ) endet am Folgetag
+        self.assertIn('DTSTART:20261102T180000Z\r\n', body)
+        self.assertIn('DTEND:20261103T000000Z\r\n', body)
+        self.assertIn('STATUS:CONFIRMED\r\n', body)
+
+    def test_etag_and_not_modified(self):
+        response = self.client.get(self.member_url())
+        etag = response['ETag']
+
+        response = self.client.get(self.member_url(), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.duty.title = 'Einsatzübung'
+        self.duty.save()
+        response = self.client.get(self.member_url(), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_unit_etag_follows_unit_name(self):
+        etag = self.client.get(self.unit_url())['ETag']
+        self.assertEqual(self.client.get(self.unit_url(), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.unit.name = 'Löschzug Nord'
+        self.unit.save()
+
+        response = self.client.get(self.unit_url(), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('X-WR-CALNAME:Dienste Löschzug Nord', b''.join(response.streaming_content).decode())
+
+    def test_escape_text(self):
+        self.assertEqual(escape_text('a,b;c\\d\ne\r\nf'), 'a\\,b\\;c\\\\d\\ne\\nf')
+        self.assertEqual(escape_text(None), '')
+
+    def test_fold_line(self):
+        self.assertEqual(fold_line('A' * 75), 'A' * 75 + '\r\n')
+
+        folded = fold_line('SUMMARY:' + 'ä' * 100)
+        lines = folded[:-2].split('\r\n')
+        self.assertTrue(folded.endswith('\r\n'))
+        self.assertTrue(all(len(line.encode('utf-8')) <= 75 for line in lines))
+        self.assertTrue(all(line.startswith(' ') for line in lines[1:]))
+        # Zusammengefügt ergibt sich wieder die Ursprungszeile (keine zerteilten Zeichen)
+        self.assertEqual(lines[0] + ''.join(line[1:] for line in lines[1:]), 'SUMMARY:' + 'ä' * 100)
+        self.assertEqual(len(lines[0].encode('utf-8')), 74)
+
+
+class CalendarEventsTests(TestCase):
+    """Kalender-JSON mit ETag und bedingten Anfragen"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('member', password='x')
+        cls.duty_type = DutyType.objects.create(name='Übung', color='#dc2626')
+        cls.duty = Duty.objects.create(
+            title='Übungsdienst', date=date(2026, 11, 2), start_time=time(19, 0), duty_type=cls.duty_type
+        )
+        Duty.objects.create(title='Außerhalb', date=date(2026, 12, 1))
+
+    def setUp(self):
+        refdata.clear()
+        self.client.force_login(self.user)
+
+    def get(self, start='2026-11-01', end='2026-12-01', **headers):
+        return self.client.get(reverse('calendar_events'), {'start': start, 'end': end}, **headers)
+
+    def test_events_in_window(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'duties': [{
+            'id': self.duty.id, 'title': 'Übungsdienst', 'date': '2026-11-02', 'start': '19:00', 'end': None,
+            'status': 'draft', 'type': 'Übung', 'color': '#dc2626',
+        }]})
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_invalid_window(self):
+        for start, end in [('', ''), ('2026-11-01', '2026-11-01'), ('2026-11-01', '2027-01-03')]:
+            response = self.get(start, end)
+            self.assertEqual(response.status_code, 400, (start, end))
+            self.assertNotIn('ETag', response)
+
+    def test_not_modified_until_duties_change(self):
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # Anderes Zeitfenster, anderes ETag
+        self.assertEqual(self.get(end='2026-11-30', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        self.duty.title = 'Einsatzübung'
+        self.duty.save()
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['duties'][0]['title'], 'Einsatzübung')
+
+        etag = response['ETag']
+        Duty.objects.create(title='Zusatzdienst', date=date(2026, 11, 20))
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_duty_type_change_changes_etag(self):
+        etag = self.get()['ETag']
+
+        self.duty_type.color = '#2563eb'
+        self.duty_type.save()
 
-# Create your tests here.
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['duties'][0]['color'], '#2563eb')
@@ -9,6 +9,14 @@ urlpatterns = [
     path('<int:duty_id>/edit/', views.duty_edit, name='duty_edit'),
     path('<int:duty_id>/delete/', views.duty_delete, name='duty_delete'),
 
+    # Kalender
+    path('calendar/', views.duty_calendar, name='calendar'),
+    path('calendar/events/', views.duty_calendar_events, name='calendar_events'),
+
+    # iCalendar-Feeds (Abonnement in Kalender-Apps)
+    path('ical/member/<int:member_id>/<str:token>.ics', views.member_ical_feed, name='member_ical_feed'),
+    path('ical/unit/<int:unit_id>/<str:token>.ics', views.unit_ical_feed, name='unit_ical_feed'),
+
     # Anwesenheit & Besetzung
     path('<int:duty_id>/attendance/<int:member_id>/toggle/', views.attendance_toggle, name='attendance_toggle'),
     path('<int:duty_id>/assignment/<int:position_id>/update/', views.update_assignment, name='update_assignment'),
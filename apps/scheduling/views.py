@@ -1,27 +1,74 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max, Q
 from django.utils import timezone
-from django.http import JsonResponse
-from django.views.decorators.http import require_POST
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition, require_POST
 from datetime import timedelta, datetime
-from dateutil.relativedelta import relativedelta
+import hashlib
 
+from apps.core import dashboard
+from apps.core.dates import add_months
+from apps.core.refdata import reference_data
 from apps.core.views import leader_required, admin_required
+from apps.vehicles.eligibility import eligible_member_ids
 from apps.vehicles.models import Vehicle, VehiclePosition
-from apps.members.models import Member
-from .models import Duty, DutyType, Assignment, DutyAttendance
+from apps.members.models import Member, Unit
+from .ical import EVENT_FIELDS, calendar_stream, check_feed_token
+from .models import Duty, DutyType, Assignment, DutyAttendance, RecurrenceSeries
+
+
+# Anzahl Dienste pro Seite in der Dienstliste
+DUTY_PAGE_SIZE = 50
+
+
+def duty_cursor(duty):
+    """Position eines Dienstes in der Sortierung (date, start_time, id) als URL-Parameter"""
+    start_time = duty.start_time.strftime('%H:%M:%S') if duty.start_time else ''
+    return f"{duty.date.isoformat()}_{start_time}_{duty.id}"
+
+
+def filter_after_cursor(duties, cursor):
+    """
+    Schränkt die Dienste auf alle Einträge nach dem Cursor ein (Keyset-Pagination).
+
+    Dienste ohne Beginn werden von SQLite vor allen anderen eines Tages sortiert.
+    Ungültige Cursor werden ignoriert.
+    """
+    try:
+        date_str, time_str, id_str = cursor.split('_')
+        cursor_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+        cursor_time = datetime.strptime(time_str, '%H:%M:%S').time() if time_str else None
+        cursor_id = int(id_str)
+    except ValueError:
+        return duties
+
+    if cursor_time is None:
+        return duties.filter(
+            Q(date__gt=cursor_date) |
+            Q(date=cursor_date, start_time__isnull=False) |
+            Q(date=cursor_date, start_time__isnull=True, id__gt=cursor_id)
+        )
+    return duties.filter(
+        Q(date__gt=cursor_date) |
+        Q(date=cursor_date, start_time__gt=cursor_time) |
+        Q(date=cursor_date, start_time=cursor_time, id__gt=cursor_id)
+    )
 
 
 @login_required
 def duty_list(request):
-    """Dienstliste"""
+    """Dienstliste (seitenweise, weitere Seiten werden per htmx nachgeladen)"""
     today = timezone.now().date()
 
     # Filter
     show = request.GET.get('show', 'upcoming')
     type_filter = request.GET.get('type', '')
     status_filter = request.GET.get('status', '')
+    after = request.GET.get('after', '')
 
     duties = Duty.objects.all().select_related('duty_type', 'created_by')
 
@@ -37,22 +84,201 @@ def duty_list(request):
     if status_filter:
         duties = duties.filter(status=status_filter)
 
-    duties = duties.order_by('date', 'start_time')
+    if after:
+        duties = filter_after_cursor(duties, after)
 
-    duty_types = DutyType.objects.filter(is_active=True)
+    # Eine Zeile mehr laden, um zu erkennen, ob es eine weitere Seite gibt
+    duties = list(duties.order_by('date', 'start_time', 'id')[:DUTY_PAGE_SIZE + 1])
+    has_more = len(duties) > DUTY_PAGE_SIZE
+    duties = duties[:DUTY_PAGE_SIZE]
+
+    next_query = ''
+    if has_more:
+        params = request.GET.copy()
+        params['after'] = duty_cursor(duties[-1])
+        next_query = params.urlencode()
 
     context = {
         'duties': duties,
-        'duty_types': duty_types,
+        'next_query': next_query,
+        'today': today,
+    }
+
+    if request.htmx and after:
+        return render(request, 'scheduling/partials/duty_list_items.html', context)
+
+    context.update({
+        'duty_types': reference_data().active_duty_types,
         'status_choices': Duty.Status.choices,
         'current_show': show,
         'current_type': type_filter,
         'current_status': status_filter,
-        'today': today,
-    }
+    })
     return render(request, 'scheduling/duty_list.html', context)
 
 
+# ============ Kalender ============
+
+# Maximale Länge eines Kalender-Zeitfensters in Tagen
+CALENDAR_MAX_DAYS = 62
+
+
+def calendar_window(request):
+    """
+    Liest das Zeitfenster aus den Parametern start/end (YYYY-MM-DD, end exklusiv).
+
+    Returns:
+        tuple: (start, end) oder None bei ungültigen Angaben
+    """
+    try:
+        start = datetime.strptime(request.GET.get('start', ''), '%Y-%m-%d').date()
+        end = datetime.strptime(request.GET.get('end', ''), '%Y-%m-%d').date()
+    except ValueError:
+        return None
+    if end <= start or (end - start).days > CALENDAR_MAX_DAYS:
+        return None
+    return start, end
+
+
+def calendar_etag(request):
+    """ETag für ein Kalender-Zeitfenster aus Anzahl und letzter Änderung der Dienste"""
+    window = calendar_window(request)
+    if window is None:
+        return None
+    stats = Duty.objects.filter(
+        date__gte=window[0],
+        date__lt=window[1]
+    ).aggregate(count=Count('id'), last_change=Max('updated_at'))
+    # Diensttypen liefern Name und Farbe, haben aber keinen Änderungszeitpunkt;
+    # jede Änderung erhöht jedoch die Version der Stammdaten
+    fingerprint = f"{window[0]}|{window[1]}|{stats['count']}|{stats['last_change']}|{reference_data().version}"
+    return hashlib.md5(fingerprint.encode()).hexdigest()
+
+
+@login_required
+def duty_calendar(request):
+    """Kalenderansicht der Dienste (Daten kommen aus duty_calendar_events)"""
+    return render(request, 'scheduling/calendar.html')
+
+
+@login_required
+@condition(etag_func=calendar_etag)
+def duty_calendar_events(request):
+    """Kompakte JSON-Liste der Dienste in einem Zeitfenster für die Kalenderansicht"""
+    window = calendar_window(request)
+    if window is None:
+        return JsonResponse({
+            'error': f'Ungültiges Zeitfenster (start/end als YYYY-MM-DD, höchstens {CALENDAR_MAX_DAYS} Tage).'
+        }, status=400)
+
+    rows = Duty.objects.filter(
+        date__gte=window[0],
+        date__lt=window[1]
+    ).order_by('date', 'start_time', 'id').values(
+        'id', 'title', 'date', 'start_time', 'end_time', 'status',
+        'duty_type__name', 'duty_type__color'
+    )
+
+    duties = [
+        {
+            'id': row['id'],
+            'title': row['title'],
+            'date': row['date'].isoformat(),
+            'start': row['start_time'].strftime('%H:%M') if row['start_time'] else None,
+            'end': row['end_time'].strftime('%H:%M') if row['end_time'] else None,
+            'status': row['status'],
+            'type': row['duty_type__name'],
+            'color': row['duty_type__color'],
+        }
+        for row in rows
+    ]
+
+    response = JsonResponse({'duties': duties})
+    # Browser soll per If-None-Match nachfragen statt ungeprüft aus dem Cache zu lesen
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+# ============ iCalendar-Feeds ============
+
+def ical_etag(assignments, kind, object_id, name):
+    """
+    Starkes ETag aus Anzahl und letzter Änderung der relevanten Einteilungen
+    und Dienste sowie dem Kalendernamen (Umbenennungen ändern X-WR-CALNAME)
+    """
+    stats = assignments.aggregate(
+        count=Count('id'),
+        assignment_change=Max('updated_at'),
+        duty_change=Max('duty__updated_at'),
+        member_change=Max('member__updated_at'),
+    )
+    fingerprint = (
+        f"{kind}|{object_id}|{name}|{stats['count']}|{stats['assignment_change']}|"
+        f"{stats['duty_change']}|{stats['member_change']}"
+    )
+    return hashlib.md5(fingerprint.encode()).hexdigest()
+
+
+def member_ical_etag(request, member_id, token):
+    if not check_feed_token('member', member_id, token):
+        return None
+    name = Member.objects.filter(id=member_id).values_list('first_name', 'last_name').first()
+    if name is None:
+        return None
+    return ical_etag(Assignment.objects.filter(member_id=member_id), 'member', member_id, name)
+
+
+def unit_ical_etag(request, unit_id, token):
+    if not check_feed_token('unit', unit_id, token):
+        return None
+    name = Unit.objects.filter(id=unit_id).values_list('name', flat=True).first()
+    if name is None:
+        return None
+    return ical_etag(Assignment.objects.filter(member__unit_id=unit_id), 'unit', unit_id, name)
+
+
+def ical_response(stream, filename):
+    response = StreamingHttpResponse(stream, content_type='text/calendar; charset=utf-8')
+    response['Content-Disposition'] = f'inline; filename="{filename}"'
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@condition(etag_func=member_ical_etag)
+def member_ical_feed(request, member_id, token):
+    """iCal-Feed mit allen Einteilungen eines Mitglieds (Zugriff über signiertes Token)"""
+    if not check_feed_token('member', member_id, token):
+        raise Http404
+    member = get_object_or_404(Member, id=member_id)
+
+    rows = Assignment.objects.filter(member=member).order_by(
+        'duty__date', 'duty__start_time', 'duty_id'
+    ).values(
+        *EVENT_FIELDS, 'vehicle__call_sign', 'vehicle_position__position__name'
+    ).iterator(chunk_size=500)
+
+    def describe(row):
+        return f"{row['vehicle__call_sign']}: {row['vehicle_position__position__name']}"
+
+    stream = calendar_stream(f'Dienste {member.full_name}', rows, describe)
+    return ical_response(stream, f'dienste-mitglied-{member.id}.ics')
+
+
+@condition(etag_func=unit_ical_etag)
+def unit_ical_feed(request, unit_id, token):
+    """iCal-Feed mit allen Diensten, zu denen Mitglieder einer Einheit eingeteilt sind"""
+    if not check_feed_token('unit', unit_id, token):
+        raise Http404
+    unit = get_object_or_404(Unit, id=unit_id)
+
+    rows = Assignment.objects.filter(member__unit=unit).order_by(
+        'duty__date', 'duty__start_time', 'duty_id'
+    ).values(*EVENT_FIELDS).distinct().iterator(chunk_size=500)
+
+    stream = calendar_stream(f'Dienste {unit.name}', rows)
+    return ical_response(stream, f'dienste-einheit-{unit.id}.ics')
+
+
 @login_required
 def duty_detail(request, duty_id):
     """Dienst-Detailansicht"""
@@ -71,7 +297,7 @@ def duty_detail(request, duty_id):
     all_members = Member.objects.filter(
         status='active',
         is_active=True
-    ).select_related('unit').prefetch_related(
+    ).with_agt_status().select_related('unit').prefetch_related(
         'qualifications__qualification'
     ).order_by('unit__order', 'last_name', 'first_name')
 
@@ -95,6 +321,12 @@ def duty_detail(request, duty_id):
     # Anwesende zählen
     present_count = sum(1 for m in members_with_attendance if m['is_present'])
 
+    # Geeignete Mitglieder je Position aus dem Eignungs-Index
+    eligible = eligible_member_ids(
+        VehiclePosition.objects.filter(vehicle__in=duty.vehicles.all()).values_list('id', flat=True),
+        duty.date
+    )
+
     # Fahrzeuge mit Positionen für Besetzungs-UI
     vehicles_with_positions = []
     for vehicle in duty.vehicles.all().order_by('priority'):
@@ -119,6 +351,7 @@ def duty_detail(request, duty_id):
                 'member': assignment.member if assignment else None,
                 'has_warning': assignment.has_warning if assignment else False,
                 'warning_text': assignment.warning_text if assignment else '',
+                'eligible_ids': eligible.get(pos.id, set()),
             })
 
         vehicles_with_positions.append({
@@ -158,6 +391,8 @@ def duty_edit(request, duty_id=None):
             end_time = request.POST.get('end_time') or None
 
             if duty:
+                # Bisheriges Datum: Grundlage für "folgende Termine der Serie"
+                original_date = duty.date
                 duty.title = title
                 duty.date = date
                 duty.duty_type_id = duty_type_id or None
@@ -168,13 +403,41 @@ def duty_edit(request, duty_id=None):
                 duty.status = request.POST.get('status', 'draft')
                 duty.min_agt_count = int(request.POST.get('min_agt_count', 0))
                 duty.notes = request.POST.get('notes', '')
-                duty.save()
-
-                # Fahrzeuge aktualisieren
                 vehicle_ids = request.POST.getlist('vehicles')
-                duty.vehicles.set(vehicle_ids)
 
-                messages.success(request, 'Dienst wurde aktualisiert.')
+                if duty.series_id and request.POST.get('apply_to_series') == 'on':
+                    # Alle folgenden Termine der Serie gemeinsam aktualisieren
+                    with transaction.atomic():
+                        duty.save()
+                        following = Duty.objects.filter(
+                            series_id=duty.series_id,
+                            date__gt=original_date
+                        ).exclude(id=duty.id)
+                        following_ids = list(following.values_list('id', flat=True))
+                        following.update(
+                            duty_type_id=duty.duty_type_id,
+                            start_time=duty.start_time,
+                            end_time=duty.end_time,
+                            location=duty.location,
+                            description=duty.description,
+                            status=duty.status,
+                            min_agt_count=duty.min_agt_count,
+                            notes=duty.notes,
+                            updated_at=timezone.now()
+                        )
+                        set_duty_vehicles([duty.id] + following_ids, vehicle_ids)
+
+                    messages.success(
+                        request,
+                        f'Dienst und {len(following_ids)} folgende Termine der Serie wurden aktualisiert.'
+                    )
+                else:
+                    duty.save()
+
+                    # Fahrzeuge aktualisieren
+                    duty.vehicles.set(vehicle_ids)
+
+                    messages.success(request, 'Dienst wurde aktualisiert.')
             else:
                 # Prüfen ob wiederkehrender Dienst
                 is_recurring = request.POST.get('is_recurring') == 'on'
@@ -188,7 +451,7 @@ def duty_edit(request, duty_id=None):
                     if recurrence_end:
                         end_date = datetime.strptime(recurrence_end, '%Y-%m-%d').date()
                     else:
-                        end_date = start_date + relativedelta(years=1)
+                        end_date = add_months(start_date, 12)
 
                     # Alle Termine berechnen
                     dates = []
@@ -201,32 +464,45 @@ def duty_edit(request, duty_id=None):
                             current_date += timedelta(weeks=2)
                         elif recurrence_pattern == 'monthly':
                             # Gleicher Wochentag im nächsten Monat
-                            current_date += relativedelta(months=1)
+                            current_date = add_months(current_date, 1)
+
+                    if not dates:
+                        messages.error(request, 'Das Enddatum der Wiederholung liegt vor dem Startdatum.')
+                        return redirect('duty_create')
 
-                    # Dienste erstellen
+                    # Alle Dienste im Speicher aufbauen und gemeinsam einfügen
                     vehicle_ids = request.POST.getlist('vehicles')
-                    first_duty = None
-                    for duty_date in dates:
-                        # Titel mit Datum formatieren
-                        formatted_title = f"{title} ({duty_date.strftime('%d.%m.%Y')})"
-
-                        duty = Duty.objects.create(
-                            title=formatted_title,
-                            date=duty_date,
-                            duty_type_id=duty_type_id or None,
-                            start_time=start_time,
-                            end_time=end_time,
-                            location=request.POST.get('location', ''),
-                            description=request.POST.get('description', ''),
-                            status=request.POST.get('status', 'draft'),
-                            min_agt_count=int(request.POST.get('min_agt_count', 0)),
-                            notes=request.POST.get('notes', ''),
+                    with transaction.atomic():
+                        series = RecurrenceSeries.objects.create(
+                            title=title,
+                            pattern=recurrence_pattern,
+                            start_date=start_date,
+                            end_date=end_date,
                             created_by=request.user
                         )
-                        duty.vehicles.set(vehicle_ids)
-
-                        if first_duty is None:
-                            first_duty = duty
+                        duties = Duty.objects.bulk_create([
+                            Duty(
+                                series=series,
+                                # Titel mit Datum formatieren
+                                title=f"{title} ({duty_date.strftime('%d.%m.%Y')})",
+                                date=duty_date,
+                                duty_type_id=duty_type_id or None,
+                                start_time=start_time,
+                                end_time=end_time,
+                                location=request.POST.get('location', ''),
+                                description=request.POST.get('description', ''),
+                                status=request.POST.get('status', 'draft'),
+                                min_agt_count=int(request.POST.get('min_agt_count', 0)),
+                                notes=request.POST.get('notes', ''),
+                                created_by=request.user
+                            )
+                            for duty_date in dates
+                        ])
+                        set_duty_vehicles([d.id for d in duties], vehicle_ids)
+                        # bulk_create löst keine Signale aus
+                        transaction.on_commit(dashboard.invalidate)
+
+                    first_duty = duties[0]
 
                     messages.success(request, f'{len(dates)} Dienste wurden erstellt.')
                     return redirect('duty_detail', duty_id=first_duty.id)
@@ -253,7 +529,7 @@ def duty_edit(request, duty_id=None):
                     messages.success(request, 'Dienst wurde erstellt.')
             return redirect('duty_detail', duty_id=duty.id)
 
-    duty_types = DutyType.objects.filter(is_active=True)
+    duty_types = reference_data().active_duty_types
     vehicles = Vehicle.objects.filter(is_active=True)
 
     context = {
@@ -265,6 +541,22 @@ def duty_edit(request, duty_id=None):
     return render(request, 'scheduling/duty_form.html', context)
 
 
+def set_duty_vehicles(duty_ids, vehicle_ids):
+    """
+    Setzt die Fahrzeuge mehrerer Dienste gemeinsam.
+
+    Ersetzt die bestehenden Zuordnungen mit einem DELETE und einem
+    einzigen Bulk-Insert über die Zwischentabelle.
+    """
+    DutyVehicle = Duty.vehicles.through
+    DutyVehicle.objects.filter(duty_id__in=duty_ids).delete()
+    DutyVehicle.objects.bulk_create([
+        DutyVehicle(duty_id=duty_id, vehicle_id=vehicle_id)
+        for duty_id in duty_ids
+        for vehicle_id in vehicle_ids
+    ])
+
+
 @login_required
 @leader_required
 def duty_delete(request, duty_id):
@@ -390,35 +682,68 @@ def update_assignment(request, duty_id, position_id):
     vehicle_position = get_object_or_404(VehiclePosition, id=position_id)
 
     member_id = request.POST.get('member_id')
+    # Version, die der Client zuletzt gesehen hat (leer = noch keine Einteilung)
+    expected_version = request.POST.get('version', '')
 
     if member_id:
         member = get_object_or_404(Member, id=member_id)
     else:
         member = None
 
-    # Assignment erstellen oder aktualisieren
-    assignment, created = Assignment.objects.update_or_create(
-        duty=duty,
-        vehicle_position=vehicle_position,
-        defaults={
-            'vehicle': vehicle_position.vehicle,
-            'member': member,
-            'status': Assignment.Status.SUGGESTED,
-        }
-    )
-
-    # Qualifikation prüfen und Warnung setzen
+    # Qualifikation vorab prüfen, damit nur ein einziger Schreibzugriff nötig ist
+    has_warning = False
+    warning_text = ''
     if member:
         from .generator import check_member_qualification
-        is_qualified, warning = check_member_qualification(member, vehicle_position)
-        assignment.has_warning = not is_qualified
-        assignment.warning_text = warning if warning else ''
-        assignment.save()
+        is_qualified, warning = check_member_qualification(member, vehicle_position, duty.date)
+        has_warning = not is_qualified
+        warning_text = warning if warning else ''
+
+    fields = {
+        'vehicle_id': vehicle_position.vehicle_id,
+        'member': member,
+        'status': Assignment.Status.SUGGESTED,
+        'has_warning': has_warning,
+        'warning_text': warning_text,
+    }
+
+    if expected_version.isdigit():
+        written = Assignment.update_if_current(
+            duty.id, vehicle_position.id, int(expected_version), **fields
+        )
+    else:
+        # Neue Einteilung - schlägt fehl, wenn jemand anderes schneller war
+        try:
+            with transaction.atomic():
+                Assignment.objects.create(duty=duty, vehicle_position=vehicle_position, **fields)
+            written = True
+        except IntegrityError:
+            written = False
+
+    assignment = Assignment.objects.select_related('member').filter(
+        duty=duty,
+        vehicle_position=vehicle_position
+    ).first()
+
+    if not written:
+        # Konflikt: aktuellen Stand direkt mitliefern, damit der Client nicht erneut laden muss
+        return JsonResponse({
+            'success': False,
+            'conflict': True,
+            'error': 'Die Einteilung wurde zwischenzeitlich von jemand anderem geändert.',
+            'assignment_id': assignment.id if assignment else None,
+            'member_id': assignment.member_id if assignment else None,
+            'member_name': assignment.member.full_name if assignment and assignment.member else None,
+            'version': assignment.version if assignment else None,
+            'has_warning': assignment.has_warning if assignment else False,
+            'warning_text': assignment.warning_text if assignment else '',
+        }, status=409)
 
     return JsonResponse({
         'success': True,
         'assignment_id': assignment.id,
         'member_name': member.full_name if member else None,
+        'version': assignment.version,
         'has_warning': assignment.has_warning,
         'warning_text': assignment.warning_text,
     })
@@ -452,6 +777,12 @@ def generate_assignments(request, duty_id):
                 f'Besetzung generiert: {result["assigned_count"]} Positionen besetzt, '
                 f'{result["warning_count"]} mit Warnungen.'
             )
+            if result['conflict_count']:
+                messages.warning(
+                    request,
+                    f'{result["conflict_count"]} Position(en) wurden zwischenzeitlich von jemand '
+                    f'anderem geändert und nicht überschrieben.'
+                )
         else:
             messages.error(request, f'Fehler bei der Generierung: {result["error"]}')
 
@@ -466,7 +797,7 @@ def statistics(request):
     """Fairness-Statistiken anzeigen"""
     from datetime import date
     from django.db.models import Count
-    from apps.vehicles.models import Vehicle, Position
+    from apps.vehicles.models import Vehicle
 
     current_year = date.today().year
     selected_year = int(request.GET.get('year', current_year))
@@ -482,7 +813,7 @@ def statistics(request):
 
     # Fahrzeuge und Positionen für Spalten
     vehicles = Vehicle.objects.filter(is_active=True).order_by('priority')
-    positions = Position.objects.all().order_by('order')
+    positions = reference_data().positions
 
     # Statistiken pro Mitglied berechnen
     from .models import AssignmentHistory
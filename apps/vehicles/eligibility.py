@@ -0,0 +1,223 @@
+"""
+Eignungs-Index: welche Mitglieder können welche Fahrzeugposition besetzen.
+
+Die Anforderungen einer Position (Pflichtqualifikationen, AGT-Status)
+ändern sich selten. Statt sie bei jeder Einteilung für jedes Mitglied neu
+zu prüfen, wird die Tabelle PositionEligibility vorberechnet und bei
+Änderungen gezielt nachgeführt:
+
+- Effektive Qualifikationen, Untersuchungen oder Übungen eines Mitglieds
+  geändert: nur dieses Mitglied neu berechnen
+- Anforderungen einer Position geändert: nur diese Position neu berechnen
+- Mitglied angelegt: nur dieses Mitglied berechnen (Positionen ohne
+  Anforderungen stehen allen Mitgliedern offen)
+
+Der AGT-Status läuft mit der Zeit ab. Deshalb wird bei AGT-Positionen
+das Ablaufdatum (valid_until) gespeichert und beim Lesen mit dem
+Stichtag verglichen, statt die Tabelle täglich neu aufzubauen.
+"""
+
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Max, Q
+
+from apps.core.dates import add_months
+from apps.members.models import Member
+from apps.qualifications.models import ExerciseRecord, MedicalExam, MemberEffectiveQualification
+from .models import PositionEligibility, VehiclePosition
+
+
+def agt_valid_until(member_ids=None):
+    """
+    Ablaufdatum des AGT-Status je Mitglied.
+
+    Gültig ist der Status, solange eine positive G26.3 gültig ist und die
+    letzte Belastungsübung höchstens ein Jahr zurückliegt.
+
+    Returns:
+        dict: {member_id: date}, nur Mitglieder mit G26.3 und Übung
+    """
+    exams = MedicalExam.objects.filter(exam_type__code='G26.3', result_positive=True)
+    exercises = ExerciseRecord.objects.filter(qualification__code='AGT')
+    if member_ids is not None:
+        exams = exams.filter(member_id__in=member_ids)
+        exercises = exercises.filter(member_id__in=member_ids)
+
+    exam_until = dict(
+        exams.exclude(valid_until=None).values('member_id').annotate(
+            until=Max('valid_until')
+        ).values_list('member_id', 'until')
+    )
+    last_exercise = dict(
+        exercises.values('member_id').annotate(
+            last=Max('exercise_date')
+        ).values_list('member_id', 'last')
+    )
+
+    return {
+        member_id: min(until, add_months(last_exercise[member_id], 12))
+        for member_id, until in exam_until.items()
+        if member_id in last_exercise
+    }
+
+
+def position_requirements(position_ids=None):
+    """
+    Anforderungen je Position.
+
+    Returns:
+        dict: {vehicle_position_id: (set(required_qualification_ids), requires_agt)}
+    """
+    positions = VehiclePosition.objects.all()
+    if position_ids is not None:
+        positions = positions.filter(id__in=position_ids)
+
+    requirements = {
+        position_id: (set(), requires_agt)
+        for position_id, requires_agt in positions.values_list('id', 'requires_agt')
+    }
+    through = VehiclePosition.required_qualifications.through.objects.filter(
+        vehicleposition_id__in=list(requirements)
+    )
+    for position_id, qualification_id in through.values_list('vehicleposition_id', 'qualification_id'):
+        requirements[position_id][0].add(qualification_id)
+    return requirements
+
+
+def compute(member_ids=None, position_ids=None):
+    """
+    Soll-Zustand berechnen.
+
+    Returns:
+        dict: {(vehicle_position_id, member_id): valid_until oder None}
+    """
+    requirements = position_requirements(position_ids)
+
+    # Alle Mitglieder, auch ohne Qualifikationen (Positionen ohne Anforderungen)
+    members = Member.objects.all()
+    effective = MemberEffectiveQualification.objects.all()
+    if member_ids is not None:
+        members = members.filter(id__in=member_ids)
+        effective = effective.filter(member_id__in=member_ids)
+    qualifications = {member_id: set() for member_id in members.values_list('id', flat=True)}
+    for member_id, qualification_id in effective.values_list('member_id', 'qualification_id'):
+        qualifications[member_id].add(qualification_id)
+
+    agt_until = agt_valid_until(member_ids)
+
+    result = {}
+    for position_id, (required_ids, requires_agt) in requirements.items():
+        for member_id, held_ids in qualifications.items():
+            if not required_ids <= held_ids:
+                continue
+            if requires_agt:
+                if member_id not in agt_until:
+                    continue
+                result[(position_id, member_id)] = agt_until[member_id]
+            else:
+                result[(position_id, member_id)] = None
+    return result
+
+
+@transaction.atomic
+def refresh(member_ids=None, position_ids=None):
+    """
+    Eignungen für Mitglieder und/oder Positionen abgleichen (None = alle).
+
+    Returns:
+        tuple: (angelegt, geändert, gelöscht)
+    """
+    if member_ids is not None:
+        member_ids = list(member_ids)
+    if position_ids is not None:
+        position_ids = list(position_ids)
+    if member_ids == [] or position_ids == []:
+        return 0, 0, 0
+
+    expected = compute(member_ids, position_ids)
+
+    existing = PositionEligibility.objects.all()
+    if member_ids is not None:
+        existing = existing.filter(member_id__in=member_ids)
+    if position_ids is not None:
+        existing = existing.filter(vehicle_position_id__in=position_ids)
+
+    stale = []
+    changed = []
+    for eligibility in existing:
+        key = (eligibility.vehicle_position_id, eligibility.member_id)
+        if key not in expected:
+            stale.append(eligibility.pk)
+            continue
+        valid_until = expected.pop(key)
+        if eligibility.valid_until != valid_until:
+            eligibility.valid_until = valid_until
+            changed.append(eligibility)
+
+    if stale:
+        PositionEligibility.objects.filter(pk__in=stale).delete()
+    PositionEligibility.objects.bulk_update(changed, ['valid_until'])
+    PositionEligibility.objects.bulk_create([
+        PositionEligibility(vehicle_position_id=position_id, member_id=member_id, valid_until=valid_until)
+        for (position_id, member_id), valid_until in expected.items()
+    ], batch_size=1000)
+    return len(expected), len(changed), len(stale)
+
+
+@transaction.atomic
+def rebuild():
+    """
+    Tabelle vollständig neu aufbauen.
+
+    Returns:
+        int: Anzahl der Einträge
+    """
+    PositionEligibility.objects.all().delete()
+    created = PositionEligibility.objects.bulk_create([
+        PositionEligibility(vehicle_position_id=position_id, member_id=member_id, valid_until=valid_until)
+        for (position_id, member_id), valid_until in compute().items()
+    ], batch_size=1000)
+    return len(created)
+
+
+def eligible(on_date=None):
+    """Filter für Eignungen, die am Stichtag gelten"""
+    return Q(valid_until=None) | Q(valid_until__gte=on_date or date.today())
+
+
+def eligible_member_ids(vehicle_position_ids, on_date=None):
+    """
+    Geeignete Mitglieder je Position am Stichtag.
+
+    Returns:
+        dict: {vehicle_position_id: set(member_ids)}
+    """
+    vehicle_position_ids = list(vehicle_position_ids)
+    result = {position_id: set() for position_id in vehicle_position_ids}
+    for position_id, member_id in PositionEligibility.objects.filter(
+        eligible(on_date),
+        vehicle_position_id__in=vehicle_position_ids
+    ).values_list('vehicle_position_id', 'member_id'):
+        result[position_id].add(member_id)
+    return result
+
+
+def missing_requirements(vehicle_position, qualification_codes, agt_until, on_date=None):
+    """
+    Warnungstext für ein nicht geeignetes Mitglied.
+
+    Args:
+        vehicle_position: VehiclePosition (required_qualifications vorab geladen)
+        qualification_codes: Effektive Qualifikationskürzel des Mitglieds
+        agt_until: Ablaufdatum des AGT-Status oder None
+    """
+    on_date = on_date or date.today()
+    warnings = [
+        f'Fehlende Qualifikation: {qualification.code}'
+        for qualification in vehicle_position.required_qualifications.all()
+        if qualification.code not in qualification_codes
+    ]
+    if vehicle_position.requires_agt and (agt_until is None or agt_until < on_date):
+        warnings.append('AGT-Status nicht gültig (G26.3 oder Übungen fehlen)')
+    return '; '.join(warnings)
@@ -0,0 +1,23 @@
+"""
+Management-Command zum Neuaufbau des Eignungs-Index (PositionEligibility).
+
+Der Index wird normalerweise automatisch nachgeführt. Der Neuaufbau ist
+nur nötig, wenn Daten an den Signalen vorbei geändert wurden.
+
+Verwendung:
+    python manage.py rebuild_eligibility
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.vehicles import readiness
+from apps.vehicles.eligibility import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Baut den Eignungs-Index der Fahrzeugpositionen neu auf'
+
+    def handle(self, *args, **options):
+        count = rebuild()
+        readiness.invalidate()
+        self.stdout.write(self.style.SUCCESS(f'{count} Eignungen angelegt'))
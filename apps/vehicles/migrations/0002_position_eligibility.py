@@ -0,0 +1,79 @@
+# Generated by Django 6.0 on 2026-10-19 06:20
+
+import django.db.models.deletion
+from dateutil.relativedelta import relativedelta
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def fill_eligibility(apps, schema_editor):
+    Member = apps.get_model('members', 'Member')
+    VehiclePosition = apps.get_model('vehicles', 'VehiclePosition')
+    PositionEligibility = apps.get_model('vehicles', 'PositionEligibility')
+    MemberEffectiveQualification = apps.get_model('qualifications', 'MemberEffectiveQualification')
+    MedicalExam = apps.get_model('qualifications', 'MedicalExam')
+    ExerciseRecord = apps.get_model('qualifications', 'ExerciseRecord')
+
+    # Alle Mitglieder, auch ohne Qualifikationen (Positionen ohne Anforderungen)
+    qualifications = {member_id: set() for member_id in Member.objects.values_list('id', flat=True)}
+    for member_id, qualification_id in MemberEffectiveQualification.objects.values_list('member_id', 'qualification_id'):
+        qualifications[member_id].add(qualification_id)
+
+    exam_until = dict(
+        MedicalExam.objects.filter(exam_type__code='G26.3', result_positive=True).exclude(
+            valid_until=None
+        ).values('member_id').annotate(until=Max('valid_until')).values_list('member_id', 'until')
+    )
+    last_exercise = dict(
+        ExerciseRecord.objects.filter(qualification__code='AGT').values('member_id').annotate(
+            last=Max('exercise_date')
+        ).values_list('member_id', 'last')
+    )
+    agt_until = {
+        member_id: min(until, last_exercise[member_id] + relativedelta(years=1))
+        for member_id, until in exam_until.items()
+        if member_id in last_exercise
+    }
+
+    eligibilities = []
+    for position in VehiclePosition.objects.prefetch_related('required_qualifications'):
+        required_ids = {qualification.id for qualification in position.required_qualifications.all()}
+        for member_id, held_ids in qualifications.items():
+            if not required_ids <= held_ids:
+                continue
+            if position.requires_agt and member_id not in agt_until:
+                continue
+            eligibilities.append(PositionEligibility(
+                vehicle_position_id=position.id,
+                member_id=member_id,
+                valid_until=agt_until[member_id] if position.requires_agt else None,
+            ))
+    PositionEligibility.objects.bulk_create(eligibilities, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0004_member_fts'),
+        ('qualifications', '0002_member_effective_qualification'),
+        ('vehicles', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PositionEligibility',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('valid_until', models.DateField(blank=True, null=True, verbose_name='Gültig bis')),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='position_eligibilities', to='members.member', verbose_name='Mitglied')),
+                ('vehicle_position', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eligibilities', to='vehicles.vehicleposition', verbose_name='Fahrzeug-Position')),
+            ],
+            options={
+                'verbose_name': 'Positions-Eignung',
+                'verbose_name_plural': 'Positions-Eignungen',
+                'indexes': [models.Index(fields=['vehicle_position', 'valid_until'], name='vehicles_po_vehicle_15a6cf_idx')],
+                'unique_together': {('vehicle_position', 'member')},
+            },
+        ),
+        migrations.RunPython(fill_eligibility, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0 on 2026-10-19 08:15
+
+from importlib import import_module
+
+from django.db import migrations
+
+
+def refresh_eligibility(apps, schema_editor):
+    """Eignungen nach der ergänzten Qualifikations-Hierarchie neu aufbauen"""
+    PositionEligibility = apps.get_model('vehicles', 'PositionEligibility')
+    PositionEligibility.objects.all().delete()
+    import_module(
+        'apps.vehicles.migrations.0002_position_eligibility'
+    ).fill_eligibility(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qualifications', '0004_missing_covers'),
+        ('vehicles', '0002_position_eligibility'),
+    ]
+
+    operations = [
+        migrations.RunPython(refresh_eligibility, migrations.RunPython.noop),
+    ]
@@ -135,6 +135,41 @@ class VehiclePosition(models.Model):
         return f"{self.vehicle.call_sign} - {self.position.short_name}"
 
 
+class PositionEligibility(models.Model):
+    """
+    Vorberechnete Eignung eines Mitglieds für eine Fahrzeugposition.
+
+    Ein Eintrag besteht, wenn das Mitglied alle Pflichtqualifikationen
+    (effektiv) besitzt. Bei Positionen mit AGT-Pflicht gilt er nur bis
+    valid_until (Ablauf von G26.3 bzw. der letzten Belastungsübung).
+    Wird über Signale gepflegt (siehe eligibility.py).
+    """
+    vehicle_position = models.ForeignKey(
+        VehiclePosition,
+        on_delete=models.CASCADE,
+        related_name='eligibilities',
+        verbose_name='Fahrzeug-Position'
+    )
+    member = models.ForeignKey(
+        'members.Member',
+        on_delete=models.CASCADE,
+        related_name='position_eligibilities',
+        verbose_name='Mitglied'
+    )
+    valid_until = models.DateField('Gültig bis', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Positions-Eignung'
+        verbose_name_plural = 'Positions-Eignungen'
+        unique_together = ['vehicle_position', 'member']
+        indexes = [
+            models.Index(fields=['vehicle_position', 'valid_until']),
+        ]
+
+    def __str__(self):
+        return f"{self.vehicle_position} - {self.member}"
+
+
 class PositionRule(models.Model):
     """Regel für eine Position (alternative Qualifikationsanforderungen)"""
 
@@ -0,0 +1,111 @@
+"""
+Einsatzbereitschaft: Abdeckung aller Fahrzeugpositionen.
+
+Für jede Position wird gezählt, wie viele aktive Mitglieder sie besetzen
+können, wie viele davon ihren AGT-Status in den nächsten N Tagen
+verlieren und ob die Position an einer einzelnen Person hängt.
+
+Grundlage ist der Eignungs-Index (PositionEligibility); der Bericht
+braucht damit drei Abfragen unabhängig von der Zahl der Fahrzeuge.
+Das Ergebnis wird im Cache gehalten und über eine Versionsnummer
+verworfen, sobald sich Eignungen, Mitglieder oder Fahrzeuge ändern.
+"""
+
+from datetime import timedelta
+
+from django.core.cache import cache
+
+from apps.members.models import Member
+from .eligibility import eligible
+from .models import PositionEligibility, VehiclePosition
+
+
+# Vorwarnzeit für ablaufende AGT-Tauglichkeit (Tage)
+DEFAULT_EXPIRING_DAYS = 30
+
+CACHE_TIMEOUT = 60 * 60
+VERSION_KEY = 'vehicles:readiness:version'
+
+
+def cache_version():
+    return cache.get_or_set(VERSION_KEY, 1, None)
+
+
+def invalidate():
+    """Zwischengespeicherte Berichte verwerfen"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def build_report(on_date, expiring_days):
+    """
+    Bericht berechnen.
+
+    Returns:
+        list: Fahrzeuge als Dicts mit ihren Positionen (nur einfache Werte, damit cachebar)
+    """
+    expiring_until = on_date + timedelta(days=expiring_days)
+
+    positions = VehiclePosition.objects.filter(
+        vehicle__is_active=True
+    ).select_related('vehicle', 'position').order_by('vehicle__priority', 'vehicle__call_sign', 'seat_number')
+
+    active_ids = set(Member.objects.filter(status='active', is_active=True).values_list('id', flat=True))
+
+    eligible_counts = {}
+    expiring_counts = {}
+    for position_id, member_id, valid_until in PositionEligibility.objects.filter(
+        eligible(on_date),
+        vehicle_position__vehicle__is_active=True
+    ).values_list('vehicle_position_id', 'member_id', 'valid_until'):
+        if member_id not in active_ids:
+            continue
+        eligible_counts[position_id] = eligible_counts.get(position_id, 0) + 1
+        if valid_until is not None and valid_until <= expiring_until:
+            expiring_counts[position_id] = expiring_counts.get(position_id, 0) + 1
+
+    vehicles = {}
+    for position in positions:
+        vehicle = vehicles.setdefault(position.vehicle_id, {
+            'id': position.vehicle_id,
+            'call_sign': position.vehicle.call_sign,
+            'name': position.vehicle.name,
+            'positions': [],
+            'single_point_count': 0,
+            'uncovered_count': 0,
+        })
+        eligible_count = eligible_counts.get(position.id, 0)
+        expiring_count = expiring_counts.get(position.id, 0)
+        remaining = eligible_count - expiring_count
+
+        vehicle['positions'].append({
+            'id': position.id,
+            'short_name': position.position.short_name,
+            'name': position.position.name,
+            'seat_number': position.seat_number,
+            'is_required': position.is_required,
+            'requires_agt': position.requires_agt,
+            'eligible': eligible_count,
+            'expiring': expiring_count,
+            'remaining': remaining,
+            'is_single_point': remaining == 1,
+            'is_uncovered': remaining == 0,
+        })
+        if remaining == 1:
+            vehicle['single_point_count'] += 1
+        elif remaining == 0:
+            vehicle['uncovered_count'] += 1
+
+    return list(vehicles.values())
+
+
+def readiness_report(on_date, expiring_days=DEFAULT_EXPIRING_DAYS):
+    """Bericht aus dem Cache oder neu berechnet"""
+    key = f'vehicles:readiness:{cache_version()}:{on_date.isoformat()}:{expiring_days}'
+    report = cache.get(key)
+    if report is None:
+        report = build_report(on_date, expiring_days)
+        cache.set(key, report, CACHE_TIMEOUT)
+    return report
@@ -0,0 +1,84 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from apps.members.models import Member
+from apps.qualifications.effective import effective_qualifications_changed
+from apps.qualifications.models import ExerciseRecord, MedicalExam
+from apps.qualifications.records import records_changed
+from . import readiness
+from .eligibility import refresh
+from .models import Vehicle, VehiclePosition
+
+
+def refresh_eligibility(**kwargs):
+    """Eignungen abgleichen und bei Änderungen den Bereitschaftsbericht verwerfen"""
+    if any(refresh(**kwargs)):
+        transaction.on_commit(readiness.invalidate)
+
+
+@receiver(effective_qualifications_changed)
+def update_eligibility_for_qualifications(sender, member_ids, **kwargs):
+    """Eignungen nach geänderten effektiven Qualifikationen nachführen"""
+    refresh_eligibility(member_ids=member_ids)
+
+
+@receiver(post_save, sender=MedicalExam)
+@receiver(post_delete, sender=MedicalExam)
+@receiver(post_save, sender=ExerciseRecord)
+@receiver(post_delete, sender=ExerciseRecord)
+def update_eligibility_for_agt(sender, instance, raw=False, **kwargs):
+    """Eignungen nach Untersuchungen und Übungen nachführen (AGT-Status)"""
+    if raw:
+        return
+    refresh_eligibility(member_ids=[instance.member_id])
+
+
+@receiver(records_changed)
+def update_eligibility_for_records(sender, member_ids, **kwargs):
+    """Eignungen nach Massen-Erfassung von Untersuchungen/Übungen nachführen"""
+    refresh_eligibility(member_ids=member_ids)
+
+
+@receiver(post_save, sender=VehiclePosition)
+def update_eligibility_for_position(sender, instance, raw=False, **kwargs):
+    """Eignungen nach Änderung einer Position nachführen (z.B. AGT-Pflicht)"""
+    if raw:
+        return
+    refresh_eligibility(position_ids=[instance.pk])
+    transaction.on_commit(readiness.invalidate)
+
+
+@receiver(m2m_changed, sender=VehiclePosition.required_qualifications.through)
+def update_eligibility_for_requirements(sender, instance, action, reverse, pk_set, **kwargs):
+    """Eignungen nach Änderung der Pflichtqualifikationen nachführen"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        refresh_eligibility(position_ids=[instance.pk])
+    elif pk_set:
+        # qualification.required_for_positions.add(...): pk_set sind die Positionen
+        refresh_eligibility(position_ids=pk_set)
+    else:
+        refresh_eligibility()
+
+
+@receiver(post_save, sender=Member)
+def update_eligibility_for_new_member(sender, instance, created, raw=False, **kwargs):
+    """Neue Mitglieder für Positionen ohne Anforderungen eintragen"""
+    if raw or not created:
+        return
+    refresh_eligibility(member_ids=[instance.pk])
+
+
+@receiver(post_delete, sender=VehiclePosition)
+@receiver(post_save, sender=Vehicle)
+@receiver(post_delete, sender=Vehicle)
+@receiver(post_save, sender=Member)
+@receiver(post_delete, sender=Member)
+def invalidate_readiness(sender, raw=False, **kwargs):
+    """Bereitschaftsbericht nach Änderungen an Fahrzeugen oder Mitgliedern verwerfen"""
+    if raw:
+        return
+    transaction.on_commit(readiness.invalidate)
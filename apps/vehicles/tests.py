@@ -1,3 +1,283 @@
+from datetime import date, timedelta
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+
+from apps.core.models import User
+from apps.core.views import create_default_qualifications
+from apps.members.models import Member
+from apps.qualifications.models import (
+    ExerciseRecord, MedicalExam, MedicalExamType, MemberQualification, Qualification
+)
+from apps.scheduling.generator import check_member_qualification
+from . import readiness
+from .eligibility import compute, eligible, rebuild
+from .models import Position, PositionEligibility, Vehicle, VehiclePosition, VehicleType
+
+
+class PositionEligibilityTests(TestCase):
+    """PositionEligibility stimmt nach Änderungen der Hierarchie mit qualified_for überein"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tm1 = Qualification.objects.create(code='TM1', name='Truppmann Teil 1')
+        cls.tm2 = Qualification.objects.create(code='TM2', name='Truppmann Teil 2')
+        cls.agt = Qualification.objects.create(code='AGT', name='Atemschutzgeräteträger')
+        g26 = MedicalExamType.objects.create(code='G26.3', name='Atemschutz', validity_months=36)
+
+        vehicle_type = VehicleType.objects.create(name='Löschgruppenfahrzeug', short_name='LF')
+        vehicle = Vehicle.objects.create(vehicle_type=vehicle_type, call_sign='LF 1')
+        cls.crew = VehiclePosition.objects.create(
+            vehicle=vehicle, position=Position.objects.create(name='Truppmann', short_name='TRM')
+        )
+        cls.crew.required_qualifications.add(cls.tm1)
+        cls.breathing = VehiclePosition.objects.create(
+            vehicle=vehicle,
+            position=Position.objects.create(name='Angriffstrupp', short_name='ATR'),
+            seat_number=2,
+            requires_agt=True
+        )
+        cls.breathing.required_qualifications.add(cls.tm1)
+        cls.messenger = VehiclePosition.objects.create(
+            vehicle=vehicle,
+            position=Position.objects.create(name='Melder', short_name='ME'),
+            seat_number=3
+        )
+
+        cls.member_tm1 = Member.objects.create(first_name='Anna', last_name='Alt', status='active')
+        cls.member_tm2 = Member.objects.create(first_name='Bernd', last_name='Berg', status='active')
+        cls.member_without = Member.objects.create(first_name='Clara', last_name='Christ', status='active')
+        MemberQualification.objects.create(member=cls.member_tm1, qualification=cls.tm1)
+        MemberQualification.objects.create(member=cls.member_tm2, qualification=cls.tm2)
+
+        today = date.today()
+        for member in (cls.member_tm1, cls.member_tm2):
+            MedicalExam.objects.create(
+                member=member, exam_type=g26, exam_date=today - timedelta(days=30),
+                valid_until=today + timedelta(days=300)
+            )
+            ExerciseRecord.objects.create(
+                member=member, qualification=cls.agt, exercise_date=today - timedelta(days=60),
+                exercise_type='Belastungsübung'
+            )
+
+    def eligible_ids(self, vehicle_position):
+        return set(PositionEligibility.objects.filter(
+            eligible(), vehicle_position=vehicle_position
+        ).values_list('member_id', flat=True))
+
+    def assert_table_matches_qualified_for(self):
+        self.assertEqual(
+            {
+                (eligibility.vehicle_position_id, eligibility.member_id): eligibility.valid_until
+                for eligibility in PositionEligibility.objects.all()
+            },
+            compute()
+        )
+        for vehicle_position in (self.crew, self.breathing, self.messenger):
+            self.assertEqual(
+                self.eligible_ids(vehicle_position),
+                set(Member.objects.qualified_for(vehicle_position).values_list('id', flat=True)),
+                vehicle_position
+            )
+
+    def test_initial_state(self):
+        self.assert_table_matches_qualified_for()
+        self.assertEqual(self.eligible_ids(self.crew), {self.member_tm1.id})
+        self.assertEqual(
+            PositionEligibility.objects.get(vehicle_position=self.breathing, member=self.member_tm1).valid_until,
+            date.today() + timedelta(days=300)
+        )
+
+    def test_position_without_requirements_is_open_to_everyone(self):
+        everyone = {self.member_tm1.id, self.member_tm2.id, self.member_without.id}
+        self.assertEqual(self.eligible_ids(self.messenger), everyone)
+        self.assertEqual(check_member_qualification(self.member_without, self.messenger), (True, None))
+        self.assertFalse(check_member_qualification(self.member_without, self.crew)[0])
+
+        new_member = Member.objects.create(first_name='Dora', last_name='Dorn', status='active')
+        self.assert_table_matches_qualified_for()
+        self.assertEqual(self.eligible_ids(self.messenger), everyone | {new_member.id})
+
+        self.messenger.required_qualifications.add(self.tm1)
+        self.assert_table_matches_qualified_for()
+        self.assertEqual(self.eligible_ids(self.messenger), {self.member_tm1.id})
+
+    def test_rebuild_includes_members_without_qualifications(self):
+        rebuild()
+        self.assert_table_matches_qualified_for()
+        self.assertIn(self.member_without.id, self.eligible_ids(self.messenger))
+
+    def test_covers_add_and_remove(self):
+        self.tm2.covers.add(self.tm1)
+        self.assert_table_matches_qualified_for()
+        self.assertEqual(self.eligible_ids(self.crew), {self.member_tm1.id, self.member_tm2.id})
+        self.assertEqual(self.eligible_ids(self.breathing), {self.member_tm1.id, self.member_tm2.id})
+
+        self.tm2.covers.remove(self.tm1)
+        self.assert_table_matches_qualified_for()
+        self.assertEqual(self.eligible_ids(self.crew), {self.member_tm1.id})
+
+    def test_covered_by_add_and_clear(self):
+        self.tm1.covered_by.add(self.tm2)
+        self.assert_table_matches_qualified_for()
+        self.assertIn(self.member_tm2.id, self.eligible_ids(self.crew))
+
+        self.tm1.covered_by.clear()
+        self.assert_table_matches_qualified_for()
+        self.assertNotIn(self.member_tm2.id, self.eligible_ids(self.crew))
+
+    def test_expired_agt_status_is_excluded(self):
+        self.tm2.covers.add(self.tm1)
+        ExerciseRecord.objects.filter(member=self.member_tm2).update(
+            exercise_date=date.today() - timedelta(days=400)
+        )
+        ExerciseRecord.objects.filter(member=self.member_tm2).first().save()
+
+        self.assert_table_matches_qualified_for()
+        self.assertEqual(self.eligible_ids(self.breathing), {self.member_tm1.id})
+
+
+class DefaultHierarchyTests(TestCase):
+    """Die Standard-Qualifikationen des Einrichtungsassistenten bilden die alte Hierarchie ab"""
+
+    def test_higher_course_parts_cover_lower_ones(self):
+        create_default_qualifications()
+        member = Member.objects.create(first_name='Clara', last_name='Christ', status='active')
+        for code in ('TM2', 'ABC2'):
+            MemberQualification.objects.create(member=member, qualification=Qualification.objects.get(code=code))
+
+        for code in ('TM1', 'TM2', 'ABC1', 'ABC2'):
+            self.assertTrue(Member.objects.with_qualification(code).filter(pk=member.pk).exists(), code)
+        self.assertFalse(Member.objects.with_qualification('TM').filter(pk=member.pk).exists())
+
+
+class ReadinessReportTests(TestCase):
+    """Einsatzbereitschaft (readiness.py) und Eignungsübersicht"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('leader', password='x', role=User.Role.LEADER)
+        tm1 = Qualification.objects.create(code='TM1', name='Truppmann Teil 1')
+        agt = Qualification.objects.create(code='AGT', name='Atemschutzgeräteträger')
+        g26 = MedicalExamType.objects.create(code='G26.3', name='Atemschutz', validity_months=36)
+
+        vehicle_type = VehicleType.objects.create(name='Löschgruppenfahrzeug', short_name='LF')
+        cls.vehicle = Vehicle.objects.create(vehicle_type=vehicle_type, call_sign='LF 1')
+        cls.crew = VehiclePosition.objects.create(
+            vehicle=cls.vehicle, position=Position.objects.create(name='Truppmann', short_name='TRM')
+        )
+        cls.crew.required_qualifications.add(tm1)
+        cls.breathing = VehiclePosition.objects.create(
+            vehicle=cls.vehicle,
+            position=Position.objects.create(name='Angriffstrupp', short_name='ATR'),
+            seat_number=2,
+            requires_agt=True
+        )
+        cls.breathing.required_qualifications.add(tm1)
+        cls.messenger = VehiclePosition.objects.create(
+            vehicle=cls.vehicle,
+            position=Position.objects.create(name='Melder', short_name='ME'),
+            seat_number=3
+        )
+        inactive_vehicle = Vehicle.objects.create(vehicle_type=vehicle_type, call_sign='LF 2', is_active=False)
+        VehiclePosition.objects.create(vehicle=inactive_vehicle, position=cls.messenger.position)
+
+        cls.today = date.today()
+        cls.anna = Member.objects.create(first_name='Anna', last_name='Alt', status='active')
+        cls.bernd = Member.objects.create(first_name='Bernd', last_name='Berg', status='active')
+        cls.clara = Member.objects.create(first_name='Clara', last_name='Christ', status='active')
+        cls.dora = Member.objects.create(first_name='Dora', last_name='Dorn', status='inactive')
+        for member in (cls.anna, cls.bernd, cls.dora):
+            MemberQualification.objects.create(member=member, qualification=tm1)
+        for member, valid_days in ((cls.anna, 300), (cls.bernd, 10)):
+            MedicalExam.objects.create(
+                member=member, exam_type=g26, exam_date=cls.today - timedelta(days=30),
+                valid_until=cls.today + timedelta(days=valid_days)
+            )
+            ExerciseRecord.objects.create(
+                member=member, qualification=agt, exercise_date=cls.today - timedelta(days=60),
+                exercise_type='Belastungsübung'
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def positions(self, expiring_days=readiness.DEFAULT_EXPIRING_DAYS):
+        report = readiness.readiness_report(self.today, expiring_days)
+        self.assertEqual([vehicle['call_sign'] for vehicle in report], ['LF 1'])
+        return {position['short_name']: position for position in report[0]['positions']}
+
+    def test_counts_only_active_members(self):
+        positions = self.positions()
+
+        self.assertEqual(positions['TRM']['eligible'], 2)
+        self.assertEqual(positions['ME']['eligible'], 3)
+        self.assertEqual(positions['ME']['remaining'], 3)
+        self.assertFalse(positions['ME']['is_uncovered'])
+
+    def test_expiring_window(self):
+        positions = self.positions(30)
+        self.assertEqual(
+            (positions['ATR']['eligible'], positions['ATR']['expiring'], positions['ATR']['remaining']), (2, 1, 1)
+        )
+        self.assertTrue(positions['ATR']['is_single_point'])
+
+        # Grenze: Ablauf genau am letzten Tag der Vorwarnzeit zählt noch
+        self.assertEqual(self.positions(10)['ATR']['expiring'], 1)
+        self.assertEqual(self.positions(9)['ATR']['expiring'], 0)
+
+        report = readiness.build_report(self.today + timedelta(days=11), 30)
+        atr = {position['short_name']: position for position in report[0]['positions']}['ATR']
+        self.assertEqual((atr['eligible'], atr['expiring']), (1, 0))
+
+    def test_uncovered_position(self):
+        MemberQualification.objects.filter(member__in=[self.anna, self.bernd]).delete()
+        readiness.invalidate()
+
+        positions = self.positions()
+        self.assertTrue(positions['TRM']['is_uncovered'])
+        self.assertEqual(self.positions()['ME']['remaining'], 3)
+
+    def test_report_is_cached_until_invalidated(self):
+        self.assertEqual(self.positions()['ME']['eligible'], 3)
+
+        PositionEligibility.objects.filter(member=self.clara).delete()
+        self.assertEqual(self.positions()['ME']['eligible'], 3)
+
+        readiness.invalidate()
+        self.assertEqual(self.positions()['ME']['eligible'], 2)
+
+    def test_member_changes_invalidate_after_commit(self):
+        self.assertEqual(self.positions()['ME']['eligible'], 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Member.objects.create(first_name='Emil', last_name='Eck', status='active')
+        self.assertEqual(self.positions()['ME']['eligible'], 4)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.clara.status = 'inactive'
+            self.clara.save()
+        self.assertEqual(self.positions()['ME']['eligible'], 3)
+
+    def test_csv_status(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse('vehicle_readiness_csv'))
+
+        rows = {
+            row.split(';')[1]: row.split(';')[-1]
+            for row in response.content.decode('utf-8-sig').splitlines()[1:]
+        }
+        self.assertEqual(rows, {'TRM': 'ok', 'ATR': 'einzige Person', 'ME': 'ok'})
+
+    def test_eligibility_matrix_counts_positions_without_requirements(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse('vehicle_eligibility'))
 
-# Create your tests here.
+        counts = {item['position'].position.short_name: item['count'] for item in response.context['positions']}
+        self.assertEqual(counts, {'TRM': 2, 'ATR': 2, 'ME': 3})
+        clara = next(row for row in response.context['rows'] if row['member'] == self.clara)
+        self.assertEqual(clara['count'], 1)
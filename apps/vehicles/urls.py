@@ -15,6 +15,13 @@ urlpatterns = [
     path('types/<int:type_id>/edit/', views.vehicle_type_edit, name='vehicle_type_edit'),
     path('types/<int:type_id>/delete/', views.vehicle_type_delete, name='vehicle_type_delete'),
 
+    # Eignungen (wer kann was)
+    path('eligibility/', views.vehicle_eligibility, name='vehicle_eligibility'),
+
+    # Einsatzbereitschaft
+    path('readiness/', views.vehicle_readiness, name='vehicle_readiness'),
+    path('readiness/export/', views.vehicle_readiness_csv, name='vehicle_readiness_csv'),
+
     # Positionen
     path('positions/', views.position_list, name='position_list'),
     path('positions/new/', views.position_edit, name='position_create'),
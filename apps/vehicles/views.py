@@ -1,9 +1,17 @@
+import csv
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db.models import Q
+from django.http import HttpResponse
+from django.utils import timezone
 
+from apps.core.refdata import reference_data
 from apps.core.views import leader_required, admin_required
+from apps.members.models import Member
+from . import readiness
+from .eligibility import eligible_member_ids
 from .models import Vehicle, VehicleType, Position, VehiclePosition
 
 
@@ -25,7 +33,7 @@ def vehicle_list(request):
     if type_filter:
         vehicles = vehicles.filter(vehicle_type_id=type_filter)
 
-    vehicle_types = VehicleType.objects.all()
+    vehicle_types = reference_data().vehicle_types
 
     context = {
         'vehicles': vehicles,
@@ -54,6 +62,103 @@ def vehicle_detail(request, vehicle_id):
     return render(request, 'vehicles/vehicle_detail.html', context)
 
 
+@login_required
+@leader_required
+def vehicle_eligibility(request):
+    """Übersicht wer kann was: geeignete Mitglieder je Fahrzeugposition"""
+    today = timezone.now().date()
+
+    positions = list(VehiclePosition.objects.filter(
+        vehicle__is_active=True
+    ).select_related('vehicle', 'position').order_by('vehicle__priority', 'vehicle__call_sign', 'seat_number'))
+
+    members = list(Member.objects.filter(
+        status='active',
+        is_active=True
+    ).select_related('unit').order_by('last_name', 'first_name'))
+
+    eligible = eligible_member_ids([position.id for position in positions], today)
+    member_ids = {member.id for member in members}
+
+    rows = []
+    for member in members:
+        cells = [member.id in eligible[position.id] for position in positions]
+        rows.append({
+            'member': member,
+            'cells': cells,
+            'count': sum(cells),
+        })
+
+    context = {
+        'positions': [
+            {'position': position, 'count': len(eligible[position.id] & member_ids)}
+            for position in positions
+        ],
+        'rows': rows,
+        'today': today,
+    }
+    return render(request, 'vehicles/eligibility.html', context)
+
+
+def readiness_days(request):
+    """Vorwarnzeit aus ?days= (Standard: 30 Tage)"""
+    days = request.GET.get('days', '')
+    return min(int(days), 365) if days.isdigit() else readiness.DEFAULT_EXPIRING_DAYS
+
+
+@login_required
+@leader_required
+def vehicle_readiness(request):
+    """Einsatzbereitschaft: Abdeckung aller Positionen aller Fahrzeuge"""
+    today = timezone.now().date()
+    days = readiness_days(request)
+
+    context = {
+        'vehicles': readiness.readiness_report(today, days),
+        'days': days,
+        'today': today,
+    }
+    return render(request, 'vehicles/readiness.html', context)
+
+
+@login_required
+@leader_required
+def vehicle_readiness_csv(request):
+    """Einsatzbereitschaft als CSV"""
+    today = timezone.now().date()
+    days = readiness_days(request)
+
+    response = HttpResponse(content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="einsatzbereitschaft_{today.isoformat()}.csv"'
+    # BOM für Excel-Kompatibilität
+    response.write('\ufeff')
+
+    writer = csv.writer(response, delimiter=';')
+    writer.writerow([
+        'fahrzeug', 'position', 'bezeichnung', 'agt', 'geeignet',
+        f'agt_ablauf_{days}_tage', 'verbleibend', 'status'
+    ])
+    for vehicle in readiness.readiness_report(today, days):
+        for position in vehicle['positions']:
+            if position['is_uncovered']:
+                status = 'nicht besetzbar'
+            elif position['is_single_point']:
+                status = 'einzige Person'
+            else:
+                status = 'ok'
+            writer.writerow([
+                vehicle['call_sign'],
+                position['short_name'],
+                position['name'],
+                'ja' if position['requires_agt'] else 'nein',
+                position['eligible'],
+                position['expiring'],
+                position['remaining'],
+                status,
+            ])
+    return response
+
+
 @login_required
 @admin_required
 def vehicle_edit(request, vehicle_id=None):
@@ -93,7 +198,7 @@ def vehicle_edit(request, vehicle_id=None):
                 messages.success(request, 'Fahrzeug wurde erstellt.')
             return redirect('vehicle_detail', vehicle_id=vehicle.id)
 
-    vehicle_types = VehicleType.objects.all()
+    vehicle_types = reference_data().vehicle_types
 
     context = {
         'vehicle': vehicle,
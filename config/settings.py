@@ -65,6 +65,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Vor allen anderen: /healthz ohne Session und Authentifizierung beantworten
+    'apps.core.middleware.HealthCheckMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -99,12 +101,28 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database file is stored in user data directory when running in Electron
 DB_PATH = os.getenv('FF_DATABASE_PATH', BASE_DIR / 'data' / 'ff_database.sqlite3')
 
+# Pragmas für jede neue Verbindung:
+# - WAL: Leser blockieren Schreiber nicht mehr (und umgekehrt)
+# - synchronous=NORMAL: im WAL-Modus sicher, spart das fsync je Commit
+# - Seiten-Cache (negativ = KiB) und Memory-Mapping je Verbindung
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -int(os.getenv('FF_SQLITE_CACHE_KB', '32768')),
+    'mmap_size': int(os.getenv('FF_SQLITE_MMAP_BYTES', str(128 * 1024 * 1024))),
+    'temp_store': 'MEMORY',
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': DB_PATH,
         'OPTIONS': {
             'timeout': 20,
+            # Schreibsperre schon bei Beginn der Transaktion holen, statt beim
+            # ersten Schreibzugriff (vermeidet "database is locked" ohne Wartezeit)
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
         }
     }
 }
@@ -113,6 +131,23 @@ DATABASES = {
 DATA_DIR = Path(DB_PATH).parent
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
+# CSV-Importe im Server-Prozess (Hintergrund-Thread) verarbeiten.
+# Bei 'false' übernimmt "manage.py process_import_jobs --watch" die Verarbeitung.
+IMPORT_JOBS_IN_PROCESS = os.getenv('FF_IMPORT_JOBS_IN_PROCESS', 'true').lower() == 'true'
+
+# Minuten, nach denen ein laufender Import-Job als abgebrochen gilt
+# (z.B. weil der Server während des Imports beendet wurde)
+IMPORT_JOB_TIMEOUT_MINUTES = int(os.getenv('FF_IMPORT_JOB_TIMEOUT_MINUTES', '30'))
+
+# Sekunden, nach denen ein Prozess die Stammdaten-Version in der Datenbank
+# erneut prüft (Änderungen anderer App-Instanzen werden spätestens dann sichtbar)
+REFERENCE_DATA_CHECK_INTERVAL = float(os.getenv('FF_REFERENCE_DATA_CHECK_INTERVAL', '2'))
+
+# Anwendungsserver ("manage.py serve"): Worker-Threads und Sekunden, die eine
+# unbenutzte Keep-Alive-Verbindung offen bleibt
+SERVER_THREADS = int(os.getenv('FF_SERVER_THREADS', '8'))
+SERVER_KEEP_ALIVE = int(os.getenv('FF_SERVER_KEEP_ALIVE', '120'))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -197,125 +197,103 @@ function startDjango() {
             return;
         }
 
-        // First run migrations
-        log.info('Running migrations...');
-        const migrateProcess = spawn(pythonPath, [managePath, 'migrate', '--run-syncdb'], {
+        // Start Django server (waitress, see manage.py serve). It migrates in the
+        // same process, and only when the bundled migrations changed.
+        log.info('Starting Django server...');
+        djangoProcess = spawn(pythonPath, [
+            managePath,
+            'serve',
+            '--host', DJANGO_HOST,
+            '--port', String(DJANGO_PORT),
+            '--migrate',
+            '--stdin-shutdown'
+        ], {
             cwd: djangoPath,
             env: env,
             stdio: ['pipe', 'pipe', 'pipe']
         });
 
-        let migrateError = '';
+        let serverError = '';
 
-        migrateProcess.stdout.on('data', (data) => {
-            log.info(`[migrate] ${data.toString().trim()}`);
+        djangoProcess.stdout.on('data', (data) => {
+            log.info(`[Django] ${data.toString().trim()}`);
         });
 
-        migrateProcess.stderr.on('data', (data) => {
-            const msg = data.toString().trim();
-            migrateError += msg + '\n';
-            log.warn(`[migrate] ${msg}`);
-        });
-
-        migrateProcess.on('close', (code) => {
-            if (code !== 0) {
-                log.error(`Migration failed with code ${code}`);
-                log.error(`Migration error output: ${migrateError}`);
-                // Don't reject here, try to start server anyway
-            }
-
-            // Start Django server
-            log.info('Starting Django server...');
-            djangoProcess = spawn(pythonPath, [
-                managePath,
-                'runserver',
-                '--noreload',
-                `${DJANGO_HOST}:${DJANGO_PORT}`
-            ], {
-                cwd: djangoPath,
-                env: env,
-                stdio: ['pipe', 'pipe', 'pipe']
-            });
-
-            let serverError = '';
-
-            djangoProcess.stdout.on('data', (data) => {
-                const output = data.toString();
+        djangoProcess.stderr.on('data', (data) => {
+            const output = data.toString();
+            serverError += output;
+            if (output.includes('Error') || output.includes('Exception') || output.includes('Traceback')) {
+                log.error(`[Django] ${output.trim()}`);
+            } else {
                 log.info(`[Django] ${output.trim()}`);
+            }
+        });
 
-                // Check if server is ready
-                if (output.includes('Starting development server')) {
-                    resolve();
-                }
-            });
-
-            djangoProcess.stderr.on('data', (data) => {
-                const output = data.toString();
-                serverError += output;
-                // Django logs to stderr by default
-                if (output.includes('Starting development server')) {
-                    log.info('[Django] Server started');
-                    resolve();
-                } else if (output.includes('Error') || output.includes('Exception') || output.includes('Traceback')) {
-                    log.error(`[Django] ${output.trim()}`);
-                } else {
-                    log.info(`[Django] ${output.trim()}`);
-                }
-            });
-
-            djangoProcess.on('error', (err) => {
-                log.error('Failed to start Django:', err);
-                reject(err);
-            });
-
-            djangoProcess.on('close', (code) => {
-                log.info(`Django process exited with code ${code}`);
-                if (code !== 0 && serverError) {
-                    log.error(`Django server error: ${serverError}`);
-                }
-                djangoProcess = null;
-            });
-
-            // Timeout for server startup
-            setTimeout(() => {
-                resolve(); // Resolve anyway after timeout
-            }, 10000);
+        // Readiness is checked by waitForDjango() via /healthz
+        djangoProcess.on('spawn', () => {
+            resolve();
         });
 
-        migrateProcess.on('error', (err) => {
-            log.error('Failed to start migration:', err);
+        djangoProcess.on('error', (err) => {
+            log.error('Failed to start Django:', err);
             reject(err);
         });
+
+        djangoProcess.on('close', (code) => {
+            log.info(`Django process exited with code ${code}`);
+            if (code !== 0 && serverError) {
+                log.error(`Django server error: ${serverError}`);
+            }
+            djangoProcess = null;
+        });
     });
 }
 
-// Wait for Django to be ready
-function waitForDjango(maxAttempts = 60) {
+// Wait for Django to be ready: poll /healthz until database and schema are ready
+function waitForDjango(timeout = 120000) {
     return new Promise((resolve, reject) => {
+        const deadline = Date.now() + timeout;
         let attempts = 0;
 
+        const retry = () => {
+            if (!djangoProcess) {
+                reject(new Error('Django server exited during startup'));
+            } else if (Date.now() >= deadline) {
+                reject(new Error('Django server did not start in time'));
+            } else {
+                setTimeout(check, 100);
+            }
+        };
+
         const check = () => {
             attempts++;
-
-            const req = http.get(`${DJANGO_URL}/`, (res) => {
-                log.info(`Django responded with status: ${res.statusCode}`);
-                resolve();
+            let done = false;
+
+            const req = http.get(`${DJANGO_URL}/healthz`, (res) => {
+                let body = '';
+                res.on('data', (chunk) => { body += chunk; });
+                res.on('end', () => {
+                    done = true;
+                    if (res.statusCode === 200) {
+                        log.info(`Django is ready after ${attempts} health check(s)`);
+                        resolve();
+                    } else {
+                        log.debug(`Django not ready yet: ${res.statusCode} ${body}`);
+                        retry();
+                    }
+                });
             });
 
-            req.on('error', (err) => {
-                if (attempts < maxAttempts) {
+            req.on('error', () => {
+                if (!done) {
+                    done = true;
                     log.debug(`Waiting for Django... (attempt ${attempts})`);
-                    setTimeout(check, 500);
-                } else {
-                    reject(new Error('Django server did not start in time'));
+                    retry();
                 }
             });
 
             req.setTimeout(1000, () => {
                 req.destroy();
-                if (attempts < maxAttempts) {
-                    setTimeout(check, 500);
-                }
             });
         };
 
@@ -327,17 +305,22 @@ function waitForDjango(maxAttempts = 60) {
 function stopDjango() {
     if (djangoProcess) {
         log.info('Stopping Django server...');
+        const proc = djangoProcess;
 
-        if (process.platform === 'win32') {
-            spawn('taskkill', ['/pid', djangoProcess.pid, '/f', '/t']);
-        } else {
-            djangoProcess.kill('SIGTERM');
-            setTimeout(() => {
-                if (djangoProcess) {
-                    djangoProcess.kill('SIGKILL');
+        // Closing stdin lets the server finish running requests and exit
+        // cleanly (works on Windows too, where there is no SIGTERM)
+        proc.stdin.end();
+
+        setTimeout(() => {
+            if (proc.exitCode === null && proc.signalCode === null) {
+                log.warn('Django server did not stop in time, killing it');
+                if (process.platform === 'win32') {
+                    spawn('taskkill', ['/pid', proc.pid, '/f', '/t']);
+                } else {
+                    proc.kill('SIGKILL');
                 }
-            }, 5000);
-        }
+            }
+        }, 8000);
 
         djangoProcess = null;
     }